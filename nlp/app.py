@@ -1,49 +1,35 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Request, Response, request, jsonify, g, send_file
 from flask_restx import Api, Resource, fields
 from werkzeug.utils import secure_filename
 import os
-import sys
+import json
+import time
+import uuid
+import shutil
+import zipfile
 import traceback
 import logging
-import logging.handlers
 from flask_cors import CORS
 
 # Celery imports
 from celery.result import AsyncResult
 from utils.tasks import app as celery_app
-from utils.extract_text import extract_text
 from utils.calculate_score import normalize_job_category
-
-# Create logs directory if it doesn't exist
+from utils.candidate_pool import POOL_NAME_PATTERN
+from utils.metrics import render_prometheus, PROMETHEUS_CONTENT_TYPE, HTTP_REQUEST_DURATION
+from utils.profiling import profile_path, TASK_ID_PATTERN
+from utils.task_events import iter_task_events, validate_callback_url
+from utils.task_status import fetch_task_metas, compact_status, compact_summary, TASK_STATUS_MAX_IDS
+from utils.result_store import load_retained_result, load_summaries
+from utils.upload_store import UploadStore, matches_signature
+from utils.logging_config import configure_logging, log_payload
+
+# Configure logging once for the whole process (queue-based, see utils/logging_config.py)
 logs_dir = 'logs'
-if not os.path.exists(logs_dir):
-    os.makedirs(logs_dir)
-
-# Set up rotating file handler for detailed logs
-file_handler = logging.handlers.RotatingFileHandler(
-    os.path.join(logs_dir, 'nlp_service.log'),
-    maxBytes=10485760,  # 10MB
-    backupCount=5
-)
-file_handler.setLevel(logging.DEBUG)
-file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(file_formatter)
-
-# Set up console handler for immediate feedback
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.INFO)
-console_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-console_handler.setFormatter(console_formatter)
-
-# Configure root logger
-root_logger = logging.getLogger()
-root_logger.setLevel(logging.DEBUG)
-root_logger.addHandler(file_handler)
-root_logger.addHandler(console_handler)
+configure_logging(log_file=os.path.join(logs_dir, 'nlp_service.log'))
 
 # Configure application logger
 logger = logging.getLogger('nlp_service')
-logger.setLevel(logging.DEBUG)
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -56,13 +42,13 @@ api = Api(app,
 
 # Now import the modules after logging is set up
 try:
-    from utils.tasks import process_resume
+    from utils.tasks import process_resume, process_resume_batch, process_resume_multi, rank_candidate_pool
     from utils.extract_text import extract_text
     from utils.calculate_score import CATEGORY_MAPPING, JOB_CATEGORIES, detect_duplicate, normalize_job_category
     from celery_config import app as celery_app
     logger.info("Successfully imported all required modules")
 except Exception as import_error:
-    logger.error(f"Error importing modules: {str(import_error)}")
+    logger.error("Error importing modules: %s", import_error)
     logger.error(traceback.format_exc())
     # Continue without failing - we'll handle missing imports in each endpoint
 
@@ -89,11 +75,125 @@ result_response = api.model('ResultResponse', {
     'category': fields.String(description='Detected job category')
 })
 
-app.config['UPLOAD_FOLDER'] = 'temp_uploads'
-app.config['MAX_CONTENT_LENGTH'] = 5 * 1024 * 1024  # 5MB max file size
+# Shared with the Celery workers, which read the resumes from here
+app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', 'temp_uploads')
+app.config['SINGLE_UPLOAD_MAX_LENGTH'] = 5 * 1024 * 1024  # 5MB max file size
+app.config['BATCH_UPLOAD_MAX_LENGTH'] = int(os.environ.get('BATCH_UPLOAD_MAX_MB', '100')) * 1024 * 1024
+app.config['BATCH_MAX_FILES'] = int(os.environ.get('BATCH_MAX_FILES', '500'))
+app.config['MULTI_MAX_JOBS'] = int(os.environ.get('MULTI_MAX_JOBS', '50'))
+# Opt-in: the API is unauthenticated, so by default only PROFILE_SAMPLE_RATE turns profiling on
+app.config['ALLOW_PROFILE_HEADER'] = os.environ.get('ALLOW_PROFILE_HEADER', 'false').lower() == 'true'
+# The app-wide limit is the batch limit; single-file routes are checked in limit_upload_size
+app.config['MAX_CONTENT_LENGTH'] = app.config['BATCH_UPLOAD_MAX_LENGTH']
 if not os.path.exists(app.config['UPLOAD_FOLDER']):
     os.makedirs(app.config['UPLOAD_FOLDER'])
 
+upload_store = UploadStore(app.config['UPLOAD_FOLDER'])
+
+class UploadRequest(Request):
+    """Request that streams uploaded files into the upload store while the body is parsed"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return upload_store.spool_file()
+
+app.request_class = UploadRequest
+
+ALLOWED_EXTENSIONS = {'.pdf', '.docx'}
+BATCH_ENDPOINTS = {'process_resume_batch'}
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    """Observe request latency by route template (not raw path, to keep label cardinality bounded)"""
+    start = g.get('request_start')
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method=request.method,
+                                      route=route, status=response.status_code)
+    return response
+
+@app.before_request
+def limit_upload_size():
+    """Keep the 5MB limit on every route except batch uploads"""
+    if request.endpoint in BATCH_ENDPOINTS:
+        return None
+    if request.content_length and request.content_length > app.config['SINGLE_UPLOAD_MAX_LENGTH']:
+        return request_entity_too_large(None)
+    return None
+
+def callback_url_from_request():
+    """
+    Optional webhook (callbackUrl form field) the worker POSTs the result to when the task finishes
+
+    Raises:
+        ValueError: If the URL is not acceptable
+    """
+    callback_url = request.form.get('callbackUrl') or None
+    if callback_url:
+        validate_callback_url(callback_url)
+    return callback_url
+
+def save_batch_uploads(batch_id):
+    """
+    Save the resumes of a batch upload to the upload folder
+    
+    Accepts any number of 'resumes' files and/or a zip 'archive' of PDF/DOCX files.
+    Files whose leading bytes do not match their extension are skipped, as on /api/process.
+    
+    Returns:
+        Tuple of (file_paths, file_names, skipped) where skipped lists rejected file names
+    """
+    upload_folder = app.config['UPLOAD_FOLDER']
+    max_files = app.config['BATCH_MAX_FILES']
+    max_file_size = app.config['SINGLE_UPLOAD_MAX_LENGTH']
+    file_paths, file_names, skipped = [], [], []
+
+    def target_path(name):
+        return os.path.join(upload_folder, f"{batch_id}_{len(file_paths)}_{secure_filename(name)}")
+
+    for file in request.files.getlist('resumes'):
+        if not file.filename:
+            continue
+        extension = os.path.splitext(file.filename)[1].lower()
+        if (extension not in ALLOWED_EXTENSIONS or len(file_paths) >= max_files
+                or not matches_signature(file.stream, extension)):
+            skipped.append(file.filename)
+            continue
+        file_path = target_path(file.filename)
+        file.save(file_path)
+        file_paths.append(file_path)
+        file_names.append(file.filename)
+
+    archive = request.files.get('archive')
+    if archive and archive.filename:
+        if not zipfile.is_zipfile(archive.stream):
+            raise ValueError('Archive must be a zip file')
+        archive.stream.seek(0)
+        with zipfile.ZipFile(archive.stream) as zip_file:
+            for member in zip_file.infolist():
+                name = os.path.basename(member.filename)
+                if member.is_dir() or not name:
+                    continue
+                extension = os.path.splitext(name)[1].lower()
+                if (extension not in ALLOWED_EXTENSIONS
+                        or member.file_size > max_file_size or len(file_paths) >= max_files):
+                    skipped.append(name)
+                    continue
+                with zip_file.open(member) as source:
+                    if not matches_signature(source, extension):
+                        skipped.append(name)
+                        continue
+                    file_path = target_path(name)
+                    with open(file_path, 'wb') as target:
+                        shutil.copyfileobj(source, target)
+                file_paths.append(file_path)
+                file_names.append(name)
+
+    return file_paths, file_names, skipped
+
 @api.route('/')
 class Home(Resource):
     def get(self):
@@ -111,6 +211,12 @@ class Health(Resource):
             'version': '1.0'
         })
 
+@api.route('/metrics')
+class Metrics(Resource):
+    def get(self):
+        """Prometheus metrics (stage duration histograms)"""
+        return Response(render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
 @api.route('/api/categories')
 class JobCategories(Resource):
     @api.marshal_list_with(job_category_model)
@@ -146,7 +252,7 @@ class JobCategories(Resource):
             ]
             return categories
         except Exception as e:
-            logger.error(f"Error getting job categories: {str(e)}")
+            logger.error("Error getting job categories: %s", e)
             return [], 500
 
 @api.route('/api/process')
@@ -175,10 +281,10 @@ class ProcessResume(Resource):
             # Log file details
             filename = secure_filename(file.filename)
             file_extension = os.path.splitext(filename)[1].lower()
-            logger.info(f"Processing file: {filename} ({file_extension})")
+            logger.info("Processing file: %s (%s)", filename, file_extension)
 
             if not ('.' in file.filename and file_extension in {'.pdf', '.docx'}):
-                logger.error(f'Invalid file type: {file_extension}')
+                logger.error("Invalid file type: %s", file_extension)
                 return jsonify({
                     'success': False,
                     'message': 'Only PDF and DOCX files are allowed'
@@ -191,11 +297,11 @@ class ProcessResume(Resource):
 
             # Handle different formats of job category from frontend/backend
             job_category = request.form.get('jobCategory', '')
-            logger.info(f"Received job category: {job_category}")
+            logger.info("Received job category: %s", job_category)
             
             # Normalize the category
             internal_category = normalize_job_category(job_category)
-            logger.info(f"Normalized to internal category: {internal_category}")
+            logger.info("Normalized to internal category: %s", internal_category)
             
             if not internal_category:
                 logger.error('Invalid job category after normalization')
@@ -204,37 +310,48 @@ class ProcessResume(Resource):
             job_skills = []
             if request.form.get('requiredSkills'):
                 job_skills = [skill.strip() for skill in request.form.get('requiredSkills').split(',') if skill.strip()]
-                logger.info(f"Required skills: {job_skills}")
+                logger.info("Required skills: %s", job_skills)
+
+            # Optionally store the processed resume in a candidate pool for later ranking
+            candidate_id = request.form.get('candidateId') or None
+            pool_name = request.form.get('poolId') or None
+            if pool_name and not POOL_NAME_PATTERN.match(pool_name):
+                logger.error("Invalid pool id: %s", pool_name)
+                return jsonify({'success': False, 'message': 'Invalid pool id'}), 400
 
-            # Save the file
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
-            logger.info(f"Saved resume: {file_path}")
-            
-            # Verify the file exists
-            if not os.path.exists(file_path):
-                logger.error(f"File was not saved properly: {file_path}")
-                return jsonify({'success': False, 'message': 'Error saving file'}), 500
-                
-            # Test text extraction directly
             try:
-                text_sample = extract_text(file_path)
-                if text_sample:
-                    text_preview = text_sample[:100] + "..." if len(text_sample) > 100 else text_sample
-                    logger.info(f"Text extraction successful. Preview: {text_preview}")
-                else:
-                    logger.warning(f"Text extraction returned empty result for {file_path}")
-            except Exception as extract_error:
-                logger.error(f"Text extraction test failed: {str(extract_error)}")
-                logger.error(traceback.format_exc())
+                callback_url = callback_url_from_request()
+            except ValueError as url_error:
+                logger.error("Invalid callback URL: %s", url_error)
+                return {'success': False, 'message': str(url_error)}, 400
+
+            # Cheap content check; parsing and text extraction happen only in the worker
+            if not matches_signature(file.stream, file_extension):
+                logger.error("File content does not match its type: %s", filename)
+                return {'success': False, 'message': f'File is not a valid {file_extension[1:].upper()} file'}, 400
+
+            # The body was already streamed into the upload store; this links it under a unique name
+            file_path = upload_store.save(file, filename)
+            logger.info("Saved resume: %s", file_path)
+
+            # Profile this run when the client asks for it
+            profile = request.headers.get('X-Profile', '').lower() in ('1', 'true', 'yes')
+            if profile and not app.config['ALLOW_PROFILE_HEADER']:
+                logger.warning('Ignoring X-Profile header, profiling on request is disabled')
+                profile = False
 
             # Process the resume asynchronously
             try:
-                task = process_resume.delay(file_path, job_description, job_skills, job_category)
+                # Epoch seconds; with the task's timings.startedAt this gives the queue wait
+                queued_at = time.time()
+                task = process_resume.delay(
+                    file_path, job_description, job_skills, job_category,
+                    candidate_id=candidate_id, pool_name=pool_name, callback_url=callback_url, profile=profile
+                )
                 task_id = task.id
-                logger.info(f'Resume processing queued: {filename}, Task ID: {task_id}, Category: {job_category}')
+                logger.info("Resume processing queued: %s, Task ID: %s, Category: %s", filename, task_id, job_category)
             except Exception as task_error:
-                logger.error(f"Error creating Celery task: {str(task_error)}")
+                logger.error("Error creating Celery task: %s", task_error)
                 logger.error(traceback.format_exc())
                 return jsonify({'success': False, 'message': f'Error queueing task: {str(task_error)}'}), 500
 
@@ -242,22 +359,311 @@ class ProcessResume(Resource):
                 'success': True,
                 'message': 'Resume processing queued',
                 'taskId': task_id,
-                'category': job_category
+                'category': job_category,
+                'queuedAt': round(queued_at, 6)
             }
             return response_data, 202
 
         except Exception as e:
-            logger.error(f'Unhandled error in process endpoint: {str(e)}')
+            logger.error("Unhandled error in process endpoint: %s", e)
             logger.error(traceback.format_exc())
             if 'file_path' in locals() and os.path.exists(file_path):
                 try:
                     os.remove(file_path)
-                    logger.info(f"Cleaned up file after error: {file_path}")
+                    logger.info("Cleaned up file after error: %s", file_path)
                 except Exception as cleanup_error:
-                    logger.error(f"Error cleaning up file: {str(cleanup_error)}")
+                    logger.error("Error cleaning up file: %s", cleanup_error)
                     
             return jsonify({'success': False, 'message': f'Internal server error: {str(e)}'}), 500
 
+@api.route('/api/process-batch', endpoint='process_resume_batch')
+class ProcessResumeBatch(Resource):
+    def post(self):
+        """Queue many resumes for screening against one job description"""
+        batch_id = str(uuid.uuid4())
+        file_paths = []
+        try:
+            logger.info("Batch resume processing request received")
+
+            job_description = request.form.get('jobDescription', '')
+            if job_description and len(job_description) > 10000:
+                logger.error('Job description too long')
+                return {'success': False, 'message': 'Job description is too long'}, 400
+
+            job_category = request.form.get('jobCategory', '')
+            internal_category = normalize_job_category(job_category)
+            if not internal_category:
+                logger.error('Invalid job category after normalization')
+                return {'success': False, 'message': 'Invalid job category'}, 400
+
+            job_skills = []
+            if request.form.get('requiredSkills'):
+                job_skills = [skill.strip() for skill in request.form.get('requiredSkills').split(',') if skill.strip()]
+
+            try:
+                callback_url = callback_url_from_request()
+            except ValueError as url_error:
+                logger.error("Invalid callback URL: %s", url_error)
+                return {'success': False, 'message': str(url_error)}, 400
+
+            try:
+                file_paths, file_names, skipped = save_batch_uploads(batch_id)
+            except (ValueError, zipfile.BadZipFile) as archive_error:
+                logger.error("Invalid batch archive: %s", archive_error)
+                return {'success': False, 'message': str(archive_error)}, 400
+
+            # Store the resumes in a candidate pool when a pool id is given
+            pool_name = request.form.get('poolId') or None
+            candidate_ids = None
+            if pool_name:
+                if not POOL_NAME_PATTERN.match(pool_name):
+                    for file_path in file_paths:
+                        os.remove(file_path)
+                    return {'success': False, 'message': 'Invalid pool id'}, 400
+                candidate_ids = [c.strip() for c in request.form.get('candidateIds', '').split(',') if c.strip()]
+                if len(candidate_ids) != len(file_paths):
+                    # Fall back to the uploaded file names as candidate ids
+                    candidate_ids = file_names
+
+            if not file_paths:
+                logger.error('No valid resumes in batch upload')
+                return {
+                    'success': False,
+                    'message': 'No PDF or DOCX resumes were uploaded',
+                    'skipped': skipped
+                }, 400
+
+            logger.info("Saved %s resumes for batch %s (%s skipped)", len(file_paths), batch_id, len(skipped))
+
+            try:
+                process_resume_batch.apply_async(
+                    args=(file_paths, job_description, job_skills, job_category),
+                    kwargs={'file_names': file_names, 'candidate_ids': candidate_ids, 'pool_name': pool_name,
+                            'callback_url': callback_url},
+                    task_id=batch_id
+                )
+            except Exception as task_error:
+                logger.error("Error creating Celery batch task: %s", task_error)
+                logger.error(traceback.format_exc())
+                for file_path in file_paths:
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                return {'success': False, 'message': f'Error queueing task: {str(task_error)}'}, 500
+
+            return {
+                'success': True,
+                'message': 'Batch processing queued',
+                'batchId': batch_id,
+                'taskId': batch_id,
+                'total': len(file_paths),
+                'files': file_names,
+                'skipped': skipped,
+                'category': job_category
+            }, 202
+
+        except Exception as e:
+            logger.error("Unhandled error in batch process endpoint: %s", e)
+            logger.error(traceback.format_exc())
+            for file_path in file_paths:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+            return {'success': False, 'message': f'Internal server error: {str(e)}'}, 500
+
+@api.route('/api/process-multi')
+class ProcessResumeMulti(Resource):
+    def post(self):
+        """Queue one resume for screening against several job descriptions"""
+        try:
+            logger.info("Multi-job resume processing request received")
+
+            file = request.files.get('resume')
+            if not file or file.filename == '':
+                logger.error('No file uploaded')
+                return {'success': False, 'message': 'No file was uploaded'}, 400
+
+            filename = secure_filename(file.filename)
+            file_extension = os.path.splitext(filename)[1].lower()
+            if file_extension not in ALLOWED_EXTENSIONS:
+                logger.error("Invalid file type: %s", filename)
+                return {'success': False, 'message': 'Only PDF and DOCX files are allowed'}, 400
+
+            # jobs is a JSON list of {jobId, jobDescription, requiredSkills, jobCategory}
+            try:
+                jobs = json.loads(request.form.get('jobs', ''))
+            except ValueError:
+                return {'success': False, 'message': 'jobs must be a JSON list'}, 400
+            if not isinstance(jobs, list) or not jobs or not all(isinstance(job, dict) for job in jobs):
+                return {'success': False, 'message': 'jobs must be a non-empty JSON list of objects'}, 400
+            if len(jobs) > app.config['MULTI_MAX_JOBS']:
+                return {
+                    'success': False,
+                    'message': f"At most {app.config['MULTI_MAX_JOBS']} jobs can be scored at once"
+                }, 400
+            for job in jobs:
+                if len(job.get('jobDescription') or '') > 10000:
+                    logger.error('Job description too long')
+                    return {'success': False, 'message': 'Job description is too long'}, 400
+                if job.get('jobCategory') and not normalize_job_category(job['jobCategory']):
+                    return {'success': False, 'message': 'Invalid job category'}, 400
+
+            try:
+                callback_url = callback_url_from_request()
+            except ValueError as url_error:
+                logger.error("Invalid callback URL: %s", url_error)
+                return {'success': False, 'message': str(url_error)}, 400
+
+            # Same cheap content check as /api/process
+            if not matches_signature(file.stream, file_extension):
+                logger.error("File content does not match its type: %s", filename)
+                return {'success': False, 'message': f'File is not a valid {file_extension[1:].upper()} file'}, 400
+
+            file_path = upload_store.save(file, filename)
+            logger.info("Saved resume: %s", file_path)
+
+            try:
+                task = process_resume_multi.delay(file_path, jobs, callback_url=callback_url)
+            except Exception as task_error:
+                logger.error("Error creating Celery task: %s", task_error)
+                logger.error(traceback.format_exc())
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                return {'success': False, 'message': f'Error queueing task: {str(task_error)}'}, 500
+
+            logger.info("Multi-job processing queued: %s against %s jobs, Task ID: %s", filename, len(jobs), task.id)
+            return {
+                'success': True,
+                'message': 'Resume processing queued',
+                'taskId': task.id,
+                'jobs': len(jobs)
+            }, 202
+
+        except Exception as e:
+            logger.error("Unhandled error in multi-job process endpoint: %s", e)
+            logger.error(traceback.format_exc())
+            return {'success': False, 'message': f'Internal server error: {str(e)}'}, 500
+
+@api.route('/api/rank-candidates')
+class RankCandidates(Resource):
+    def post(self):
+        """Rank all stored candidates of a pool against a new job"""
+        try:
+            payload = request.get_json(silent=True) or request.form
+            job_description = payload.get('jobDescription', '')
+            if not job_description:
+                return {'success': False, 'message': 'Job description is required'}, 400
+            if len(job_description) > 10000:
+                logger.error('Job description too long')
+                return {'success': False, 'message': 'Job description is too long'}, 400
+
+            job_skills = payload.get('requiredSkills') or []
+            if isinstance(job_skills, str):
+                job_skills = [skill.strip() for skill in job_skills.split(',') if skill.strip()]
+
+            pool_name = payload.get('poolId') or None
+            if pool_name and not POOL_NAME_PATTERN.match(pool_name):
+                return {'success': False, 'message': 'Invalid pool id'}, 400
+
+            try:
+                top_k = int(payload.get('topK', 10))
+            except (TypeError, ValueError):
+                return {'success': False, 'message': 'topK must be an integer'}, 400
+            if top_k < 1:
+                return {'success': False, 'message': 'topK must be at least 1'}, 400
+
+            task = rank_candidate_pool.delay(
+                job_description, job_skills, payload.get('jobCategory', ''), top_k=top_k, pool_name=pool_name
+            )
+            logger.info("Candidate ranking queued, Task ID: %s", task.id)
+            return {
+                'success': True,
+                'message': 'Candidate ranking queued',
+                'taskId': task.id
+            }, 202
+        except Exception as e:
+            logger.error("Error queueing candidate ranking: %s", e)
+            logger.error(traceback.format_exc())
+            return {'success': False, 'message': f'Internal server error: {str(e)}'}, 500
+
+def retained_task_status(task_id):
+    """Status of a finished task whose backend result has expired, from the result store"""
+    result, summary = load_retained_result(celery_app.backend, task_id)
+    if result is not None:
+        response = {'success': result.get('success', True), 'status': 'completed', 'result': result, 'archived': True}
+        if not response['success']:
+            response['error'] = result.get('message', 'Task completed but failed')
+        return response
+    if summary is not None:
+        return {
+            'success': summary['success'],
+            'status': 'completed',
+            'message': 'The full result has expired; only its summary is kept',
+            'resultExpired': True,
+            'summary': summary
+        }
+    return None
+
+def build_task_status(task_id):
+    """
+    Status body of /api/task/<task_id> (also the final event of /api/task/<task_id>/events)
+
+    SUCCESS is reported as status 'completed'; other Celery states are lowercased.
+    """
+    task = AsyncResult(task_id, app=celery_app)
+    logger.info("Checking status for task %s: %s", task_id, task.state)
+
+    response = {
+        'success': True,  # Default to True unless we hit an error case
+        'status': task.state.lower()  # Convert Celery state to lowercase for consistency
+    }
+
+    if task.state == 'PENDING':
+        # Unknown ids and results past result_expires both read as PENDING
+        retained = retained_task_status(task_id)
+        if retained:
+            return retained
+        response['message'] = 'Task is pending'
+    elif task.state == 'STARTED':
+        response['message'] = 'Task is in progress'
+    elif task.state == 'PROGRESS':
+        response['message'] = 'Task is in progress'
+        response['progress'] = task.info if isinstance(task.info, dict) else {}
+    elif task.state == 'SUCCESS':
+        try:
+            # Log a sample of raw results for debugging (DEBUG only, see LOG_PAYLOAD_SAMPLE_RATE)
+            log_payload(logger, "Task %s result", task.result, task_id)
+            
+            if isinstance(task.result, dict):
+                # Check if the result has a success key
+                if 'success' in task.result:
+                    response['success'] = task.result.get('success', False)
+                    
+                    # If the task result indicates failure, include the error
+                    if not task.result.get('success', False):
+                        response['error'] = task.result.get('message', 'Task completed but failed')
+                
+                # Always include the result regardless of success status
+                response['result'] = task.result
+            else:
+                # If result is not a dict, just include it as is
+                response['result'] = task.result
+                
+            # Set status to 'completed' for consistency with frontend expectations
+            response['status'] = 'completed'
+        except Exception as e:
+            logger.error("Error processing task result: %s", e)
+            response['success'] = False
+            response['error'] = 'Error processing task result'
+    elif task.state == 'FAILURE':
+        error = str(task.result) if task.result else 'Unknown error occurred'
+        logger.error("Task %s failed with error: %s", task_id, error)
+        response['success'] = False
+        response['error'] = error
+    else:
+        # Handle any other states
+        response['message'] = f'Task is in state: {task.state}'
+
+    return response
+
 @api.route('/api/task/<string:task_id>')
 class TaskStatus(Resource):
     def get(self, task_id):
@@ -270,59 +676,14 @@ class TaskStatus(Resource):
                     'error': 'No task ID provided'
                 }), 400
 
-            task = AsyncResult(task_id, app=celery_app)
-            logger.info(f"Checking status for task {task_id}: {task.state}")
-
-            response = {
-                'success': True,  # Default to True unless we hit an error case
-                'status': task.state.lower()  # Convert Celery state to lowercase for consistency
-            }
-
-            if task.state == 'PENDING':
-                response['message'] = 'Task is pending'
-            elif task.state == 'STARTED':
-                response['message'] = 'Task is in progress'
-            elif task.state == 'SUCCESS':
-                try:
-                    # Log the raw result for debugging
-                    logger.info(f"Task {task_id} result: {task.result}")
-                    
-                    if isinstance(task.result, dict):
-                        # Check if the result has a success key
-                        if 'success' in task.result:
-                            response['success'] = task.result.get('success', False)
-                            
-                            # If the task result indicates failure, include the error
-                            if not task.result.get('success', False):
-                                response['error'] = task.result.get('message', 'Task completed but failed')
-                        
-                        # Always include the result regardless of success status
-                        response['result'] = task.result
-                    else:
-                        # If result is not a dict, just include it as is
-                        response['result'] = task.result
-                        
-                    # Set status to 'completed' for consistency with frontend expectations
-                    response['status'] = 'completed'
-                except Exception as e:
-                    logger.error(f"Error processing task result: {str(e)}")
-                    response['success'] = False
-                    response['error'] = 'Error processing task result'
-            elif task.state == 'FAILURE':
-                error = str(task.result) if task.result else 'Unknown error occurred'
-                logger.error(f"Task {task_id} failed with error: {error}")
-                response['success'] = False
-                response['error'] = error
-            else:
-                # Handle any other states
-                response['message'] = f'Task is in state: {task.state}'
+            response = build_task_status(task_id)
 
-            # Log the final response for debugging
-            logger.info(f"Returning response for task {task_id}: {response}")
+            # Log a sample of final responses for debugging
+            log_payload(logger, "Returning response for task %s", response, task_id)
             return jsonify(response)
 
         except Exception as e:
-            logger.error(f"Error checking task status: {str(e)}")
+            logger.error("Error checking task status: %s", e)
             logger.error(traceback.format_exc())
             return jsonify({
                 'success': False,
@@ -330,6 +691,80 @@ class TaskStatus(Resource):
                 'error': str(e)
             }), 500
 
+def bulk_task_status(task_ids, fields):
+    """Response of /api/tasks/status for a list of task ids and result fields"""
+    if not isinstance(task_ids, list) or not task_ids:
+        return {'success': False, 'message': 'Provide a non-empty list of task ids'}, 400
+    if len(task_ids) > TASK_STATUS_MAX_IDS:
+        return {'success': False, 'message': f"At most {TASK_STATUS_MAX_IDS} task ids per request"}, 400
+    invalid = [task_id for task_id in task_ids if not isinstance(task_id, str) or not TASK_ID_PATTERN.match(task_id)]
+    if invalid:
+        return {'success': False, 'message': f"Invalid task ids: {invalid[:5]}"}, 400
+    if fields is not None and (not isinstance(fields, list) or not all(isinstance(f, str) for f in fields)):
+        return {'success': False, 'message': 'fields must be a list of result paths'}, 400
+
+    try:
+        metas = fetch_task_metas(celery_app.backend, task_ids)
+        tasks = [compact_status(task_id, meta, fields) for task_id, meta in zip(task_ids, metas)]
+        # Finished tasks whose results expired read as pending; fill them in from their summaries
+        pending = [index for index, task in enumerate(tasks) if task['status'] == 'pending']
+        summaries = load_summaries(celery_app.backend, [task_ids[index] for index in pending])
+        for index, summary in zip(pending, summaries):
+            if summary:
+                tasks[index] = compact_summary(task_ids[index], summary, fields)
+    except Exception as e:
+        logger.error("Error reading task statuses: %s", e)
+        logger.error(traceback.format_exc())
+        return {'success': False, 'message': f'Error reading task statuses: {str(e)}'}, 500
+
+    counts = {}
+    for task in tasks:
+        counts[task['status']] = counts.get(task['status'], 0) + 1
+    logger.info("Bulk status of %s tasks: %s", len(tasks), counts)
+    return {'success': True, 'tasks': tasks, 'counts': counts}, 200
+
+@api.route('/api/tasks/status')
+class BulkTaskStatus(Resource):
+    def get(self):
+        """Status of many tasks: ?ids=<id>,<id>&fields=data.matchScore,data.candidateName (or * for whole results)"""
+        task_ids = [task_id for task_id in request.args.get('ids', '').split(',') if task_id]
+        fields = [field for field in request.args.get('fields', '').split(',') if field] or None
+        return bulk_task_status(task_ids, fields)
+
+    def post(self):
+        """Status of many tasks: JSON body {"taskIds": [...], "fields": [...]} for lists too long for a URL"""
+        body = request.get_json(silent=True) or {}
+        return bulk_task_status(body.get('taskIds'), body.get('fields'))
+
+@api.route('/api/task/<string:task_id>/events')
+class TaskEvents(Resource):
+    def get(self, task_id):
+        """Stream status changes of a task as Server-Sent Events until it finishes"""
+        if not TASK_ID_PATTERN.match(task_id):
+            return {'success': False, 'message': 'Invalid task id'}, 400
+        stream = iter_task_events(celery_app.backend, task_id, lambda: build_task_status(task_id))
+        return Response(stream, mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@api.route('/api/task/<string:task_id>/profile')
+class TaskProfile(Resource):
+    def get(self, task_id):
+        """Download the profile of a profiled task as pstats or collapsed stacks"""
+        profile_format = request.args.get('format', 'pstats')
+        try:
+            path = profile_path(task_id, profile_format)
+        except ValueError as e:
+            return {'success': False, 'message': str(e)}, 400
+
+        if not os.path.exists(path):
+            return {'success': False, 'message': 'No profile stored for this task'}, 404
+
+        if profile_format == 'pstats':
+            return send_file(os.path.abspath(path), mimetype='application/octet-stream',
+                             as_attachment=True, download_name=f"{task_id}.pstats")
+        return send_file(os.path.abspath(path), mimetype='text/plain',
+                         as_attachment=True, download_name=f"{task_id}.collapsed")
+
 @api.route('/api/detect-duplicates')
 class DetectDuplicates(Resource):
     def post(self):
@@ -351,7 +786,7 @@ class DetectDuplicates(Resource):
                 from utils.extract_text import extract_text
                 from utils.calculate_score import detect_duplicate
             except ImportError as e:
-                logger.error(f"Missing required module: {str(e)}")
+                logger.error("Missing required module: %s", e)
                 return jsonify({'success': False, 'message': f'Server configuration error: {str(e)}'}), 500
 
             resume_text = extract_text(file_path)
@@ -384,7 +819,7 @@ class DetectDuplicates(Resource):
 
             if os.path.exists(file_path):
                 os.remove(file_path)
-            logger.info(f'Duplicate detection completed: {filename}')
+            logger.info("Duplicate detection completed: %s", filename)
 
             return jsonify({
                 'success': True,
@@ -392,7 +827,7 @@ class DetectDuplicates(Resource):
                 'duplicates': duplicates
             })
         except Exception as e:
-            logger.error(f'Error detecting duplicates: {str(e)}')
+            logger.error("Error detecting duplicates: %s", e)
             logger.error(traceback.format_exc())
             if 'file_path' in locals() and os.path.exists(file_path):
                 os.remove(file_path)
@@ -401,14 +836,23 @@ class DetectDuplicates(Resource):
 @app.errorhandler(413)
 def request_entity_too_large(error):
     logger.error('File too large')
+    if request.endpoint in BATCH_ENDPOINTS:
+        max_mb = app.config['BATCH_UPLOAD_MAX_LENGTH'] // (1024 * 1024)
+        return jsonify({'success': False, 'message': f'Batch upload is too large (max {max_mb}MB)'}), 413
     return jsonify({'success': False, 'message': 'File is too large (max 5MB)'}), 413
 
 @app.errorhandler(Exception)
 def handle_error(error):
-    logger.error(f'Unhandled error: {str(error)}')
+    logger.error("Unhandled error: %s", error)
     logger.error(traceback.format_exc())
     return jsonify({'success': False, 'message': 'Internal server error'}), 500
 
 if __name__ == '__main__':
+    # Development server only; production runs gunicorn -c gunicorn.conf.py wsgi:app
     logger.info("Starting NLP service...")
-    app.run(debug=True, host='0.0.0.0', port=5002)
\ No newline at end of file
+    app.run(
+        debug=os.environ.get('FLASK_DEBUG', '0') == '1',
+        host='0.0.0.0',
+        port=int(os.environ.get('PORT', '5002')),
+        threaded=True
+    )
\ No newline at end of file
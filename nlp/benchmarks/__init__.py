@@ -0,0 +1,8 @@
+"""
+Benchmarks for the resume extraction and scoring pipeline
+
+Run from the nlp directory:
+
+    python -m benchmarks.run --output benchmarks/results/latest.json
+    python -m benchmarks.corpus --out benchmarks/corpus --count 2000
+"""
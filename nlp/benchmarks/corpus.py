@@ -0,0 +1,531 @@
+"""
+Synthetic resume and job description corpus for benchmarks and load tests
+
+Everything is generated from a seed with the standard library only: no
+network, no models. Resumes can be controlled by length, section layout,
+skill density, tables and category, and a share of the corpus can be
+near-duplicate variants of earlier resumes. Files are written as DOCX
+(python-docx, real tables) or as a minimal hand-written PDF that PyPDF2 can
+read (tables drawn as ruled cells).
+
+Every document gets its own random.Random seeded from (seed, index), so the
+content of resume N does not depend on the count or on what came before it.
+
+Usage (from the nlp directory):
+
+    python -m benchmarks.corpus --out benchmarks/corpus --count 2000 --seed 7 --table-rate 0.3 --duplicate-rate 0.1
+"""
+
+import os
+import sys
+import json
+import copy
+import random
+import argparse
+from utils.skill_taxonomy import COMMON_TECH_SKILLS, ACADEMIC_SKILLS
+from utils.calculate_score import JOB_CATEGORIES, CATEGORY_MAPPING
+
+FIRST_NAMES = ['Ayesha', 'Bilal', 'Fatima', 'Hamza', 'Sana', 'Usman', 'Zainab', 'Ali', 'Maria', 'Omar',
+               'Hira', 'Imran', 'Nida', 'Saad', 'Amna', 'John', 'Emily', 'David', 'Sarah', 'Michael']
+LAST_NAMES = ['Khan', 'Ahmed', 'Shah', 'Malik', 'Hussain', 'Iqbal', 'Butt', 'Qureshi', 'Raza', 'Siddiqui',
+              'Smith', 'Johnson', 'Brown', 'Garcia', 'Miller']
+UNIVERSITIES = ['UET Peshawar', 'University of Peshawar', 'NUST Islamabad', 'LUMS Lahore', 'FAST Karachi',
+                'COMSATS University', 'GIKI Topi', 'Stanford University', 'University of Toronto']
+DEGREES = ['BS in Computer Science', 'BSc in Software Engineering', 'MS in Computer Science',
+           'MSc in Data Science', 'BE in Electrical Engineering', 'PhD in Computer Science',
+           'MPhil in Information Security']
+COMPANIES = ['Systems Ltd', 'NetSol Technologies', 'Arbisoft', '10Pearls', 'Techlogix', 'Careem',
+             'Tech Innovations Inc.', 'Digital Solutions Co.', 'DataWorks', 'SecureNet']
+VERBS = ['Developed', 'Designed', 'Implemented', 'Led', 'Optimized', 'Maintained', 'Migrated', 'Built',
+         'Automated', 'Tested', 'Deployed', 'Mentored']
+OUTCOMES = ['reducing latency by 40%', 'serving 2 million daily users', 'cutting costs by 25%',
+            'improving test coverage to 90%', 'for three enterprise clients', 'ahead of schedule',
+            'with a team of five engineers', 'used by 300 students']
+# Word swaps applied to near-duplicate variants
+SYNONYMS = {
+    'Developed': 'Created', 'Designed': 'Architected', 'Implemented': 'Delivered', 'Led': 'Headed',
+    'Optimized': 'Improved', 'Maintained': 'Supported', 'Built': 'Engineered', 'Tested': 'Validated',
+    'reducing': 'lowering', 'improving': 'raising', 'cutting': 'reducing', 'team': 'group',
+}
+
+# Positions, work items and extra skills that make a resume look like it was written for a category
+CATEGORY_PROFILES = {
+    'uet_peshawar': {
+        'positions': ['Lecturer', 'Assistant Professor', 'Research Assistant', 'Teaching Assistant'],
+        'employers': ['UET Peshawar', 'University of Peshawar', 'NUST Islamabad', 'COMSATS University'],
+        'objects': ['course material', 'research prototypes', 'the undergraduate curriculum',
+                    'final year projects', 'a research lab', 'journal papers'],
+        'skills': ACADEMIC_SKILLS,
+    },
+    'cybersecurity': {
+        'positions': ['Security Analyst', 'Penetration Tester', 'SOC Analyst', 'Security Engineer'],
+        'employers': ['SecureNet', 'Systems Ltd', 'Techlogix', 'Digital Solutions Co.'],
+        'objects': ['network monitoring', 'the incident response process', 'vulnerability scans',
+                    'firewall rules', 'the SIEM pipeline', 'security audits'],
+        'skills': ['security', 'cybersecurity', 'penetration testing', 'ethical hacking', 'malware analysis',
+                   'incident response', 'firewall', 'encryption', 'siem', 'forensics', 'python', 'linux'],
+    },
+    'web_developer': {
+        'positions': ['Web Developer', 'Frontend Developer', 'Full Stack Developer', 'Backend Developer'],
+        'employers': ['Arbisoft', '10Pearls', 'Careem', 'Tech Innovations Inc.'],
+        'objects': ['the customer portal', 'a REST API', 'dashboards', 'the checkout flow',
+                    'a GraphQL gateway', 'the design system'],
+        'skills': ['react', 'angular', 'vue', 'node.js', 'express', 'html', 'css', 'javascript', 'typescript',
+                   'mongodb', 'postgresql', 'rest api', 'graphql', 'docker', 'aws', 'frontend', 'backend'],
+    },
+    'python_developer': {
+        'positions': ['Python Developer', 'Backend Engineer', 'Data Engineer', 'Software Engineer'],
+        'employers': ['Arbisoft', 'DataWorks', 'Systems Ltd', 'NetSol Technologies'],
+        'objects': ['the data pipeline', 'an ETL workflow', 'a REST API', 'automation scripts',
+                    'the reporting service', 'a Django admin'],
+        'skills': ['python', 'django', 'flask', 'pandas', 'numpy', 'sql', 'postgresql', 'docker', 'aws',
+                   'rest api', 'data analysis', 'machine learning', 'git', 'pytest'],
+    },
+    'software_engineer': {
+        'positions': ['Software Engineer', 'Senior Software Engineer', 'Platform Engineer', 'Tech Lead'],
+        'employers': COMPANIES,
+        'objects': ['microservices', 'CI/CD pipelines', 'the authentication service', 'a recommendation engine',
+                    'the build system', 'the mobile app'],
+        'skills': ['java', 'c++', 'c#', 'python', 'git', 'ci/cd', 'agile', 'scrum', 'docker', 'kubernetes',
+                   'aws', 'jira', 'typescript', 'sql'],
+    },
+}
+
+# Number of experience entries, bullets per entry, projects and (at skill_density 0.5) listed skills
+RESUME_SIZES = {
+    'small': {'jobs': 1, 'bullets': 2, 'projects': 1, 'skills': 6, 'publications': 1},
+    'medium': {'jobs': 3, 'bullets': 4, 'projects': 3, 'skills': 12, 'publications': 3},
+    'large': {'jobs': 8, 'bullets': 8, 'projects': 8, 'skills': 25, 'publications': 8},
+    'xlarge': {'jobs': 15, 'bullets': 12, 'projects': 15, 'skills': 40, 'publications': 20},
+}
+
+# Section order and heading text of each layout
+LAYOUTS = {
+    'classic': [('summary', 'SUMMARY'), ('skills', 'SKILLS'), ('experience', 'EXPERIENCE'),
+                ('education', 'EDUCATION'), ('projects', 'PROJECTS')],
+    'modern': [('summary', 'Professional Summary'), ('experience', 'Work Experience'),
+               ('projects', 'Key Projects'), ('skills', 'Technical Skills'), ('education', 'Academic Background')],
+    'academic': [('education', 'EDUCATION'), ('experience', 'TEACHING AND RESEARCH EXPERIENCE'),
+                 ('publications', 'PUBLICATIONS'), ('skills', 'SKILLS'), ('projects', 'RESEARCH PROJECTS')],
+    'minimal': [('skills', 'Skills:'), ('experience', 'Experience:'), ('education', 'Education:')],
+}
+
+SKILL_POOL = COMMON_TECH_SKILLS + ACADEMIC_SKILLS
+
+def _format_skill(skill):
+    return skill.title() if len(skill) > 3 else skill.upper()
+
+def _pick_skills(rng, category, count):
+    """Mostly category skills, topped up from the general pool"""
+    category_skills = CATEGORY_PROFILES[category]['skills']
+    own = rng.sample(category_skills, min(len(category_skills), max(1, round(count * 0.7))))
+    others = [skill for skill in SKILL_POOL if skill not in own]
+    return own + rng.sample(others, max(0, count - len(own)))
+
+def _bullet(rng, profile, skills, skill_density):
+    bullet = f"{rng.choice(VERBS)} {rng.choice(profile['objects'])}"
+    if skills and rng.random() < skill_density:
+        bullet += f" using {rng.choice(skills)}"
+    return f"{bullet} {rng.choice(OUTCOMES)}"
+
+def generate_resume(rng, size='medium', category=None, layout='classic', skill_density=0.5, tables=False):
+    """
+    Generate one synthetic resume
+
+    Args:
+        rng: random.Random instance (the only source of randomness)
+        size: Key of RESUME_SIZES
+        category: Key of JOB_CATEGORIES the resume leans towards (random if None)
+        layout: Key of LAYOUTS (section order and heading style)
+        skill_density: 0-1; scales the number of listed skills (0.5 is the size's
+            default) and is the chance that an experience bullet names a skill
+        tables: Render skills, education and the job history header as tables
+
+    Returns:
+        Dict with name, category, layout, tables, skills and blocks; blocks is a
+        list of ('line', text) and ('table', rows) entries, see resume_text()
+    """
+    spec = RESUME_SIZES[size]
+    category = category or rng.choice(list(JOB_CATEGORIES))
+    profile = CATEGORY_PROFILES[category]
+    skill_density = min(max(skill_density, 0.0), 1.0)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = _pick_skills(rng, category, max(1, round(spec['skills'] * 2 * skill_density)))
+    title = rng.choice(profile['positions'])
+
+    blocks = [
+        ('line', name),
+        ('line', title),
+        ('line', f"Email: {name.lower().replace(' ', '.')}@example.com"),
+        ('line', f"Phone: +92 3{rng.randint(0, 49):02d} {rng.randint(1000000, 9999999)}"),
+        ('line', ''),
+    ]
+
+    year = 2024
+    jobs = []
+    for _ in range(spec['jobs']):
+        start = year - rng.randint(1, 4)
+        jobs.append({
+            'position': rng.choice(profile['positions']),
+            'employer': rng.choice(profile['employers']),
+            'start': start,
+            'end': year,
+            'bullets': [_bullet(rng, profile, skills, skill_density) for _ in range(spec['bullets'])],
+        })
+        year = start
+    graduation = year - rng.randint(0, 4)
+
+    sections = {}
+    sections['summary'] = [('line', f"{title} with {2024 - graduation} years of experience in "
+                                    f"{', '.join(skills[:3])}.")]
+    if tables:
+        columns = 3
+        rows = [[_format_skill(skill) for skill in skills[i:i + columns]] for i in range(0, len(skills), columns)]
+        sections['skills'] = [('table', rows)]
+    elif layout == 'minimal':
+        sections['skills'] = [('line', f"- {_format_skill(skill)}") for skill in skills]
+    else:
+        sections['skills'] = [('line', ', '.join(_format_skill(skill) for skill in skills))]
+
+    experience = []
+    for job in jobs:
+        if tables:
+            experience.append(('table', [[job['position'], job['employer'], f"{job['start']} - {job['end']}"]]))
+        else:
+            experience += [('line', job['position']), ('line', f"{job['employer']}, {job['start']} - {job['end']}")]
+        experience += [('line', f"- {bullet}") for bullet in job['bullets']]
+        experience.append(('line', ''))
+    sections['experience'] = experience
+
+    degree, university = rng.choice(DEGREES), rng.choice(UNIVERSITIES)
+    if tables:
+        sections['education'] = [('table', [['Degree', 'Institution', 'Year'], [degree, university, str(graduation)]])]
+    else:
+        sections['education'] = [('line', degree), ('line', f"{university}, {graduation}")]
+
+    projects = []
+    for i in range(spec['projects']):
+        projects += [('line', f"Project {i + 1}: {rng.choice(profile['objects']).capitalize()}"),
+                     ('line', f"- {_bullet(rng, profile, skills, skill_density)}")]
+    sections['projects'] = projects
+
+    sections['publications'] = [
+        ('line', f"[{i + 1}] {name.split()[1]}, {rng.choice(LAST_NAMES)[0]}. \"{rng.choice(profile['objects']).capitalize()} "
+                 f"with {rng.choice(skills)}\", Journal of {rng.choice(['Computing', 'Engineering', 'Education'])}, "
+                 f"{rng.randint(graduation, 2024)}")
+        for i in range(spec['publications'])
+    ]
+
+    for section, heading in LAYOUTS[layout]:
+        blocks.append(('line', heading))
+        blocks += sections[section]
+        blocks.append(('line', ''))
+
+    return {
+        'name': name,
+        'category': category,
+        'layout': layout,
+        'tables': tables,
+        'skills': skills,
+        'blocks': blocks,
+    }
+
+def near_duplicate(resume, rng, edit_rate=0.15):
+    """
+    Make a near-duplicate variant of a resume
+
+    The contact details change, bullets are reordered and a share of the
+    lines (edit_rate) get synonym swaps, or are dropped, as happens when a
+    candidate re-submits a lightly edited resume.
+    """
+    variant = copy.deepcopy(resume)
+    blocks = variant['blocks']
+    first, last = variant['name'].split(' ', 1)
+    email = f"{first.lower()}{rng.randint(1, 99)}.{last.lower()}@example.org"
+    blocks[2] = ('line', f"Email: {email}")
+    blocks[3] = ('line', f"Phone: +92 3{rng.randint(0, 49):02d} {rng.randint(1000000, 9999999)}")
+
+    edited = []
+    bullets = []
+    for block in blocks:
+        if block[0] == 'line' and block[1].startswith('- '):
+            bullets.append(block)
+            continue
+        if bullets:
+            rng.shuffle(bullets)
+            edited += bullets
+            bullets = []
+        edited.append(block)
+    rng.shuffle(bullets)
+    edited += bullets
+
+    variant['blocks'] = []
+    for kind, content in edited:
+        if kind == 'line' and content.startswith('- ') and rng.random() < edit_rate:
+            if rng.random() < 0.3:
+                continue
+            content = ' '.join(SYNONYMS.get(word, word) for word in content.split(' '))
+        variant['blocks'].append((kind, content))
+    return variant
+
+def resume_text(resume):
+    """Plain text of a resume; table rows are joined with ' | ' like extract_text does for DOCX"""
+    lines = []
+    for kind, content in resume['blocks']:
+        if kind == 'table':
+            lines += [' | '.join(row) for row in content]
+        else:
+            lines.append(content)
+    return '\n'.join(lines)
+
+def generate_resume_text(rng, size='medium', **options):
+    """Text of one synthetic resume (see generate_resume for the options)"""
+    return resume_text(generate_resume(rng, size, **options))
+
+def generate_job_description(rng, category):
+    """
+    Generate a job description for a category of JOB_CATEGORIES
+
+    Returns:
+        Dict with title, jobCategory (the name the API expects), category,
+        description and skills
+    """
+    profile = CATEGORY_PROFILES[category]
+    title = rng.choice(profile['positions'])
+    keywords = rng.sample(JOB_CATEGORIES[category]['keywords'], min(6, len(JOB_CATEGORIES[category]['keywords'])))
+    skills = rng.sample(profile['skills'], min(rng.randint(4, 7), len(profile['skills'])))
+    employer = 'UET Peshawar' if category == 'uet_peshawar' else rng.choice(profile['employers'])
+    years = rng.randint(1, 8)
+    description = '\n'.join([
+        f"{employer} is hiring a {title}.",
+        f"You will work on {rng.choice(profile['objects'])} and {rng.choice(profile['objects'])}.",
+        f"Requirements: {years}+ years of experience with {', '.join(skills)}.",
+        f"Nice to have: {', '.join(keywords)}.",
+        f"{rng.choice(VERBS)} {rng.choice(profile['objects'])} {rng.choice(OUTCOMES)} is a plus.",
+    ])
+    job_category = next((name for name, key in CATEGORY_MAPPING.items() if key == category), category)
+    return {
+        'title': title,
+        'jobCategory': job_category,
+        'category': category,
+        'description': description,
+        'skills': skills,
+    }
+
+def _pdf_escape(line):
+    line = line.encode('latin-1', 'replace').decode('latin-1')
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def _wrap(line, width):
+    wrapped = []
+    while len(line) > width:
+        cut = line.rfind(' ', 0, width)
+        cut = cut if cut > 0 else width
+        wrapped.append(line[:cut])
+        line = line[cut:].lstrip()
+    wrapped.append(line)
+    return wrapped
+
+def _as_blocks(content):
+    # Plain lists of lines are accepted as well as generated resumes
+    if isinstance(content, dict):
+        return content['blocks']
+    return [('line', line) for line in content]
+
+def write_docx(content, path):
+    """Write a resume (or a list of lines) to a DOCX file; tables become Word tables"""
+    import docx
+    document = docx.Document()
+    for kind, value in _as_blocks(content):
+        if kind == 'table':
+            columns = max(len(row) for row in value)
+            table = document.add_table(rows=len(value), cols=columns)
+            table.style = 'Table Grid'
+            for row, cells in zip(table.rows, value):
+                for cell, text in zip(row.cells, cells):
+                    cell.text = text
+        else:
+            document.add_paragraph(value)
+    document.save(path)
+
+def write_pdf(content, path, wrap=95):
+    """
+    Write a resume (or a list of lines) to a minimal single-font PDF
+
+    Only the objects PyPDF2 needs are written: catalog, page tree, one
+    Helvetica font and a content stream per page. Table cells are placed in
+    fixed columns with ruled borders.
+    """
+    top, bottom, left, width, leading = 780, 50, 50, 500, 14
+    pages, ops, y = [], [], top
+
+    def new_line(height):
+        nonlocal ops, y
+        if y - height < bottom:
+            pages.append(ops)
+            ops, y = [], top
+        y -= height
+        return y + height
+
+    def text(x, y_pos, value):
+        ops.append(f"BT /F1 10 Tf {x} {y_pos} Td ({_pdf_escape(value)}) Tj ET")
+
+    for kind, value in _as_blocks(content):
+        if kind == 'table':
+            columns = max(len(row) for row in value)
+            cell_width = width / columns
+            chars = max(int(cell_width / 5.5), 1)
+            for row in value:
+                cells = [_wrap(cell, chars) for cell in row]
+                height = leading * max(len(cell) for cell in cells) + 4
+                row_top = new_line(height)
+                for column, cell in enumerate(cells):
+                    x = left + column * cell_width
+                    ops.append(f"{x:.1f} {row_top - height:.1f} {cell_width:.1f} {height} re S")
+                    for offset, cell_line in enumerate(cell):
+                        text(f"{x + 3:.1f}", f"{row_top - leading * (offset + 1):.1f}", cell_line)
+        else:
+            for line in _wrap(value, wrap):
+                text(left, new_line(leading) - leading, line)
+    pages.append(ops)
+
+    objects = {1: b'<< /Type /Catalog /Pages 2 0 R >>', 3: b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>'}
+    page_ids = []
+    for index, page in enumerate(pages):
+        page_id, content_id = 4 + 2 * index, 5 + 2 * index
+        page_ids.append(page_id)
+        stream = '\n'.join(page).encode('latin-1')
+        objects[page_id] = (f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] '
+                            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>').encode()
+        objects[content_id] = b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream'
+    kids = ' '.join(f'{page_id} 0 R' for page_id in page_ids)
+    objects[2] = f'<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>'.encode()
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(output)
+        output += b'%d 0 obj\n' % object_id + objects[object_id] + b'\nendobj\n'
+    xref = len(output)
+    output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for object_id in sorted(objects):
+        output += b'%010d 00000 n \n' % offsets[object_id]
+    output += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(bytes(output))
+
+def generate_jobs(seed=42, categories=None, per_category=1):
+    """Deterministic job descriptions, per_category for each category"""
+    jobs = []
+    for category in categories or list(JOB_CATEGORIES):
+        for index in range(per_category):
+            job = generate_job_description(random.Random(f"{seed}:job:{category}:{index}"), category)
+            job['jobId'] = f"{category}-{index:03d}"
+            jobs.append(job)
+    return jobs
+
+def generate_corpus(out_dir, count=20, seed=42, sizes=('small', 'medium', 'large'), formats=('pdf', 'docx'),
+                    layouts=('classic',), categories=None, skill_density=0.5, table_rate=0.0,
+                    duplicate_rate=0.0, jobs_per_category=1):
+    """
+    Write a deterministic corpus of resumes plus job descriptions
+
+    Sizes and formats cycle through the corpus; layout, category and whether
+    tables are used are drawn per resume. With duplicate_rate > 0 that share
+    of the resumes are near-duplicate variants of an earlier one. A
+    manifest.json (everything but the text) and jobs.json are written next
+    to the files.
+
+    Returns:
+        List of dicts with path, format, size, layout, category, tables,
+        duplicateOf and text of each resume
+    """
+    categories = list(categories or JOB_CATEGORIES)
+    os.makedirs(out_dir, exist_ok=True)
+    corpus = []
+    resumes = []
+    for index in range(count):
+        rng = random.Random(f"{seed}:{index}")
+        size = sizes[index % len(sizes)]
+        file_format = formats[(index // len(sizes)) % len(formats)]
+        duplicate_of = None
+        if resumes and rng.random() < duplicate_rate:
+            duplicate_of = rng.randrange(len(resumes))
+            resume = near_duplicate(resumes[duplicate_of], rng)
+            size = corpus[duplicate_of]['size']
+        else:
+            resume = generate_resume(rng, size, category=rng.choice(categories), layout=rng.choice(layouts),
+                                     skill_density=skill_density, tables=rng.random() < table_rate)
+        resumes.append(resume)
+
+        path = os.path.join(out_dir, f"resume_{index:05d}_{size}.{file_format}")
+        (write_pdf if file_format == 'pdf' else write_docx)(resume, path)
+        corpus.append({
+            'path': path,
+            'format': file_format,
+            'size': size,
+            'layout': resume['layout'],
+            'category': resume['category'],
+            'tables': resume['tables'],
+            'skills': resume['skills'],
+            'duplicateOf': duplicate_of,
+            'text': resume_text(resume),
+        })
+
+    jobs = generate_jobs(seed, categories, jobs_per_category)
+    with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+        json.dump({
+            'seed': seed,
+            'count': count,
+            'resumes': [{key: value for key, value in entry.items() if key != 'text'} for entry in corpus],
+        }, f, indent=2)
+    with open(os.path.join(out_dir, 'jobs.json'), 'w') as f:
+        json.dump(jobs, f, indent=2)
+    return corpus
+
+def load_corpus(corpus_dir):
+    """Read the manifest and jobs of a corpus written by generate_corpus"""
+    with open(os.path.join(corpus_dir, 'manifest.json')) as f:
+        manifest = json.load(f)
+    with open(os.path.join(corpus_dir, 'jobs.json')) as f:
+        jobs = json.load(f)
+    return manifest['resumes'], jobs
+
+def _choices(value, allowed, option):
+    values = [item for item in value.split(',') if item]
+    unknown = [item for item in values if item not in allowed]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"{option}: unknown {', '.join(unknown)} (choose from {', '.join(allowed)})")
+    return tuple(values)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a synthetic resume corpus')
+    parser.add_argument('--out', required=True, help='Output directory')
+    parser.add_argument('--count', type=int, default=100, help='Number of resumes')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--sizes', default='small,medium,large', help=f"Comma separated, from {', '.join(RESUME_SIZES)}")
+    parser.add_argument('--formats', default='pdf,docx', help='Comma separated, from pdf, docx')
+    parser.add_argument('--layouts', default=','.join(LAYOUTS), help=f"Comma separated, from {', '.join(LAYOUTS)}")
+    parser.add_argument('--categories', default='', help='Comma separated JOB_CATEGORIES keys (default: all)')
+    parser.add_argument('--skill-density', type=float, default=0.5, help='0-1, see generate_resume')
+    parser.add_argument('--table-rate', type=float, default=0.2, help='Share of resumes using tables')
+    parser.add_argument('--duplicate-rate', type=float, default=0.1, help='Share of near-duplicate variants')
+    parser.add_argument('--jobs-per-category', type=int, default=3, help='Job descriptions per category')
+    args = parser.parse_args(argv)
+
+    try:
+        sizes = _choices(args.sizes, RESUME_SIZES, '--sizes')
+        formats = _choices(args.formats, ('pdf', 'docx'), '--formats')
+        layouts = _choices(args.layouts, LAYOUTS, '--layouts')
+        categories = _choices(args.categories, JOB_CATEGORIES, '--categories') or None
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    corpus = generate_corpus(args.out, args.count, args.seed, sizes, formats, layouts, categories,
+                             args.skill_density, args.table_rate, args.duplicate_rate, args.jobs_per_category)
+    duplicates = sum(1 for entry in corpus if entry['duplicateOf'] is not None)
+    print(f"Wrote {len(corpus)} resumes ({duplicates} near-duplicates) and job descriptions to {args.out}",
+          file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
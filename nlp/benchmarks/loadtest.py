@@ -0,0 +1,367 @@
+"""
+Load test driver for /api/process and /api/task/<id>
+
+Replays a generated (or existing) corpus against the API at a target
+arrival rate, polls every task until it finishes and reports end-to-end
+latency, submit latency, queue wait, execution time and error rates.
+
+Arrivals are open-loop: request i is due at start + i / rate whether or not
+earlier ones have finished, and latency is measured from that due time, so
+a saturated stack shows up as growing latency instead of a lower send rate.
+
+Profiles:
+    eager   Flask test client in this process with task_always_eager (no broker, no worker).
+            Tasks run inside the upload request, so queue wait is ~0.
+    redis   Starts a throwaway redis-server (or uses --redis-url), the API and a
+            Celery worker as subprocesses and drives them over HTTP.
+    remote  Drives an API that is already running at --base-url.
+
+Queue wait is timings.startedAt (set by the worker) minus the queuedAt the
+API returns, so it assumes API and worker clocks agree (same host or NTP).
+
+Usage (from the nlp directory):
+
+    python -m benchmarks.loadtest --profile eager --rate 2 --requests 40
+    python -m benchmarks.loadtest --profile redis --rate 5 --duration 60 --workers 4 --output lt.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.corpus import generate_corpus, generate_jobs, load_corpus
+from benchmarks.run import summarize
+
+NLP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FINISHED_STATES = ('completed', 'failure', 'revoked')
+
+class HttpClient:
+    """Talks to a running API; one requests session per thread"""
+
+    def __init__(self, base_url, timeout=30):
+        import requests
+        self.requests = requests
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self):
+        if not hasattr(self._local, 'session'):
+            self._local.session = self.requests.Session()
+        return self._local.session
+
+    def _json(self, response):
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, {}
+
+    def submit(self, path, upload_name, form):
+        with open(path, 'rb') as f:
+            response = self._session().post(f"{self.base_url}/api/process", data=form,
+                                            files={'resume': (upload_name, f)}, timeout=self.timeout)
+        return self._json(response)
+
+    def task(self, task_id):
+        return self._json(self._session().get(f"{self.base_url}/api/task/{task_id}", timeout=self.timeout))
+
+class EagerClient:
+    """Flask test client with Celery tasks executed inline (task_always_eager)"""
+
+    def __init__(self):
+        # Eager tasks still need a result backend for /api/task; keep it in memory
+        os.environ.setdefault('CELERY_BROKER_URL', 'memory://')
+        os.environ.setdefault('CELERY_RESULT_BACKEND', 'cache+memory://')
+        from app import app
+        from utils.tasks import app as celery_app
+        celery_app.conf.task_always_eager = True
+        celery_app.conf.task_store_eager_result = True
+        app.config['TESTING'] = True
+        self.app = app
+        self._local = threading.local()
+
+    def _client(self):
+        if not hasattr(self._local, 'client'):
+            self._local.client = self.app.test_client()
+        return self._local.client
+
+    def submit(self, path, upload_name, form):
+        with open(path, 'rb') as f:
+            data = dict(form, resume=(f, upload_name))
+            response = self._client().post('/api/process', data=data, content_type='multipart/form-data')
+        return response.status_code, response.get_json(silent=True) or {}
+
+    def task(self, task_id):
+        response = self._client().get(f"/api/task/{task_id}")
+        return response.status_code, response.get_json(silent=True) or {}
+
+def job_form(job):
+    return {
+        'jobDescription': job['description'],
+        'jobCategory': job['jobCategory'],
+        'requiredSkills': ','.join(job['skills']),
+    }
+
+def run_request(client, index, resume, job, due, poll_interval, timeout):
+    """
+    Upload one resume and poll its task until it finishes
+
+    Returns:
+        Dict with outcome ('ok', 'submit_error', 'task_failed', 'poll_error' or
+        'timeout') and the timings in seconds that could be measured
+    """
+    sent = time.perf_counter()
+    record = {'index': index, 'clientLag': sent - due}
+    upload_name = f"lt{index:06d}_{os.path.basename(resume['path'])}"
+    try:
+        status, body = client.submit(resume['path'], upload_name, job_form(job))
+    except Exception as e:
+        return dict(record, outcome='submit_error', error=f"{type(e).__name__}: {str(e)}")
+    record['submit'] = time.perf_counter() - sent
+    if status != 202 or not body.get('taskId'):
+        return dict(record, outcome='submit_error', error=f"HTTP {status}: {body.get('message')}")
+
+    task_id = body['taskId']
+    polls = 0
+    while True:
+        try:
+            status, task = client.task(task_id)
+            polls += 1
+        except Exception as e:
+            return dict(record, outcome='poll_error', error=f"{type(e).__name__}: {str(e)}", polls=polls)
+        if status != 200:
+            return dict(record, outcome='poll_error', error=f"HTTP {status}: {task.get('error')}", polls=polls)
+        if task.get('status') in FINISHED_STATES:
+            break
+        if time.perf_counter() - sent > timeout:
+            return dict(record, outcome='timeout', polls=polls)
+        time.sleep(poll_interval)
+
+    record['endToEnd'] = time.perf_counter() - due
+    record['polls'] = polls
+    result = task.get('result') if isinstance(task.get('result'), dict) else {}
+    timings = result.get('timings') or {}
+    if timings.get('startedAt') and body.get('queuedAt'):
+        record['queueWait'] = max(timings['startedAt'] - body['queuedAt'], 0.0)
+    if timings.get('totalMs') is not None:
+        record['execution'] = timings['totalMs'] / 1000
+    if task.get('status') != 'completed' or not task.get('success'):
+        return dict(record, outcome='task_failed', error=task.get('error') or result.get('message'))
+    return dict(record, outcome='ok')
+
+def run_load(client, resumes, jobs, rate, total, concurrency, poll_interval, timeout):
+    """Send `total` requests at `rate` per second with at most `concurrency` in flight"""
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='loadtest')
+    futures = []
+    start = time.perf_counter()
+    try:
+        for index in range(total):
+            due = start + index / rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(executor.submit(run_request, client, index, resumes[index % len(resumes)],
+                                           jobs[index % len(jobs)], due, poll_interval, timeout))
+        records = [future.result() for future in futures]
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return records, time.perf_counter() - start
+
+def distribution(values):
+    """Latency percentiles (ms) of a list of durations in seconds"""
+    if not values:
+        return None
+    stats = summarize(values, None)
+    stats.pop('opsPerSec')
+    return stats
+
+def report(records, wall_time):
+    outcomes = Counter(record['outcome'] for record in records)
+    errors = Counter(record['error'] for record in records if record.get('error'))
+    ok = outcomes.get('ok', 0)
+
+    def values(key, outcome='ok'):
+        return [record[key] for record in records if record['outcome'] == outcome and key in record]
+
+    return {
+        'requests': len(records),
+        'wallSeconds': round(wall_time, 3),
+        'completedPerSec': round(ok / wall_time, 3) if wall_time else None,
+        'outcomes': dict(outcomes),
+        'errorRate': round(1 - ok / len(records), 4) if records else 0.0,
+        'topErrors': errors.most_common(5),
+        'latency': {
+            'endToEnd': distribution(values('endToEnd')),
+            'submit': distribution(values('submit')),
+            'queueWait': distribution(values('queueWait')),
+            'execution': distribution(values('execution')),
+            'clientLag': distribution([record['clientLag'] for record in records]),
+        },
+        'pollsPerTask': round(sum(values('polls')) / ok, 2) if ok else None,
+    }
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _wait_for(check, what, timeout, processes):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        for name, process in processes:
+            if process.poll() is not None:
+                raise RuntimeError(f"{name} exited with code {process.returncode} while waiting for {what}")
+        try:
+            if check():
+                return
+        except Exception:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Timed out waiting for {what}")
+
+@contextmanager
+def local_stack(redis_url=None, workers=2, pool='prefork', log_dir=None, startup_timeout=120):
+    """
+    Run redis (unless redis_url is given), the API and a Celery worker as subprocesses
+
+    Yields:
+        Base URL of the API
+    """
+    import redis
+    import requests
+    log_dir = log_dir or tempfile.mkdtemp(prefix='loadtest-logs-')
+    os.makedirs(log_dir, exist_ok=True)
+    processes = []
+
+    def spawn(name, command, **kwargs):
+        log = open(os.path.join(log_dir, f"{name}.log"), 'w')
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, **kwargs)
+        processes.append((name, process))
+        return process
+
+    try:
+        if not redis_url:
+            binary = shutil.which('redis-server')
+            if not binary:
+                raise RuntimeError('redis-server not found; install it or pass --redis-url')
+            port = _free_port()
+            spawn('redis', [binary, '--port', str(port), '--bind', '127.0.0.1', '--save', '', '--appendonly', 'no'])
+            redis_url = f"redis://127.0.0.1:{port}/0"
+        _wait_for(lambda: redis.Redis.from_url(redis_url).ping(), 'redis', startup_timeout, processes)
+
+        env = dict(os.environ, CELERY_BROKER_URL=redis_url, CELERY_RESULT_BACKEND=redis_url)
+        api_port = _free_port()
+        spawn('api', [sys.executable, '-c',
+                      f"from app import app; app.run(host='127.0.0.1', port={api_port}, threaded=True)"],
+              cwd=NLP_DIR, env=env)
+        spawn('worker', [sys.executable, '-m', 'celery', '-A', 'celery_config', 'worker', '--loglevel=WARNING',
+                         f"--concurrency={workers}", f"--pool={pool}"], cwd=NLP_DIR, env=env)
+        base_url = f"http://127.0.0.1:{api_port}"
+        _wait_for(lambda: requests.get(f"{base_url}/api/health", timeout=2).ok, 'the API', startup_timeout, processes)
+        print(f"Local stack up: API {base_url}, broker {redis_url}, logs in {log_dir}", file=sys.stderr)
+        yield base_url
+    finally:
+        for name, process in reversed(processes):
+            process.terminate()
+        for name, process in reversed(processes):
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test /api/process and /api/task/<id>')
+    parser.add_argument('--profile', choices=['eager', 'redis', 'remote'], default='eager')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5002', help='API for the remote profile')
+    parser.add_argument('--redis-url', help='Existing Redis for the redis profile (default: start redis-server)')
+    parser.add_argument('--workers', type=int, default=2, help='Worker concurrency for the redis profile')
+    parser.add_argument('--pool', default='prefork', help='Worker pool for the redis profile')
+    parser.add_argument('--rate', type=float, default=2.0, help='Target arrivals per second')
+    parser.add_argument('--requests', type=int, default=40, help='Number of uploads')
+    parser.add_argument('--duration', type=float, help='Seconds to run (overrides --requests)')
+    parser.add_argument('--concurrency', type=int, default=32, help='Maximum requests in flight')
+    parser.add_argument('--poll-interval', type=float, default=0.25, help='Seconds between status polls')
+    parser.add_argument('--timeout', type=float, default=300, help='Seconds before a task counts as timed out')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed requests sent first (loads the models)')
+    parser.add_argument('--corpus-dir', help='Existing corpus (python -m benchmarks.corpus); default: generate one')
+    parser.add_argument('--count', type=int, default=30, help='Resumes to generate when no corpus is given')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus seed')
+    parser.add_argument('--log-dir', help='Where the redis profile writes subprocess logs')
+    parser.add_argument('--output', help='JSON file for the report (default: print only)')
+    args = parser.parse_args(argv)
+    if args.rate <= 0:
+        parser.error('--rate must be positive')
+    total = int(args.rate * args.duration) if args.duration else args.requests
+
+    corpus_dir = args.corpus_dir
+    if corpus_dir:
+        resumes, jobs = load_corpus(corpus_dir)
+    else:
+        corpus_dir = tempfile.mkdtemp(prefix='loadtest-corpus-')
+        resumes = generate_corpus(corpus_dir, args.count, args.seed, table_rate=0.2, duplicate_rate=0.1)
+        jobs = generate_jobs(args.seed)
+
+    @contextmanager
+    def client_for_profile():
+        if args.profile == 'eager':
+            yield EagerClient()
+        elif args.profile == 'redis':
+            with local_stack(args.redis_url, args.workers, args.pool, args.log_dir) as base_url:
+                yield HttpClient(base_url)
+        else:
+            yield HttpClient(args.base_url)
+
+    try:
+        with client_for_profile() as client:
+            if args.warmup:
+                print(f"Warming up with {args.warmup} request(s)...", file=sys.stderr)
+                run_load(client, resumes, jobs, args.rate, args.warmup, args.concurrency,
+                         args.poll_interval, args.timeout)
+            print(f"Sending {total} requests at {args.rate}/s ({args.profile} profile)...", file=sys.stderr)
+            records, wall_time = run_load(client, resumes, jobs, args.rate, total, args.concurrency,
+                                          args.poll_interval, args.timeout)
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'profile': args.profile,
+            'targetRate': args.rate,
+            'concurrency': args.concurrency,
+            'pollInterval': args.poll_interval,
+            'workers': args.workers if args.profile == 'redis' else None,
+            'corpus': args.corpus_dir or {'count': args.count, 'seed': args.seed},
+        },
+        'results': report(records, wall_time),
+    }
+    summary = results['results']
+    print(f"{summary['outcomes']} error rate {summary['errorRate']:.1%}, "
+          f"{summary['completedPerSec']} completed/s", file=sys.stderr)
+    for name, stats in summary['latency'].items():
+        if stats:
+            print(f"  {name:<10} p50 {stats['p50Ms']:>10.1f} ms  p95 {stats['p95Ms']:>10.1f} ms  "
+                  f"p99 {stats['p99Ms']:>10.1f} ms", file=sys.stderr)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(results, indent=2))
+    return results
+
+if __name__ == '__main__':
+    main()
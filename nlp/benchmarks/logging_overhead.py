@@ -0,0 +1,145 @@
+"""
+Logging overhead of the hot paths under the previous and the current logging setup
+
+Profiles (each runs in its own forked child, see benchmarks.run):
+
+- legacy: what the service did before utils/logging_config.py: root at
+  DEBUG, file and console handlers writing from the calling thread, every
+  payload (task results, skill lists) logged
+- queued: configure_logging defaults: root at LOG_LEVEL (INFO), records
+  handed to a QueueListener thread, payloads only at DEBUG and sampled
+
+Both profiles write to a log file in a temp directory and send console
+output to /dev/null, so terminal speed does not count. Times
+process_resume (eager, no broker) and GET /api/task/<id> for stored
+results, and reports the bytes each profile logged.
+
+Usage (from the nlp directory):
+
+    python -m benchmarks.logging_overhead --count 12 --iterations 3
+"""
+
+import os
+import sys
+import json
+import uuid
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+
+import benchmarks.run as bench
+from benchmarks.corpus import generate_corpus
+
+PROFILES = ('legacy', 'queued')
+
+def configure_profile(profile, log_file):
+    """Set up logging of this (child) process the way the profile does"""
+    from utils import logging_config
+    # Console output goes to /dev/null in both profiles
+    sys.stdout = open(os.devnull, 'w')
+    if profile == 'legacy':
+        logging_config.LOG_PAYLOAD_SAMPLE_RATE = 1.0
+        logging_config.configure_logging(log_file=log_file, level='DEBUG', queued=False)
+    else:
+        logging_config.configure_logging(log_file=log_file)
+
+def bench_task_status(corpus, iterations):
+    """GET /api/task/<id> through the Flask test client for stored process_resume results"""
+    from utils.tasks import process_resume
+    from app import app, celery_app
+    work_dir = tempfile.mkdtemp(prefix='bench-logging-')
+    task_ids = []
+    try:
+        for item in corpus:
+            path = os.path.join(work_dir, os.path.basename(item['path']))
+            shutil.copyfile(item['path'], path)
+            result = process_resume.apply(args=(path, bench.JOB_DESCRIPTION, bench.JOB_SKILLS, bench.JOB_CATEGORY)).get()
+            task_id = str(uuid.uuid4())
+            celery_app.backend.store_result(task_id, result, 'SUCCESS')
+            task_ids.append(task_id)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    client = app.test_client()
+
+    def run(task_id):
+        response = client.get(f'/api/task/{task_id}')
+        if response.status_code != 200:
+            raise RuntimeError(f"Task status returned HTTP {response.status_code}")
+
+    return bench.time_operations(run, task_ids, iterations)
+
+BENCHMARKS = {
+    'process_resume': bench.bench_process_resume,
+    'task_status': bench_task_status,
+}
+
+def run_profile(profile, corpus, iterations, log_dir):
+    """Run every benchmark under one logging profile in the current process"""
+    from utils.logging_config import stop_logging
+    log_file = os.path.join(log_dir, f'{profile}.log')
+    configure_profile(profile, log_file)
+    bench.warm_up(corpus)
+    open(log_file, 'w').close()
+
+    stats = {}
+    for name, benchmark in BENCHMARKS.items():
+        durations, wall_time = benchmark(corpus, iterations)
+        stats[name] = bench.summarize(durations, wall_time)
+    # Count what reached the file, including records still queued
+    stop_logging()
+    stats['logBytes'] = os.path.getsize(log_file)
+    return stats
+
+def _run_isolated(profile, corpus, iterations, log_dir, queue):
+    try:
+        queue.put(('ok', run_profile(profile, corpus, iterations, log_dir)))
+    except Exception as e:
+        queue.put(('error', f"{type(e).__name__}: {str(e)}"))
+
+def run_in_child(profile, corpus, iterations, log_dir, timeout=bench.CHILD_TIMEOUT_SECONDS):
+    """Run a profile in a forked child, since logging is configured once per process"""
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    child = context.Process(target=_run_isolated, args=(profile, corpus, iterations, log_dir, queue))
+    child.start()
+    return bench.wait_for_child(child, queue, timeout)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare hot-path logging overhead of the logging profiles')
+    parser.add_argument('--count', type=int, default=12, help='Number of generated resumes')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus seed')
+    parser.add_argument('--iterations', type=int, default=3, help='Passes over the corpus per benchmark')
+    parser.add_argument('--timeout', type=float, default=bench.CHILD_TIMEOUT_SECONDS,
+                        help='Seconds a profile may run before its child is terminated')
+    parser.add_argument('--output', help='JSON file for the results (default: print only)')
+    args = parser.parse_args(argv)
+
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        parser.error('Comparing logging profiles needs fork')
+
+    work_dir = tempfile.mkdtemp(prefix='bench-logging-')
+    try:
+        corpus = generate_corpus(os.path.join(work_dir, 'corpus'), args.count, args.seed)
+        results = {}
+        for profile in PROFILES:
+            print(f"Running {profile}...", file=sys.stderr)
+            results[profile] = run_in_child(profile, corpus, args.iterations, work_dir, args.timeout)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\n{'profile':<10}{'benchmark':<18}{'p50 ms':>10}{'p95 ms':>10}{'ops/sec':>10}{'log KB':>10}", file=sys.stderr)
+    for profile, stats in results.items():
+        for name in BENCHMARKS:
+            print(f"{profile:<10}{name:<18}{stats[name]['p50Ms']:>10.2f}{stats[name]['p95Ms']:>10.2f}"
+                  f"{stats[name]['opsPerSec']:>10.2f}{stats['logBytes'] / 1024:>10.1f}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'count': args.count, 'seed': args.seed, 'iterations': args.iterations,
+                       'profiles': results}, f, indent=2)
+    return results
+
+if __name__ == '__main__':
+    main()
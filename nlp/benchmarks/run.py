@@ -0,0 +1,315 @@
+"""
+Benchmark harness for the extraction and scoring pipeline
+
+Times text extraction, every extractor, calculate_match_score,
+detect_duplicate and end-to-end process_resume (run eagerly, no broker)
+over a generated corpus, and writes ops/sec, latency percentiles and peak
+RSS per benchmark to JSON.
+
+Usage (from the nlp directory):
+
+    python -m benchmarks.run --count 30 --output benchmarks/results/latest.json
+    python -m benchmarks.run --only extract_text,score --compare benchmarks/results/baseline.json
+"""
+
+import os
+import sys
+import atexit
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import multiprocessing
+from queue import Empty
+
+# process_resume runs eagerly through Task.apply; never probe for a Redis broker
+os.environ.setdefault('CELERY_BROKER_URL', 'memory://')
+os.environ.setdefault('CELERY_RESULT_BACKEND', 'cache+memory://')
+# Results retained by the eager runs go to a temp dir instead of nlp/result_store
+if 'RESULT_STORE_DIR' not in os.environ:
+    os.environ['RESULT_STORE_DIR'] = tempfile.mkdtemp(prefix='bench-result-store-')
+    atexit.register(shutil.rmtree, os.environ['RESULT_STORE_DIR'], True)
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmarks.corpus import generate_corpus
+
+JOB_DESCRIPTION = ("We are hiring a Python developer to build REST APIs with Django and Flask, "
+                   "work with SQL databases, Docker and AWS, and mentor junior engineers.")
+JOB_SKILLS = ['python', 'django', 'flask', 'sql', 'docker', 'aws', 'rest api']
+JOB_CATEGORY = 'Python Developer'
+# A benchmark child that has not reported by then is terminated
+CHILD_TIMEOUT_SECONDS = 1800
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+def summarize(durations, wall_time):
+    """Latency percentiles (ms) and throughput of a list of per-operation durations (s)"""
+    durations_ms = np.asarray(durations) * 1000
+    return {
+        'ops': len(durations),
+        'opsPerSec': round(len(durations) / wall_time, 3) if wall_time else None,
+        'meanMs': round(float(durations_ms.mean()), 3),
+        'minMs': round(float(durations_ms.min()), 3),
+        'p50Ms': round(float(np.percentile(durations_ms, 50)), 3),
+        'p95Ms': round(float(np.percentile(durations_ms, 95)), 3),
+        'p99Ms': round(float(np.percentile(durations_ms, 99)), 3),
+        'maxMs': round(float(durations_ms.max()), 3),
+    }
+
+def time_operations(operation, inputs, iterations=1, setup=None):
+    """
+    Time operation(item) for every input, `iterations` times
+
+    setup(item), if given, runs untimed before each call and its return
+    value is passed to operation instead of the item.
+    """
+    durations = []
+    wall_start = time.perf_counter()
+    for _ in range(iterations):
+        for item in inputs:
+            argument = setup(item) if setup else item
+            start = time.perf_counter()
+            operation(argument)
+            durations.append(time.perf_counter() - start)
+    return durations, time.perf_counter() - wall_start
+
+def bench_extract_text(corpus, iterations):
+    from utils.extract_text import extract_text
+    return time_operations(lambda item: extract_text(item['path']), corpus, iterations)
+
+def _extractor_benchmark(name):
+    def bench(corpus, iterations):
+        from utils.extract_skills import extract_skills
+        from utils.extract_education import extract_education
+        from utils.extract_experience import extract_experience
+        from utils.extract_projects import extract_projects
+        from utils.extract_contact import extract_contact_info, extract_candidate_name
+        extractors = {
+            'skills': lambda text: extract_skills(text, JOB_SKILLS),
+            'education': extract_education,
+            'experience': extract_experience,
+            'projects': extract_projects,
+            'contact_info': extract_contact_info,
+            'candidate_name': extract_candidate_name,
+        }
+        return time_operations(extractors[name], [item['text'] for item in corpus], iterations)
+    return bench
+
+def bench_score(corpus, iterations):
+    from utils.calculate_score import calculate_match_score
+    from utils.extract_skills import extract_skills
+    inputs = [(item['text'], extract_skills(item['text'], JOB_SKILLS)) for item in corpus]
+    return time_operations(
+        lambda item: calculate_match_score(item[0], JOB_DESCRIPTION, item[1], JOB_SKILLS, JOB_CATEGORY),
+        inputs, iterations
+    )
+
+def bench_detect_duplicate(corpus, iterations):
+    from utils.calculate_score import detect_duplicate
+    texts = [item['text'] for item in corpus]
+    return time_operations(
+        lambda index: detect_duplicate(texts[index], texts[:index] + texts[index + 1:]),
+        list(range(len(texts))), iterations
+    )
+
+def bench_process_resume(corpus, iterations):
+    from utils.tasks import process_resume
+    work_dir = tempfile.mkdtemp(prefix='bench-process-')
+
+    def copy_resume(item):
+        # process_resume deletes its input, so every run gets a fresh copy (untimed)
+        path = os.path.join(work_dir, f"{time.perf_counter_ns()}_{os.path.basename(item['path'])}")
+        shutil.copyfile(item['path'], path)
+        return path
+
+    def run(path):
+        result = process_resume.apply(args=(path, JOB_DESCRIPTION, JOB_SKILLS, JOB_CATEGORY)).get()
+        if not result.get('success'):
+            raise RuntimeError(f"process_resume failed: {result.get('message')}")
+
+    try:
+        return time_operations(run, corpus, iterations, setup=copy_resume)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+BENCHMARKS = {
+    'extract_text': bench_extract_text,
+    'extract_skills': _extractor_benchmark('skills'),
+    'extract_education': _extractor_benchmark('education'),
+    'extract_experience': _extractor_benchmark('experience'),
+    'extract_projects': _extractor_benchmark('projects'),
+    'extract_contact_info': _extractor_benchmark('contact_info'),
+    'extract_candidate_name': _extractor_benchmark('candidate_name'),
+    'score': bench_score,
+    'detect_duplicate': bench_detect_duplicate,
+    'process_resume': bench_process_resume,
+}
+
+def warm_up(corpus):
+    """Load the models and caches once so they are not part of the first benchmark"""
+    from utils.nlp_model import get_nlp
+    from utils.calculate_score import calculate_match_score
+    get_nlp()
+    calculate_match_score(corpus[0]['text'], JOB_DESCRIPTION, JOB_SKILLS, JOB_SKILLS, JOB_CATEGORY)
+
+def run_benchmark(name, corpus, iterations):
+    """Run one benchmark in the current process and summarize it"""
+    warm_up(corpus)
+    durations, wall_time = BENCHMARKS[name](corpus, iterations)
+    stats = summarize(durations, wall_time)
+    stats['peakRssMb'] = peak_rss_mb()
+    return stats
+
+def _run_isolated(name, corpus, iterations, queue):
+    try:
+        queue.put(('ok', run_benchmark(name, corpus, iterations)))
+    except Exception as e:
+        queue.put(('error', f"{type(e).__name__}: {str(e)}"))
+
+def wait_for_child(child, queue, timeout=CHILD_TIMEOUT_SECONDS):
+    """
+    Payload a forked child reported on the queue
+
+    Raises RuntimeError if the child reported an error, exited without
+    reporting (e.g. it was killed or segfaulted) or ran longer than timeout
+    seconds, in which case it is terminated.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            status, payload = queue.get(timeout=1.0)
+            break
+        except Empty:
+            if not child.is_alive():
+                # It may have reported just before exiting
+                try:
+                    status, payload = queue.get(timeout=1.0)
+                    break
+                except Empty:
+                    child.join()
+                    raise RuntimeError(f"Child process exited with code {child.exitcode} without a result")
+            if time.monotonic() > deadline:
+                child.terminate()
+                child.join()
+                raise RuntimeError(f"Child process timed out after {timeout:.0f}s")
+    child.join()
+    if status != 'ok':
+        raise RuntimeError(payload)
+    return payload
+
+def run_in_child(name, corpus, iterations, timeout=CHILD_TIMEOUT_SECONDS):
+    """
+    Run a benchmark in a forked child so peak RSS belongs to that benchmark alone
+
+    Falls back to the current process where fork is unavailable.
+    """
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        return run_benchmark(name, corpus, iterations)
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    child = context.Process(target=_run_isolated, args=(name, corpus, iterations, queue))
+    child.start()
+    return wait_for_child(child, queue, timeout)
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def compare(results, baseline_path):
+    """Print the p50 and throughput change of every benchmark against a previous run"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['benchmarks']
+    print(f"\n{'benchmark':<24}{'p50 ms':>12}{'change':>10}{'ops/sec':>12}{'change':>10}")
+    for name, stats in results['benchmarks'].items():
+        old = baseline.get(name)
+        if not old or 'p50Ms' not in stats or 'p50Ms' not in old:
+            continue
+        p50_change = (stats['p50Ms'] - old['p50Ms']) / old['p50Ms'] * 100 if old['p50Ms'] else 0
+        ops_change = (stats['opsPerSec'] - old['opsPerSec']) / old['opsPerSec'] * 100 if old['opsPerSec'] else 0
+        print(f"{name:<24}{stats['p50Ms']:>12.2f}{p50_change:>+9.1f}%{stats['opsPerSec']:>12.2f}{ops_change:>+9.1f}%")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the resume extraction and scoring pipeline')
+    parser.add_argument('--count', type=int, default=30, help='Number of generated resumes')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus seed')
+    parser.add_argument('--sizes', default='small,medium,large', help='Comma separated resume sizes')
+    parser.add_argument('--iterations', type=int, default=1, help='Passes over the corpus per benchmark')
+    parser.add_argument('--only', default='', help='Comma separated benchmarks to run (default: all)')
+    parser.add_argument('--corpus-dir', help='Where to write the corpus (default: a temp directory)')
+    parser.add_argument('--no-isolate', action='store_true', help='Run every benchmark in this process')
+    parser.add_argument('--timeout', type=float, default=CHILD_TIMEOUT_SECONDS,
+                        help='Seconds an isolated benchmark may run before it is terminated')
+    parser.add_argument('--output', help='JSON file for the results (default: print only)')
+    parser.add_argument('--compare', help='Previous results JSON to compare against')
+    args = parser.parse_args(argv)
+
+    names = [name for name in args.only.split(',') if name] or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(unknown)} (choose from {', '.join(BENCHMARKS)})")
+
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix='bench-corpus-')
+    corpus = generate_corpus(corpus_dir, args.count, args.seed, tuple(args.sizes.split(',')))
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'gitCommit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpuCount': os.cpu_count(),
+            'corpus': {'count': args.count, 'seed': args.seed, 'sizes': args.sizes},
+            'iterations': args.iterations,
+            'isolated': not args.no_isolate,
+        },
+        'benchmarks': {}
+    }
+
+    try:
+        for name in names:
+            print(f"Running {name}...", file=sys.stderr)
+            try:
+                if args.no_isolate:
+                    stats = run_benchmark(name, corpus, args.iterations)
+                else:
+                    stats = run_in_child(name, corpus, args.iterations, args.timeout)
+            except Exception as e:
+                stats = {'error': str(e)}
+            results['benchmarks'][name] = stats
+            print(f"  {json.dumps(stats)}", file=sys.stderr)
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        compare(results, args.compare)
+    return results
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Stored result size and encode/decode time per Celery serializer setting
+
+Runs process_resume eagerly over a generated corpus, then encodes each
+result's backend metadata the way the result backend stores it with every
+combination of CELERY_SERIALIZER and CELERY_RESULT_COMPRESSION.
+
+Usage (from the nlp directory):
+
+    python -m benchmarks.serialization --count 12
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+import benchmarks.run as bench
+from benchmarks.corpus import generate_corpus
+
+def collect_results(corpus):
+    """Real process_resume results for the corpus, as the worker would store them"""
+    from utils.tasks import process_resume
+    work_dir = tempfile.mkdtemp(prefix='bench-serialization-')
+    results = []
+    try:
+        for item in corpus:
+            path = os.path.join(work_dir, os.path.basename(item['path']))
+            shutil.copyfile(item['path'], path)
+            result = process_resume.apply(args=(path, bench.JOB_DESCRIPTION, bench.JOB_SKILLS, bench.JOB_CATEGORY)).get()
+            results.append({'status': 'SUCCESS', 'result': result, 'traceback': None, 'children': [],
+                            'date_done': '2024-01-01T00:00:00.000000', 'task_id': 'x' * 36})
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+def measure(metas, serializer, compression, iterations):
+    from kombu.serialization import dumps, loads
+    from utils.serialization import celery_serialization_settings
+    name = celery_serialization_settings(serializer, compression)['result_serializer']
+    if name != (f"{serializer}+zlib" if compression else serializer):
+        return None  # e.g. msgpack is not installed
+
+    payloads = [dumps(meta, serializer=name) for meta in metas]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        encoded = [dumps(meta, serializer=name) for meta in metas]
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for content_type, encoding, payload in encoded:
+            loads(payload, content_type, encoding, accept=[content_type])
+    decode_time = time.perf_counter() - start
+
+    sizes = [len(payload if isinstance(payload, bytes) else payload.encode('utf-8')) for _, _, payload in payloads]
+    operations = iterations * len(metas)
+    return {
+        'serializer': name,
+        'meanBytes': round(sum(sizes) / len(sizes), 1),
+        'maxBytes': max(sizes),
+        'encodeUs': round(encode_time / operations * 1e6, 2),
+        'decodeUs': round(decode_time / operations * 1e6, 2),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare result serializers on real process_resume results')
+    parser.add_argument('--count', type=int, default=12, help='Number of generated resumes')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus seed')
+    parser.add_argument('--iterations', type=int, default=200, help='Encode/decode passes per serializer')
+    parser.add_argument('--output', help='JSON file for the results (default: print only)')
+    args = parser.parse_args(argv)
+
+    corpus_dir = tempfile.mkdtemp(prefix='bench-corpus-')
+    try:
+        metas = collect_results(generate_corpus(corpus_dir, args.count, args.seed))
+    finally:
+        shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    rows = [measure(metas, serializer, compression, args.iterations)
+            for serializer in ('json', 'msgpack') for compression in ('', 'zlib')]
+    rows = [row for row in rows if row]
+    baseline = rows[0]['meanBytes']
+    print(f"\n{'serializer':<16}{'mean bytes':>12}{'vs json':>10}{'encode us':>12}{'decode us':>12}", file=sys.stderr)
+    for row in rows:
+        print(f"{row['serializer']:<16}{row['meanBytes']:>12.0f}{row['meanBytes'] / baseline:>9.0%} "
+              f"{row['encodeUs']:>11.1f}{row['decodeUs']:>12.1f}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'count': args.count, 'seed': args.seed, 'serializers': rows}, f, indent=2)
+    return rows
+
+if __name__ == '__main__':
+    main()
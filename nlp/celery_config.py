@@ -5,82 +5,153 @@ Celery configuration for NLP Resume Screening Tool
 
 import os
 import sys
-import socket
+import json
+import time
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 # Add error handling for celery import
 try:
     from celery import Celery
-    print("✓ Celery imported successfully")
 except ImportError as e:
     print(f"❌ Failed to import Celery: {e}")
     print("Make sure you're in the virtual environment and Celery is installed:")
     print("pip install celery")
     sys.exit(1)
 
-# Define potential Redis hosts to try (in order of preference)
-redis_hosts = [
+from celery.signals import setup_logging
+from utils.serialization import celery_serialization_settings
+from utils.logging_config import configure_logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Potential Redis hosts to try when CELERY_BROKER_URL is not set (in order of preference)
+REDIS_HOSTS = [h for h in [
     'localhost',          # Standard localhost
     '127.0.0.1',          # IPv4 localhost
     '172.17.0.1',         # Common Docker bridge
     '192.168.1.1',        # Common WSL2 host address
     '::1',                # IPv6 localhost
-    # Add any potential WSL IP address here
     os.environ.get('WSL_HOST_IP', '')  # Use environment variable if set
-]
+] if h]
 
-# Filter out empty values
-redis_hosts = [h for h in redis_hosts if h]
+DEFAULT_BROKER_URL = 'redis://localhost:6379/0'
+# Connect/read timeout in seconds of each Redis probe
+BROKER_PROBE_TIMEOUT = float(os.environ.get('BROKER_PROBE_TIMEOUT', '0.5'))
+# The discovered broker is shared with other processes through this file for BROKER_CACHE_SECONDS
+BROKER_STATE_FILE = os.environ.get(
+    'BROKER_STATE_FILE', os.path.join(tempfile.gettempdir(), 'nlp_celery_broker.json'))
+BROKER_CACHE_SECONDS = int(os.environ.get('BROKER_CACHE_SECONDS', '86400'))
 
-# Get broker and backend URLs from environment or try multiple hosts
-broker_url = os.environ.get('CELERY_BROKER_URL')
-result_backend = os.environ.get('CELERY_RESULT_BACKEND')
+def redis_url(host, port=6379, db=0):
+    if ':' in host:
+        host = f"[{host}]"
+    return f"redis://{host}:{port}/{db}"
 
-if not broker_url:
-    # Try to find a working Redis server
-    for host in redis_hosts:
+def probe_redis(url, timeout=None):
+    """Return True if a Redis server answers PING at url within timeout seconds"""
+    timeout = BROKER_PROBE_TIMEOUT if timeout is None else timeout
+    try:
+        import redis
+        client = redis.Redis.from_url(url, socket_connect_timeout=timeout, socket_timeout=timeout)
         try:
-            # Try to connect to Redis
-            import redis
-            test_url = f'redis://{host}:6379/0'
-            print(f"Testing Redis connection to: {test_url}")
-            
-            r = redis.Redis.from_url(test_url)
-            r.ping()  # Will raise an exception if connection fails
-            
-            # If successful, use this host
-            broker_url = test_url
-            result_backend = test_url
-            print(f"✓ Successfully connected to Redis at {host}")
-            break
-        except Exception as e:
-            print(f"Cannot connect to Redis at {host}: {e}")
-    
-    # If all attempts failed, fall back to default
-    if not broker_url:
-        print("! Could not find working Redis server, using localhost as fallback")
-        broker_url = 'redis://localhost:6379/0'
-        result_backend = 'redis://localhost:6379/0'
-else:
-    print(f"Using environment-provided Redis URL: {broker_url}")
+            return bool(client.ping())
+        finally:
+            client.close()
+    except Exception as e:
+        logger.debug("Cannot connect to Redis at %s: %s", url, e)
+        return False
+
+def read_cached_broker(state_file=None):
+    """Broker URL discovered by an earlier process, or None if missing or stale"""
+    state_file = state_file or BROKER_STATE_FILE
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if time.time() - state.get('discoveredAt', 0) < BROKER_CACHE_SECONDS:
+            return state.get('brokerUrl')
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+def write_cached_broker(url, state_file=None):
+    state_file = state_file or BROKER_STATE_FILE
+    temp_path = f"{state_file}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'brokerUrl': url, 'discoveredAt': time.time()}, f)
+        os.replace(temp_path, state_file)
+    except OSError as e:
+        logger.warning("Could not save broker state to %s: %s", state_file, e)
+
+def discover_broker_url(hosts=None, state_file=None):
+    """
+    Find a working Redis server for the broker and result backend
+
+    The URL cached in the state file is tried first with a single probe.
+    Otherwise all hosts are probed in parallel with BROKER_PROBE_TIMEOUT, so
+    unreachable addresses cost one timeout in total, and the most preferred
+    answering host is cached for other processes.
+
+    Returns:
+        Redis URL (DEFAULT_BROKER_URL if no server answered)
+    """
+    cached = read_cached_broker(state_file)
+    if cached and probe_redis(cached):
+        return cached
+
+    urls = [redis_url(host) for host in (REDIS_HOSTS if hosts is None else hosts)]
+    if urls:
+        with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+            answered = list(executor.map(probe_redis, urls))
+        for url, ok in zip(urls, answered):
+            if ok:
+                logger.info("Discovered Redis at %s", url)
+                write_cached_broker(url, state_file)
+                return url
+
+    logger.warning("Could not find working Redis server, using %s as fallback", DEFAULT_BROKER_URL)
+    return DEFAULT_BROKER_URL
+
+def resolve_broker_urls():
+    """
+    Broker and result backend settings, resolved on first use of app.conf
+
+    CELERY_BROKER_URL / CELERY_RESULT_BACKEND take precedence; discovery only
+    runs when no broker is configured.
+    """
+    broker_url = os.environ.get('CELERY_BROKER_URL') or discover_broker_url()
+    result_backend = os.environ.get('CELERY_RESULT_BACKEND') or broker_url
+    return {'broker_url': broker_url, 'result_backend': result_backend}
 
 # Create Celery application
 app = Celery(
     'nlp',
-    broker=broker_url,
-    backend=result_backend,
     include=['utils.tasks']  # Make sure this path exists
 )
+# Lazy: importing this module does not touch the network
+app.add_defaults(resolve_broker_urls)
+
+@setup_logging.connect
+def configure_worker_logging(loglevel=None, logfile=None, **kwargs):
+    """Use the central queue-based logging in the worker instead of Celery's own handlers"""
+    configure_logging(log_file=logfile, level=loglevel)
 
 # Configure Celery settings
 app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
+    # json by default; msgpack and result compression via CELERY_SERIALIZER / CELERY_RESULT_COMPRESSION
+    **celery_serialization_settings(),
     timezone='UTC',
     enable_utc=True,
     task_track_started=True,
+    # Full results are only kept briefly in Redis; utils.result_store keeps summaries and durable copies
+    result_expires=int(os.environ.get('RESULT_EXPIRES_SECONDS', '3600')),
     task_time_limit=300,  # 5 minute time limit per task
     worker_prefetch_multiplier=1,  # Prefetch only one task at a time
+    # Pool processes warm up their models before reporting ready (utils.worker_bootstrap)
+    worker_proc_alive_timeout=float(os.environ.get('WORKER_PROC_ALIVE_TIMEOUT', '60')),
     # Windows-specific settings
     worker_pool='solo' if os.name == 'nt' else 'prefork',
     # Remove task routes to use default queue
@@ -97,31 +168,26 @@ def health_check():
     return {
         'status': 'healthy',
         'message': 'Celery worker is running',
-        'broker': broker_url
+        'broker': app.conf.broker_url
     }
 
 # Print configuration details for debugging
 if __name__ == '__main__':
+    broker_url = app.conf.broker_url
     print("=" * 50)
     print("Celery Configuration")
     print("=" * 50)
     print(f"Broker URL: {broker_url}")
-    print(f"Result Backend: {result_backend}")
+    print(f"Result Backend: {app.conf.result_backend}")
     print(f"Python Version: {sys.version}")
     print(f"Python Executable: {sys.executable}")
     print("=" * 50)
     
     # Test Redis connection
-    try:
-        import redis
-        r = redis.Redis.from_url(broker_url)
-        r.ping()
+    if probe_redis(broker_url, timeout=2):
         print("✓ Redis connection successful")
-    except Exception as e:
-        print(f"❌ Redis connection failed: {e}")
+    else:
+        print(f"❌ Redis connection failed: {broker_url}")
         print("Make sure Redis server is running")
     
     print("Configuration complete!")
-else:
-    print(f"Celery configured with broker: {broker_url}")
-    print(f"Celery result backend: {result_backend}")
\ No newline at end of file
@@ -325,8 +325,13 @@ def test_full_processing_pipeline(sample_file=None):
         job_description = "We are looking for a skilled software developer with Python experience."
         job_skills = ["python", "javascript", "django"]
         
-        score = calculate_match_score(text, job_description, skills, job_skills)
-        print(f"{SUCCESS} Match score calculation successful: {score}")
+        result = calculate_match_score(text, job_description, skills, job_skills)
+        print(f"{SUCCESS} Match score calculation successful: {result.score}")
+        for name, component in result.to_dict()['components'].items():
+            print(f"  {name}: {component['score']} x {component['weight']} ({component['method']})")
+        if result.fallbacks:
+            print(f"{WARNING} Fallbacks used: {', '.join(result.fallbacks)}")
+        print(f"  Timings (ms): {result.to_dict()['timings']}")
         
     except Exception as e:
         print(f"{FAILURE} Full pipeline test error: {str(e)}")
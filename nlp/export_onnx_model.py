@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Export the SBERT model to ONNX (float32 and int8) for EMBEDDING_BACKEND=onnx
+
+Writes <ONNX_MODEL_DIR>/<model>/ with model.onnx, model_int8.onnx (dynamic
+int8 quantization), the tokenizer and embedding_config.json, then checks
+that the ONNX backend agrees with sentence-transformers on synthetic
+resumes and job descriptions. Exits with status 1 if the agreement is below
+--min-cosine, so a bad export is never deployed.
+
+Usage (from the nlp directory):
+
+    python export_onnx_model.py
+    python export_onnx_model.py --verify-only --model-file model.onnx
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import numpy as np
+
+from utils.embeddings import SBERT_MODEL, ONNX_MODEL_FILE, OnnxEncoder, onnx_model_path, load_sentence_transformer
+from utils.calculate_score import clean_similarity_text
+
+def pooling_config(st_model):
+    """Pooling and normalization of a SentenceTransformer, as OnnxEncoder applies them"""
+    modules = list(st_model)
+    pooling = next((module for module in modules if type(module).__name__ == 'Pooling'), None)
+    mode = pooling.get_pooling_mode_str() if pooling is not None else 'mean'
+    if mode not in ('mean', 'cls'):
+        raise ValueError(f"Unsupported pooling mode for the ONNX backend: {mode}")
+    return {
+        'pooling': mode,
+        'normalize': any(type(module).__name__ == 'Normalize' for module in modules),
+        'max_seq_length': st_model.max_seq_length,
+        'dimension': st_model.get_sentence_embedding_dimension(),
+    }
+
+def export(model_name, out_dir, opset=14):
+    """
+    Export the transformer of a sentence-transformers model and quantize it
+
+    Only the transformer runs in ONNX Runtime; pooling and normalization are
+    cheap and done in numpy by OnnxEncoder.
+
+    Returns:
+        The embedding config written next to the model
+    """
+    import torch
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    st_model = load_sentence_transformer(model_name)
+    transformer = st_model[0].auto_model
+    tokenizer = st_model.tokenizer
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer.save_pretrained(out_dir)
+
+    sample = tokenizer(['Software engineer with Python and Flask experience'], return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+
+    float_path = os.path.join(out_dir, 'model.onnx')
+    transformer.eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer, tuple(sample[name] for name in input_names), float_path,
+            input_names=input_names, output_names=['last_hidden_state'],
+            dynamic_axes=dynamic_axes, opset_version=opset, do_constant_folding=True
+        )
+    quantize_dynamic(float_path, os.path.join(out_dir, 'model_int8.onnx'), weight_type=QuantType.QInt8)
+
+    config = dict(pooling_config(st_model), model=model_name, opset=opset)
+    with open(os.path.join(out_dir, 'embedding_config.json'), 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+    return config
+
+def sample_texts(count, seed=42):
+    """Cleaned resume and job description texts, as calculate_match_score feeds them to the model"""
+    from benchmarks.corpus import generate_resume_text, generate_jobs, RESUME_SIZES
+    rng = random.Random(seed)
+    resumes = [generate_resume_text(rng, rng.choice(list(RESUME_SIZES))) for _ in range(count)]
+    jobs = [job['description'] for job in generate_jobs(seed)]
+    return [clean_similarity_text(text) for text in resumes], [clean_similarity_text(text) for text in jobs]
+
+def _normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return matrix / np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+
+def _timed_encode(model, texts, repeats=3):
+    model.encode(texts[:2])
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        embeddings = model.encode(texts, batch_size=32)
+    return np.asarray(embeddings), (time.perf_counter() - start_time) / repeats
+
+def verify(model_name, path, model_file=None, count=40, min_cosine=0.98):
+    """
+    Compare the ONNX backend with sentence-transformers
+
+    Checks the cosine between both embeddings of every text and how far the
+    resume/job similarities (the text similarity component of the match
+    score, in points out of 100) move.
+
+    Returns:
+        Report dict; report['passed'] is False if any text is below min_cosine
+    """
+    resumes, jobs = sample_texts(count)
+    texts = resumes + jobs
+    reference, reference_seconds = _timed_encode(load_sentence_transformer(model_name), texts)
+    encoded, onnx_seconds = _timed_encode(OnnxEncoder(path, model_file), texts)
+
+    reference, encoded = _normalize(reference), _normalize(encoded)
+    agreement = np.sum(reference * encoded, axis=1)
+    reference_scores = reference[:len(resumes)] @ reference[len(resumes):].T * 100
+    onnx_scores = encoded[:len(resumes)] @ encoded[len(resumes):].T * 100
+    return {
+        'model': model_name,
+        'modelFile': model_file or ONNX_MODEL_FILE,
+        'texts': len(texts),
+        'minCosine': round(float(agreement.min()), 5),
+        'meanCosine': round(float(agreement.mean()), 5),
+        'maxSimilarityDelta': round(float(np.abs(reference_scores - onnx_scores).max()), 3),
+        'torchSeconds': round(reference_seconds, 4),
+        'onnxSeconds': round(onnx_seconds, 4),
+        'speedup': round(reference_seconds / onnx_seconds, 2) if onnx_seconds else None,
+        'minCosineRequired': min_cosine,
+        'passed': bool(agreement.min() >= min_cosine),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=SBERT_MODEL, help='sentence-transformers model name')
+    parser.add_argument('--out', help='Output directory (default <ONNX_MODEL_DIR>/<model>)')
+    parser.add_argument('--opset', type=int, default=14)
+    parser.add_argument('--model-file', default=None, help='ONNX file to verify (default ONNX_MODEL_FILE)')
+    parser.add_argument('--texts', type=int, default=40, help='Synthetic resumes used for verification')
+    parser.add_argument('--min-cosine', type=float, default=0.98,
+                        help='Lowest acceptable cosine between torch and ONNX embeddings of a text')
+    parser.add_argument('--verify-only', action='store_true', help='Verify an existing export')
+    args = parser.parse_args(argv)
+
+    out_dir = args.out or onnx_model_path(args.model)
+    if not args.verify_only:
+        config = export(args.model, out_dir, args.opset)
+        print(f"Exported {args.model} to {out_dir}: {config}")
+
+    report = verify(args.model, out_dir, args.model_file, args.texts, args.min_cosine)
+    with open(os.path.join(out_dir, 'verification.json'), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    if not report['passed']:
+        print(f"ONNX embeddings disagree with sentence-transformers (min cosine {report['minCosine']})")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+gunicorn settings of the NLP API (the Docker CMD)
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting below can be overridden with the environment variable next
+to it. The API only validates, stores and queues uploads (extraction runs
+in the Celery workers), so workers mostly wait on the network:
+
+- gthread (default): GUNICORN_WORKERS processes x GUNICORN_THREADS threads
+- gevent: GUNICORN_WORKER_CONNECTIONS concurrent connections per process;
+  preferred when many clients hold /api/task/<id>/events streams open
+
+Send HUP to the master for a graceful reload (new workers are started with
+the new code while the old ones finish their requests); TERM stops
+gracefully within GUNICORN_GRACEFUL_TIMEOUT.
+"""
+
+import os
+import time
+import tempfile
+import multiprocessing
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '5002')}")
+workers = int(os.environ.get('GUNICORN_WORKERS', str(min(multiprocessing.cpu_count() * 2 + 1, 9))))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '1000'))
+
+# Import the app once in the master; workers are forked from it
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# Seconds a worker may stay silent before it is killed and replaced
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+# Seconds an idle keep-alive connection is held; above the keep-alive of a load balancer in front, if any
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+# Recycle workers now and then so slow leaks cannot accumulate
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+backlog = int(os.environ.get('GUNICORN_BACKLOG', '2048'))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+# Worker heartbeats go to memory rather than a possibly slow container filesystem
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+if worker_class == 'gevent':
+    # wsgi.py monkey-patches before importing the app, which preload_app does in the master
+    os.environ.setdefault('WSGI_GEVENT', '1')
+
+# Workers dump their request metrics here so /metrics merges every worker (see utils.metrics)
+if not os.environ.get('METRICS_DIR'):
+    os.environ['METRICS_DIR'] = tempfile.mkdtemp(prefix='nlp-api-metrics-')
+METRICS_DUMP_INTERVAL = float(os.environ.get('METRICS_DUMP_INTERVAL', '5'))
+_last_metrics_dump = [0.0]
+
+def post_request(worker, req, environ, resp):
+    if time.monotonic() - _last_metrics_dump[0] >= METRICS_DUMP_INTERVAL:
+        _last_metrics_dump[0] = time.monotonic()
+        from utils.metrics import dump_metrics
+        dump_metrics()
+
+def worker_exit(server, worker):
+    # Keep the worker's counts but drop its gauges from the merged /metrics
+    from utils.metrics import retire_metrics
+    retire_metrics()
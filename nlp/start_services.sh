@@ -37,6 +37,20 @@ mkdir -p logs
 > logs/nlp_service.log
 > logs/celery_worker.log
 
+# Start the shared embedding server first when the API and workers use it
+if [ "$EMBEDDING_BACKEND" = "remote" ]; then
+  echo "Starting embedding server..."
+  > logs/embedding_server.log
+  python -m utils.embedding_server > logs/embedding_server.log 2>&1 &
+  EMBEDDING_PID=$!
+  # Workers fall back to their own model if the server is not up when they first encode
+  for i in $(seq 1 60); do
+    curl -sf http://127.0.0.1:${EMBEDDING_SERVER_PORT:-8765}/health > /dev/null && break
+    sleep 1
+  done
+  echo "Embedding server started with PID: $EMBEDDING_PID"
+fi
+
 # Start Celery worker in background
 echo "Starting Celery worker..."
 celery -A celery_config worker --loglevel=info > logs/celery_worker.log 2>&1 &
@@ -81,10 +95,11 @@ echo "- NLP service: PID $FLASK_PID"
 echo ""
 echo "Logs:"
 echo "- Celery: logs/celery_worker.log"
+[ -n "$EMBEDDING_PID" ] && echo "- Embedding server: logs/embedding_server.log (PID $EMBEDDING_PID)"
 echo "- NLP service: logs/nlp_service.log"
 echo ""
-echo "To stop services, run: kill $CELERY_PID $FLASK_PID"
-echo "Or use: pkill -f 'celery|app.py'"
+echo "To stop services, run: kill $CELERY_PID $FLASK_PID $EMBEDDING_PID"
+echo "Or use: pkill -f 'celery|app.py|embedding_server'"
 echo ""
 echo "API Endpoints:"
 echo "- NLP service: http://localhost:5002/"
@@ -0,0 +1,9 @@
+import pytest
+from utils import result_store
+
+@pytest.fixture(autouse=True)
+def isolated_result_store(monkeypatch, tmp_path):
+    """Keep results retained by eagerly run tasks out of nlp/result_store"""
+    directory = str(tmp_path / 'result_store')
+    monkeypatch.setattr(result_store, 'RESULT_STORE_DIR', directory)
+    monkeypatch.setattr(result_store._result_store, 'directory', directory)
@@ -0,0 +1,68 @@
+import io
+import os
+import zipfile
+from benchmarks.corpus import generate_corpus
+
+JOB_DESCRIPTION = "Python developer with Flask, Django and REST API experience"
+
+def fake_extract_batch(resume_texts, job_skills=None):
+    """Stands in for the spaCy batch extractor, so the test does not depend on an installed model"""
+    for position, text in enumerate(resume_texts):
+        yield position, {'candidateName': f'Candidate {position}', 'contactInfo': {}, 'skills': ['python'],
+                         'education': [], 'experience': [], 'projects': []}
+
+def test_batch_reports_each_file_and_isolates_failures(tmp_path, monkeypatch):
+    from utils import tasks
+    from utils.tasks import process_resume_batch
+    monkeypatch.setattr(tasks, 'iter_extract_resumes_batch', fake_extract_batch)
+    corpus = generate_corpus(str(tmp_path / 'corpus'), count=2, seed=3, sizes=('small',))
+    broken = tmp_path / 'broken.pdf'
+    broken.write_bytes(b'%PDF-1.4\nthis is not a parsable pdf')
+    paths = [corpus[0]['path'], str(broken), corpus[1]['path']]
+    names = ['first' + os.path.splitext(paths[0])[1], 'broken.pdf', 'second' + os.path.splitext(paths[2])[1]]
+
+    result = process_resume_batch.apply(
+        args=(paths, JOB_DESCRIPTION, ['Python', 'Flask'], 'Python Developer'),
+        kwargs={'file_names': names}
+    ).get()
+
+    assert result['success'] is True
+    assert (result['total'], result['processed'], result['failed']) == (3, 2, 1)
+    assert [r['fileName'] for r in result['results']] == names
+    assert [r['success'] for r in result['results']] == [True, False, True]
+    assert 'Text extraction failed' in result['results'][1]['message']
+    assert result['results'][0]['data']['matchScore'] > 0
+    assert [stage['stage'] for stage in result['timings']['stages']] == ['batch_extract_text', 'batch_embed', 'batch_score']
+    # Inputs are removed whether they were processed or not
+    assert not any(os.path.exists(path) for path in paths)
+
+def test_batch_endpoint_queues_allowed_files(monkeypatch, tmp_path):
+    import app as app_module
+    queued = {}
+    monkeypatch.setitem(app_module.app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    monkeypatch.setattr(app_module.process_resume_batch, 'apply_async',
+                        lambda args, kwargs, task_id: queued.update(args=args, kwargs=kwargs, task_id=task_id))
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zip_file:
+        zip_file.writestr('three.docx', b'PK\x03\x04 docx')
+        zip_file.writestr('renamed.docx', b'<html>not a docx</html>')
+    archive.seek(0)
+
+    client = app_module.app.test_client()
+    response = client.post('/api/process-batch', data={
+        'jobDescription': JOB_DESCRIPTION,
+        'jobCategory': 'Python Developer',
+        'requiredSkills': 'Python, Flask',
+        'resumes': [(io.BytesIO(b'%PDF-1.4 one'), 'one.pdf'), (io.BytesIO(b'notes'), 'notes.txt'),
+                    (io.BytesIO(b'<html>renamed</html>'), 'renamed.pdf'), (io.BytesIO(b'%PDF-1.4 two'), 'two.pdf')],
+        'archive': (archive, 'more.zip')
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body['files'] == ['one.pdf', 'two.pdf', 'three.docx']
+    assert body['skipped'] == ['notes.txt', 'renamed.pdf', 'renamed.docx']
+    file_paths, _, job_skills, _ = queued['args']
+    assert job_skills == ['Python', 'Flask'] and queued['task_id'] == body['batchId']
+    assert all(os.path.dirname(path) == str(tmp_path) for path in file_paths)
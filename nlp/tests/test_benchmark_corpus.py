@@ -0,0 +1,58 @@
+import os
+import time
+import random
+import multiprocessing
+import pytest
+import benchmarks.run as bench
+from benchmarks.corpus import generate_corpus, generate_resume, near_duplicate, resume_text
+from utils.extract_text import extract_text
+
+def test_corpus_is_deterministic(tmp_path):
+    first = generate_corpus(str(tmp_path / 'a'), count=6, seed=3, table_rate=0.5, duplicate_rate=0.3)
+    second = generate_corpus(str(tmp_path / 'b'), count=6, seed=3, table_rate=0.5, duplicate_rate=0.3)
+    assert [entry['text'] for entry in first] == [entry['text'] for entry in second]
+    assert (tmp_path / 'a' / 'manifest.json').exists()
+    assert (tmp_path / 'a' / 'jobs.json').read_text() == (tmp_path / 'b' / 'jobs.json').read_text()
+
+    # Resume N does not depend on how many were generated
+    shorter = generate_corpus(str(tmp_path / 'c'), count=3, seed=3, table_rate=0.5, duplicate_rate=0.3)
+    assert [entry['text'] for entry in shorter] == [entry['text'] for entry in first[:3]]
+
+def test_table_cells_survive_extraction(tmp_path):
+    from benchmarks.corpus import write_docx, write_pdf
+    resume = generate_resume(random.Random(1), 'small', category='python_developer', tables=True)
+    skill = resume['blocks'][next(i for i, block in enumerate(resume['blocks']) if block[0] == 'table')][1][0][0]
+    for writer, suffix in ((write_docx, '.docx'), (write_pdf, '.pdf')):
+        path = str(tmp_path / f"resume{suffix}")
+        writer(resume, path)
+        assert skill in extract_text(path)
+
+def test_near_duplicate_keeps_most_content():
+    rng = random.Random(5)
+    resume = generate_resume(rng, 'medium')
+    variant = near_duplicate(resume, rng)
+    original_lines = set(resume_text(resume).split('\n'))
+    variant_lines = resume_text(variant).split('\n')
+    assert resume_text(variant) != resume_text(resume)
+    assert sum(line in original_lines for line in variant_lines) / len(variant_lines) > 0.7
+
+def _start_child(target):
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    child = context.Process(target=target, args=(queue,))
+    child.start()
+    return child, queue
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_child_that_dies_or_hangs_is_reported():
+    child, queue = _start_child(lambda queue: queue.put(('ok', {'ops': 1})))
+    assert bench.wait_for_child(child, queue) == {'ops': 1}
+
+    child, queue = _start_child(lambda queue: os._exit(3))
+    with pytest.raises(RuntimeError, match='exited with code 3'):
+        bench.wait_for_child(child, queue)
+
+    child, queue = _start_child(lambda queue: time.sleep(60))
+    with pytest.raises(RuntimeError, match='timed out'):
+        bench.wait_for_child(child, queue, timeout=1)
+    assert not child.is_alive()
@@ -0,0 +1,31 @@
+import time
+import celery_config
+from celery_config import discover_broker_url, redis_url, read_cached_broker
+
+def test_parallel_probe_prefers_first_host_and_caches(tmp_path, monkeypatch):
+    state_file = str(tmp_path / 'broker.json')
+    probed = []
+
+    def fake_probe(url, timeout=None):
+        probed.append(url)
+        time.sleep(0.2)
+        return url != redis_url('localhost')
+
+    monkeypatch.setattr(celery_config, 'probe_redis', fake_probe)
+    started = time.time()
+    url = discover_broker_url(['localhost', '127.0.0.1', '::1'], state_file=state_file)
+
+    assert url == 'redis://127.0.0.1:6379/0'
+    assert time.time() - started < 0.5
+    assert read_cached_broker(state_file) == url
+
+    probed.clear()
+    assert discover_broker_url(['localhost', '::1'], state_file=state_file) == url
+    assert probed == [url]
+
+def test_fallback_is_not_cached(tmp_path, monkeypatch):
+    state_file = str(tmp_path / 'broker.json')
+    monkeypatch.setattr(celery_config, 'probe_redis', lambda url, timeout=None: False)
+    assert discover_broker_url(['localhost'], state_file=state_file) == celery_config.DEFAULT_BROKER_URL
+    assert read_cached_broker(state_file) is None
+    assert redis_url('::1') == 'redis://[::1]:6379/0'
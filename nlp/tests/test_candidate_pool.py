@@ -0,0 +1,106 @@
+import os
+import multiprocessing
+import numpy as np
+import pytest
+from utils import candidate_pool
+from utils.calculate_score import calculate_match_score
+from utils.candidate_pool import CandidatePool, rank_candidates
+
+JOB_DESCRIPTION = "Python developer with Flask, Django and REST API experience"
+JOB_SKILLS = ["Python", "Flask", "SQL", "machine learning"]
+
+RESUMES = {
+    'alice': ("Alice Khan\nPython developer building Flask and Django APIs with pandas and numpy",
+              ["Python", "Flask", "Django", "Pandas"]),
+    'bob': ("Bob Ali\nFrontend engineer working with React, CSS and JavaScript",
+            ["React", "CSS", "JavaScript"]),
+    'carol': ("Carol Shah\nData scientist, deep machine learning research, SQL databases",
+              ["machine learning research", "SQL", "ml"]),
+    'dan': ("Dan Noor\nNo listed skills at all", []),
+}
+
+@pytest.fixture
+def pool(tmp_path):
+    rng = np.random.default_rng(7)
+    pool = CandidatePool('test', pool_dir=str(tmp_path))
+    embeddings = {name: rng.normal(size=8).astype(np.float32) for name in RESUMES}
+    for name, (text, skills) in RESUMES.items():
+        pool.add(name, text, skills, embeddings[name], metadata={'name': name})
+    return pool, embeddings, rng.normal(size=8).astype(np.float32)
+
+def test_rank_matches_single_resume_scoring(pool):
+    pool, embeddings, job_embedding = pool
+    ranking = rank_candidates(pool, JOB_DESCRIPTION, JOB_SKILLS, 'Python Developer',
+                              top_k=len(RESUMES), job_embedding=job_embedding)
+
+    assert ranking['poolSize'] == len(RESUMES)
+    for candidate in ranking['candidates']:
+        text, skills = RESUMES[candidate['candidateId']]
+        expected = calculate_match_score(text, JOB_DESCRIPTION, skills, JOB_SKILLS, 'Python Developer',
+                                         resume_embedding=embeddings[candidate['candidateId']],
+                                         job_embedding=job_embedding).score
+        assert candidate['matchScore'] == pytest.approx(expected, abs=0.11)
+
+def test_rank_returns_top_k_in_order(pool):
+    pool, _, job_embedding = pool
+    ranking = rank_candidates(pool, JOB_DESCRIPTION, JOB_SKILLS, 'Python Developer',
+                              top_k=2, job_embedding=job_embedding)
+
+    scores = [c['matchScore'] for c in ranking['candidates']]
+    assert len(scores) == 2
+    assert scores == sorted(scores, reverse=True)
+
+def test_compact_preserves_candidates_and_replaces_duplicates(pool):
+    pool, embeddings, job_embedding = pool
+    before = rank_candidates(pool, JOB_DESCRIPTION, JOB_SKILLS, 'Python Developer',
+                             top_k=10, job_embedding=job_embedding)
+    pool.compact()
+    text, skills = RESUMES['bob']
+    pool.add('bob', text, skills + ["Python", "Flask"], embeddings['bob'])
+
+    after = rank_candidates(pool, JOB_DESCRIPTION, JOB_SKILLS, 'Python Developer',
+                            top_k=10, job_embedding=job_embedding)
+    scores_before = {c['candidateId']: c['matchScore'] for c in before['candidates']}
+    scores_after = {c['candidateId']: c['matchScore'] for c in after['candidates']}
+
+    assert after['poolSize'] == len(RESUMES)
+    assert scores_after['alice'] == scores_before['alice']
+    assert scores_after['bob'] > scores_before['bob']
+
+def test_large_log_is_compacted_and_not_replayed(pool, monkeypatch):
+    pool, _, job_embedding = pool
+    monkeypatch.setattr(candidate_pool, 'POOL_COMPACT_THRESHOLD', len(RESUMES))
+    before = rank_candidates(pool, JOB_DESCRIPTION, JOB_SKILLS, 'Python Developer',
+                             top_k=10, job_embedding=job_embedding)
+    assert os.path.exists(pool.snapshot_path) and not os.path.exists(pool.log_path)
+
+    # A fresh process ranks from the snapshot alone
+    replayed = []
+    read_log = CandidatePool._read_log
+    monkeypatch.setattr(CandidatePool, '_read_log', lambda self, path: replayed.extend(read_log(self, path)) or [])
+    reloaded = CandidatePool('test', pool_dir=pool.pool_dir)
+    after = rank_candidates(reloaded, JOB_DESCRIPTION, JOB_SKILLS, 'Python Developer',
+                            top_k=10, job_embedding=job_embedding)
+
+    assert replayed == []
+    assert after['candidates'] == before['candidates']
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_concurrent_compactions_keep_every_candidate(tmp_path):
+    def add_and_compact(worker):
+        pool = CandidatePool('shared', pool_dir=str(tmp_path))
+        rng = np.random.default_rng(worker)
+        for index in range(15):
+            pool.add(f'{worker}-{index}', "Python developer with Flask", ["Python"], rng.normal(size=8))
+            pool.compact()
+
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=add_and_compact, args=(worker,)) for worker in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    ids = CandidatePool('shared', pool_dir=str(tmp_path)).load()['ids']
+    assert sorted(ids) == sorted(f'{worker}-{index}' for worker in range(4) for index in range(15))
@@ -0,0 +1,24 @@
+import numpy as np
+from utils import embedding_cache
+from utils.embedding_cache import EmbeddingCache
+
+def test_cache_encodes_each_job_once(monkeypatch):
+    calls = []
+
+    def fake_encode(texts):
+        calls.append(list(texts))
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+    monkeypatch.setattr(embedding_cache, 'encode_texts', fake_encode)
+    cache = EmbeddingCache(max_size=2)
+
+    first = cache.get_many(['Python developer', 'python   DEVELOPER', 'React engineer', ''])
+    assert calls == [['Python developer', 'React engineer']]
+    assert np.array_equal(first[0], first[1])
+    assert first[3] is None
+
+    second = cache.get_many(['React engineer', 'Go developer'])
+    assert calls[-1] == ['Go developer']
+    assert np.array_equal(second[0], first[2])
+    assert len(cache) == 2
+    assert cache.stats()['hits'] == 2
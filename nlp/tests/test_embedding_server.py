@@ -0,0 +1,41 @@
+import threading
+import numpy as np
+from utils import embeddings
+from utils.embeddings import EmbeddingProvider, RemoteEncoder
+from utils.embedding_server import start_embedding_server
+
+class SlowFakeModel:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, batch_size=32, convert_to_tensor=False):
+        self.calls += 1
+        threading.Event().wait(0.02)
+        return np.array([[len(text), text.count('a'), 1.0] for text in texts], dtype=np.float32)
+
+def test_remote_encoder_gets_batched_embeddings(monkeypatch):
+    model = SlowFakeModel()
+    monkeypatch.setattr(embeddings, 'load_sentence_transformer', lambda name: model)
+    provider = EmbeddingProvider('fake-model', 'torch')
+    server = start_embedding_server('127.0.0.1', 0, provider, max_batch=64, max_wait_ms=20, background=True)
+    try:
+        client = RemoteEncoder(f"http://127.0.0.1:{server.server_address[1]}", pool_size=8)
+        assert client.info['dimension'] == 3 and client.info['model'] == 'fake-model'
+
+        texts = [f"resume {'a' * index}" for index in range(16)]
+        results = [None] * len(texts)
+        def encode(index):
+            results[index] = client.encode(texts[index])
+        threads = [threading.Thread(target=encode, args=(index,)) for index in range(len(texts))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert np.allclose(np.stack(results), model.encode(texts))
+        # One warm-up call, then far fewer forward passes than requests
+        assert model.calls - 1 < len(texts) // 2
+        assert client.encode([]).shape == (0, 3)
+    finally:
+        server.shutdown()
+        server.server_close()
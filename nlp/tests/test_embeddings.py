@@ -0,0 +1,66 @@
+import numpy as np
+from utils import embeddings
+from utils.embeddings import EmbeddingProvider, get_embedding_provider, cos_sim
+from utils.sbert_scorer import SBERTScorer
+
+class FakeModel:
+    def encode(self, texts, batch_size=32, convert_to_tensor=False):
+        single = isinstance(texts, str)
+        rows = np.array([[len(text), text.count('a') + 1.0] for text in ([texts] if single else texts)], dtype=np.float32)
+        return rows[0] if single else rows
+
+def test_model_is_loaded_once_on_first_use_and_shared(monkeypatch):
+    loads = []
+    monkeypatch.setattr(embeddings, 'load_sentence_transformer', lambda name: loads.append(name) or FakeModel())
+    provider = EmbeddingProvider('fake-model')
+    assert not provider.loaded and loads == []
+
+    scorer = SBERTScorer(provider=provider)
+    provider.encode(['a resume', 'a job'])
+    assert scorer.calculate_score('python developer', 'python developer') == 100
+    assert loads == ['fake-model']
+    assert get_embedding_provider('shared') is get_embedding_provider('shared')
+
+def test_failed_load_is_not_retried(monkeypatch):
+    loads = []
+    def broken(name):
+        loads.append(name)
+        raise OSError('no model')
+    monkeypatch.setattr(embeddings, 'load_sentence_transformer', broken)
+    provider = EmbeddingProvider('missing-model')
+    assert not provider.available and not provider.available
+    assert loads == ['missing-model']
+
+def test_numpy_cosine_similarity():
+    similarities = cos_sim([1.0, 0.0], [[2.0, 0.0], [0.0, 3.0], [0.0, 0.0]])
+    assert similarities.shape == (1, 3)
+    assert np.allclose(similarities[0], [1.0, 0.0, 0.0])
+
+def test_onnx_backend_falls_back_to_torch_without_an_export(monkeypatch, tmp_path):
+    monkeypatch.setattr(embeddings, 'ONNX_MODEL_DIR', str(tmp_path))
+    monkeypatch.setattr(embeddings, 'load_sentence_transformer', lambda name: FakeModel())
+    assert isinstance(embeddings.load_model('not-exported', 'onnx'), FakeModel)
+
+class FakeTokenizer:
+    def __call__(self, texts, **kwargs):
+        width = max(len(text.split()) for text in texts)
+        mask = np.array([[1] * len(text.split()) + [0] * (width - len(text.split())) for text in texts])
+        return {'input_ids': mask * 7, 'attention_mask': mask}
+
+class FakeSession:
+    def run(self, outputs, feed):
+        # Every real token embeds to [1, 2]; padding would pull the mean towards [9, 9]
+        mask = feed['attention_mask'][..., None]
+        return [np.where(mask == 1, np.array([1.0, 2.0]), np.array([9.0, 9.0]))]
+
+def test_onnx_encoder_mean_pools_real_tokens_in_input_order():
+    encoder = embeddings.OnnxEncoder.__new__(embeddings.OnnxEncoder)
+    encoder.config = {'pooling': 'mean', 'normalize': True, 'max_seq_length': 128, 'dimension': 2}
+    encoder.tokenizer = FakeTokenizer()
+    encoder.session = FakeSession()
+    encoder.input_names = {'input_ids', 'attention_mask'}
+
+    result = encoder.encode(['short', 'a much longer text here', 'mid length'], batch_size=2)
+    assert result.shape == (3, 2)
+    assert np.allclose(result, np.array([1.0, 2.0]) / np.sqrt(5.0))
+    assert np.allclose(encoder.encode('one text'), result[0])
@@ -0,0 +1,38 @@
+import logging
+from utils.logging_config import log_payload
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+def make_logger(level):
+    logger = logging.getLogger(f'test_logging_config.{level}')
+    logger.propagate = False
+    logger.handlers = [ListHandler()]
+    logger.setLevel(level)
+    return logger
+
+class Payload:
+    formatted = 0
+
+    def __str__(self):
+        Payload.formatted += 1
+        return 'x' * 5000
+
+def test_payload_is_not_formatted_above_debug():
+    logger = make_logger(logging.INFO)
+    log_payload(logger, "Task %s result", Payload(), 'abc', sample_rate=1)
+    assert logger.handlers[0].records == [] and Payload.formatted == 0
+
+def test_sampled_payload_is_truncated():
+    logger = make_logger(logging.DEBUG)
+    log_payload(logger, "Task %s result", Payload(), 'abc', sample_rate=0)
+    assert logger.handlers[0].records == []
+
+    log_payload(logger, "Task %s result", Payload(), 'abc', sample_rate=1)
+    message = logger.handlers[0].records[0].getMessage()
+    assert message.startswith('Task abc result: xxx') and message.endswith('... (5000 chars)')
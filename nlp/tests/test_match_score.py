@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from utils.calculate_score import calculate_match_score, MatchScore
+
+RESUME = "Python developer with Flask, Django, pandas and SQL experience at a university lab"
+JOB = "Python developer with Flask and REST API experience"
+
+def test_breakdown_adds_up_to_score():
+    rng = np.random.default_rng(1)
+    result = calculate_match_score(RESUME, JOB, ["Python", "Flask"], ["python", "flask", "sql"],
+                                   'Python Developer', resume_embedding=rng.normal(size=8),
+                                   job_embedding=rng.normal(size=8))
+    breakdown = result.to_dict()
+
+    assert isinstance(result, MatchScore)
+    assert set(breakdown['components']) == {'textSimilarity', 'skillMatch', 'keywordMatch'}
+    weighted = sum(c.weighted for c in result.components) + result.variability
+    assert result.score == pytest.approx(min(max(round(weighted, 1), 15.0), 100.0))
+    assert breakdown['components']['textSimilarity']['method'] == 'precomputed_embeddings'
+    assert breakdown['components']['skillMatch']['details'] == {'fullMatches': 2, 'partialMatches': 0}
+    assert breakdown['fallbacks'] == []
+    assert {'category', 'textSimilarity', 'skillMatch', 'keywordMatch', 'total'} <= set(breakdown['timings'])
+
+def test_fallbacks_are_reported():
+    assert calculate_match_score("", JOB, [], []).fallbacks == ['empty_resume']
+    result = calculate_match_score(RESUME, JOB, [], ["python"], 'Python Developer',
+                                   resume_embedding=np.ones(4), job_embedding=np.ones(4))
+    assert result.fallbacks == ['skillMatch:default']
+
+def test_word_overlap_without_a_model(monkeypatch):
+    from utils import calculate_score
+
+    class UnavailableProvider:
+        loaded = available = False
+
+    monkeypatch.setattr(calculate_score, 'get_embedding_provider', lambda: UnavailableProvider())
+    result = calculate_match_score(RESUME, JOB, ["Python"], ["python"], 'Python Developer')
+    assert result.fallbacks == ['textSimilarity:word_overlap']
@@ -0,0 +1,140 @@
+import os
+import time
+import json
+import pytest
+import multiprocessing
+from utils import metrics
+from utils.metrics import Histogram, Trace, span, STAGE_DURATION
+
+def test_histogram_quantiles_and_exposition():
+    hist = Histogram('test_seconds', 'Test histogram', ('stage',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 2.0):
+        hist.observe(value, stage='a')
+
+    assert hist.quantile(0.5, stage='a') == pytest.approx(0.1)
+    assert hist.quantile(0.5, stage='missing') is None
+    lines = hist.render(hist.snapshot())
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{stage="a"} 4' in lines
+
+def test_span_records_outcome_in_trace():
+    trace = Trace()
+    with span('unit_ok', trace):
+        pass
+    with pytest.raises(ValueError):
+        with span('unit_fail', trace):
+            raise ValueError('boom')
+    with span('unit_fallback', trace) as stage:
+        stage.outcome = 'fallback'
+
+    outcomes = [(s['stage'], s['outcome']) for s in trace.to_dict()['stages']]
+    assert outcomes == [('unit_ok', 'ok'), ('unit_fail', 'error'), ('unit_fallback', 'fallback')]
+    assert STAGE_DURATION.snapshot()[('unit_fail', 'error')][-1] >= 0
+    assert trace.to_dict()['startedAt'] <= time.time()
+
+def test_collect_merges_dumps_of_other_processes(tmp_path):
+    with span('unit_merge'):
+        pass
+    other = {'resume_stage_duration_seconds': {json.dumps(['unit_merge', 'ok']): [2] + [0] * 15}}
+    (tmp_path / 'metrics_999999.json').write_text(json.dumps(other))
+
+    merged = metrics.collect(str(tmp_path))
+    assert sum(merged['resume_stage_duration_seconds'][('unit_merge', 'ok')][:-1]) == 3
+    assert 'stage="unit_merge",outcome="ok",le="+Inf"} 3' in metrics.render_prometheus(str(tmp_path))
+
+def test_counters_gauges_and_scrape_time_gauges():
+    count = metrics.Counter('test_total', 'Test counter', ('kind',))
+    count.inc(kind='a')
+    count.inc(2, kind='a')
+    level = metrics.Gauge('test_level', 'Test gauge')
+    level.inc(3)
+    level.dec()
+    computed = metrics.Gauge('test_computed', 'Scrape-time gauge', ('queue',))
+    computed.set_function(lambda: {('celery',): 7})
+
+    assert count.render(count.snapshot())[-1] == 'test_total{kind="a"} 3'
+    assert level.render(level.snapshot())[-1] == 'test_level 2'
+    assert computed.render(computed.collect_function())[-1] == 'test_computed{queue="celery"} 7'
+    assert '# TYPE test_level gauge' in level.render({})
+
+def test_scrape_time_gauge_is_cached():
+    calls = []
+    depth = metrics.Gauge('test_depth', 'Cached scrape-time gauge', ('queue',))
+    depth.set_function(lambda: calls.append(1) or {('celery',): len(calls)}, cache_seconds=60)
+    assert depth.collect_function() == depth.collect_function() == {('celery',): [1]}
+    assert len(calls) == 1
+
+def test_gauges_of_exited_processes_are_dropped(tmp_path):
+    import subprocess
+    exited = subprocess.Popen(['true'])
+    exited.wait()
+    for pid, in_progress in ((exited.pid, 5), (os.getppid(), 2)):
+        dump = {'celery_tasks_in_progress': {json.dumps(['unit_task']): [in_progress]},
+                'cache_requests_total': {json.dumps(['unit_cache', 'hit']): [4]}}
+        (tmp_path / f'metrics_{pid}.json').write_text(json.dumps(dump))
+
+    merged = metrics.collect(str(tmp_path))
+    assert merged['celery_tasks_in_progress'][('unit_task',)] == [2]
+    assert merged['cache_requests_total'][('unit_cache', 'hit')] == [8]
+
+def test_retired_process_keeps_counts_without_gauges(tmp_path):
+    metrics.TASKS_IN_PROGRESS.inc(task='unit_retire')
+    metrics.CACHE_REQUESTS.inc(cache='unit_retire', result='miss')
+    metrics.dump_metrics(str(tmp_path))
+    metrics.retire_metrics(str(tmp_path))
+    metrics.TASKS_IN_PROGRESS.dec(task='unit_retire')
+
+    assert not (tmp_path / f'metrics_{os.getpid()}.json').exists()
+    retired = json.loads((tmp_path / metrics.RETIRED_DUMP).read_text())
+    assert 'celery_tasks_in_progress' not in retired
+    assert retired['cache_requests_total'][json.dumps(['unit_retire', 'miss'])] == [1]
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_running_task_is_counted_by_other_processes(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+    from utils import tasks
+    monkeypatch.setattr(metrics, 'METRICS_DIR', str(tmp_path))
+    context = multiprocessing.get_context('fork')
+    started, finish = context.Event(), context.Event()
+
+    def run_task():
+        task = SimpleNamespace(name='unit_running')
+        tasks.start_task_timer(task_id='unit-task', task=task)
+        started.set()
+        finish.wait(10)
+        tasks.record_task_metrics(task_id='unit-task', task=task, retval={'success': True}, state='SUCCESS')
+
+    worker = context.Process(target=run_task)
+    worker.start()
+    try:
+        assert started.wait(10)
+        assert metrics.collect()['celery_tasks_in_progress'][('unit_running',)] == [1]
+    finally:
+        finish.set()
+        worker.join(10)
+    assert metrics.collect()['celery_tasks_in_progress'].get(('unit_running',), [0]) == [0]
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_forked_pool_processes_do_not_recount_parent_series(tmp_path, monkeypatch):
+    from utils import worker_bootstrap
+    monkeypatch.setattr(worker_bootstrap, 'WORKER_WARMUP', False)
+    metrics.MODEL_LOAD_DURATION.observe(1.0, model='unit_parent')
+    metrics.dump_metrics(str(tmp_path))
+
+    def pool_process():
+        worker_bootstrap.init_pool_process()
+        metrics.MODEL_LOAD_DURATION.observe(1.0, model='unit_child')
+        metrics.dump_metrics(str(tmp_path))
+
+    context = multiprocessing.get_context('fork')
+    children = [context.Process(target=pool_process) for _ in range(2)]
+    for child in children:
+        child.start()
+    for child in children:
+        child.join(30)
+        assert child.exitcode == 0
+
+    merged = metrics.collect(str(tmp_path))['model_load_duration_seconds']
+    assert sum(merged[('unit_parent',)][:-1]) == 1
+    assert sum(merged[('unit_child',)][:-1]) == 2
@@ -0,0 +1,51 @@
+import io
+import json
+import os
+from benchmarks.corpus import generate_corpus
+from utils.upload_store import UploadStore
+
+JOBS = [
+    {'jobId': 'backend', 'jobDescription': "Python developer with Flask, Django and REST API experience",
+     'requiredSkills': 'Python, Flask', 'jobCategory': 'Python Developer'},
+    {'jobId': 'frontend', 'jobDescription': "Frontend engineer building React and CSS interfaces",
+     'requiredSkills': ['React', 'CSS']},
+]
+
+def test_resume_is_scored_against_every_job(tmp_path):
+    from utils.tasks import process_resume_multi
+    path = generate_corpus(str(tmp_path), count=1, seed=3, sizes=('small',))[0]['path']
+
+    result = process_resume_multi.apply(args=(path, JOBS)).get()
+
+    assert result['success'] is True
+    jobs = result['data']['jobs']
+    assert [job['jobId'] for job in jobs] == ['backend', 'frontend']
+    assert result['data']['scores'] == [job['matchScore'] for job in jobs]
+    assert all(job['matchScore'] > 0 for job in jobs)
+    stages = [stage['stage'] for stage in result['timings']['stages']]
+    assert stages[:3] == ['validate', 'detect_category', 'extract_text'] and stages.count('score') == 2
+    assert not os.path.exists(path)
+
+def test_multi_endpoint_checks_file_content(monkeypatch, tmp_path):
+    import app as app_module
+    queued = []
+    monkeypatch.setattr(app_module, 'upload_store', UploadStore(str(tmp_path)))
+
+    class FakeTask:
+        id = 'task-1'
+
+    monkeypatch.setattr(app_module.process_resume_multi, 'delay',
+                        lambda file_path, jobs, callback_url=None: queued.append(file_path) or FakeTask)
+    client = app_module.app.test_client()
+
+    def post(content, name):
+        return client.post('/api/process-multi', data={'resume': (io.BytesIO(content), name), 'jobs': json.dumps(JOBS)},
+                           content_type='multipart/form-data')
+
+    renamed = post(b'<html>not a resume</html>', 'resume.pdf')
+    assert renamed.status_code == 400 and queued == []
+
+    response = post(b'%PDF-1.4 resume', 'resume.pdf')
+    assert response.status_code == 202
+    assert response.get_json()['jobs'] == len(JOBS)
+    assert len(queued) == 1 and os.path.dirname(queued[0]) == str(tmp_path)
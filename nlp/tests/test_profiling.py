@@ -0,0 +1,28 @@
+import pstats
+from types import SimpleNamespace
+import pytest
+from utils import profiling
+
+def busy(self, n):
+    return {'success': True, 'total': sum(i * i for i in range(n))}
+
+def test_profiled_task_writes_pstats_and_collapsed_stacks(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+    task = SimpleNamespace(request=SimpleNamespace(id='task-1'))
+    wrapped = profiling.profiled_task(busy)
+
+    assert 'profile' not in wrapped(task, 1000)
+    result = wrapped(task, 200000, profile=True)
+
+    assert result['profile']['taskId'] == 'task-1'
+    stats = pstats.Stats(profiling.profile_path('task-1', 'pstats'))
+    assert any(func[2] == 'busy' for func in stats.stats)
+    with open(profiling.profile_path('task-1', 'collapsed')) as f:
+        lines = f.read().splitlines()
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+
+def test_profile_path_rejects_traversal():
+    with pytest.raises(ValueError):
+        profiling.profile_path('../etc/passwd', 'pstats')
+    with pytest.raises(ValueError):
+        profiling.profile_path('task-1', 'zip')
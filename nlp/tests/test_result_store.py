@@ -0,0 +1,59 @@
+import os
+import time
+from utils.result_store import FileResultStore, retain_result, load_retained_result, load_summaries
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+class FakeBackend:
+    def __init__(self):
+        self.client = FakeRedis()
+
+RESULT = {
+    'success': True,
+    'message': 'Resume processed successfully',
+    'data': {
+        'candidateName': 'Sana Malik',
+        'contactInfo': {'email': 'Sana.Malik@example.com'},
+        'skills': ['python'] * 50,
+        'matchScore': 78.5,
+        'jobCategory': 'Python Developer',
+        'isShortlisted': True,
+    }
+}
+
+def test_retained_summary_is_slim_and_full_result_is_durable(tmp_path):
+    backend = FakeBackend()
+    store = FileResultStore(str(tmp_path))
+    summary = retain_result(backend, 'task-1', 'process_resume', RESULT, store=store)
+
+    assert summary['matchScore'] == 78.5 and summary['isShortlisted'] is True
+    assert summary['stored'] is True
+    assert 'Sana' not in str(summary) and len(summary['candidateHash']) == 40
+    assert list(backend.client.ttls.values())[0] > 3600
+
+    assert load_retained_result(backend, 'task-1', store=store) == (RESULT, None)
+    os.remove(store.path('task-1'))
+    result, kept = load_retained_result(backend, 'task-1', store=store)
+    assert result is None and kept['resultHash'] == summary['resultHash']
+    assert load_summaries(backend, ['task-1', 'unknown'])[1] is None
+
+def test_expired_results_are_removed(tmp_path):
+    store = FileResultStore(str(tmp_path))
+    old_path = store.save('old-task', RESULT)
+    store.save('new-task', RESULT)
+    two_days_ago = time.time() - 2 * 86400
+    os.utime(old_path, (two_days_ago, two_days_ago))
+
+    assert store.remove_expired(retention_days=1) == 1
+    assert store.load('old-task') is None
+    assert store.load('new-task') == RESULT
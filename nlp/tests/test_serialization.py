@@ -0,0 +1,22 @@
+from kombu.serialization import dumps, loads
+from utils.serialization import celery_serialization_settings, RAW, ZLIB
+
+def test_compressed_serializer_round_trip():
+    settings = celery_serialization_settings('msgpack', 'zlib')
+    assert settings['task_serializer'] == 'msgpack'
+    assert settings['result_serializer'] == 'msgpack+zlib'
+    assert 'msgpack+zlib' in settings['result_accept_content']
+
+    small = {'success': True, 'data': {'matchScore': 71.2}}
+    large = {'success': True, 'data': {'skills': ['python', 'django'] * 500, 'matchScore': 71.2}}
+    for result, marker in ((small, RAW), (large, ZLIB)):
+        content_type, encoding, payload = dumps(result, serializer='msgpack+zlib')
+        assert payload[:1] == marker
+        assert loads(payload, content_type, encoding, accept=[content_type]) == result
+    assert len(dumps(large, serializer='msgpack+zlib')[2]) < len(dumps(large, serializer='json')[2]) / 10
+
+def test_unknown_settings_fall_back_to_json():
+    settings = celery_serialization_settings('pickle', 'lz4')
+    assert settings['task_serializer'] == 'json'
+    assert settings['result_serializer'] == 'json'
+    assert 'pickle' not in settings['accept_content']
@@ -0,0 +1,48 @@
+import random
+import pytest
+from utils.skill_vectors import SkillVocabulary, SkillMatrix, skill_match_counts, skill_match_score
+
+SKILL_POOL = [
+    'python', 'java', 'javascript', 'react', 'react native', 'node.js', 'sql', 'mysql', 'nosql',
+    'machine learning', 'deep learning', 'learning', 'css', 'html', 'aws', 'c++', 'go', 'django',
+    'flask', 'Python', 'JavaScript React', 'ml', 'html5', 'docker', 'kubernetes'
+]
+
+def reference_counts(resume_skills, job_skills):
+    """The nested substring loop calculate_match_score used before skill vectors"""
+    job_skills_lower = [s.lower() for s in job_skills]
+    resume_skills_lower = [s.lower() for s in resume_skills]
+    matched_skills = set(resume_skills_lower).intersection(set(job_skills_lower))
+    partial_matches = set()
+    for job_skill in job_skills_lower:
+        for resume_skill in resume_skills_lower:
+            if job_skill in resume_skill and job_skill not in matched_skills:
+                partial_matches.add(job_skill)
+            elif resume_skill in job_skill and resume_skill not in matched_skills:
+                partial_matches.add(resume_skill)
+    return len(matched_skills), len(partial_matches)
+
+def random_cases(count=300, seed=3):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield (rng.sample(SKILL_POOL, rng.randint(1, 10)),
+               rng.sample(SKILL_POOL, rng.randint(1, 6)))
+
+def test_bitset_counts_match_reference():
+    vocabulary = SkillVocabulary()
+    for resume_skills, job_skills in random_cases():
+        counts = skill_match_counts(vocabulary, vocabulary.bits(resume_skills), vocabulary.bits(job_skills))
+        assert counts == reference_counts(resume_skills, job_skills)
+
+def test_skill_matrix_counts_match_reference():
+    cases = list(random_cases(count=100, seed=11))
+    job_skills = ['python', 'react', 'learning', 'sql database']
+    matrix = SkillMatrix([resume_skills for resume_skills, _ in cases])
+    full, partial = matrix.match_counts(job_skills)
+    for row, (resume_skills, _) in enumerate(cases):
+        assert (full[row], partial[row]) == reference_counts(resume_skills, job_skills)
+
+def test_skill_match_score():
+    score, full, partial = skill_match_score(['Python', 'JavaScript React'], ['python', 'javascript', 'go'])
+    assert (full, partial) == (1, 1)
+    assert score == pytest.approx(50.0)
@@ -0,0 +1,97 @@
+import json
+import ipaddress
+import pytest
+from utils import task_events
+from utils.task_events import iter_task_events, validate_callback_url, sign_payload
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.channels = []
+        self.closed = False
+
+    def subscribe(self, channel):
+        self.channels.append(channel)
+
+    def get_message(self, timeout=0):
+        return self.messages.pop(0) if self.messages else None
+
+    def close(self):
+        self.closed = True
+
+class FakeBackend:
+    def __init__(self, pubsub):
+        self.client = self
+        self._pubsub = pubsub
+
+    def pubsub(self, **kwargs):
+        return self._pubsub
+
+def parse(stream):
+    events = []
+    for chunk in stream:
+        fields = dict(line.split(': ', 1) for line in chunk.strip().split('\n') if not line.startswith(':'))
+        if 'event' in fields:
+            events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+def test_stream_forwards_progress_and_ends_with_result():
+    statuses = iter([{'status': 'progress'}, {'status': 'completed', 'success': True, 'result': {'score': 80}}])
+    progress = {'type': 'message', 'data': json.dumps({'status': 'progress', 'processed': 3, 'total': 10})}
+    done = {'type': 'message', 'data': json.dumps({'status': 'completed'})}
+    pubsub = FakePubSub([progress, done])
+
+    events = parse(iter_task_events(FakeBackend(pubsub), 'abc', lambda: next(statuses), keepalive=1, max_seconds=5))
+
+    assert [name for name, _ in events] == ['status', 'progress', 'completed']
+    assert events[1][1]['processed'] == 3
+    assert events[2][1]['result'] == {'score': 80}
+    assert pubsub.channels == ['task-events:abc']
+    assert pubsub.closed
+
+def test_stream_polls_without_pubsub():
+    statuses = iter([{'status': 'pending'}, {'status': 'started'}, {'status': 'failure', 'success': False}])
+    events = parse(iter_task_events(object(), 'abc', lambda: next(statuses), poll_interval=0, max_seconds=5))
+    assert [(name, data['status']) for name, data in events] == [
+        ('status', 'pending'), ('status', 'started'), ('failed', 'failure')
+    ]
+
+def test_callback_url_validation(monkeypatch):
+    public = {'backend.local': '93.184.216.34', 'internal.local': '10.0.0.5'}
+    monkeypatch.setattr(task_events, 'resolve_host',
+                        lambda host: {ipaddress.ip_address(public.get(host, host))})
+    assert validate_callback_url('https://backend.local/hooks/nlp')
+    with pytest.raises(ValueError):
+        validate_callback_url('file:///etc/passwd')
+    # Without an allowlist, internal addresses are refused
+    for url in ('http://169.254.169.254/latest', 'http://127.0.0.1:5002/', 'http://internal.local/', 'http://[::1]/'):
+        with pytest.raises(ValueError):
+            validate_callback_url(url)
+    monkeypatch.setattr(task_events, 'CALLBACK_ALLOWED_HOSTS', ['backend'])
+    with pytest.raises(ValueError):
+        validate_callback_url('http://169.254.169.254/latest')
+    assert sign_payload(b'{}', 'secret').startswith('sha256=')
+
+def test_callback_connects_to_the_validated_address(monkeypatch):
+    import requests
+    resolved = iter([[ipaddress.ip_address('93.184.216.34')], [ipaddress.ip_address('127.0.0.1')]])
+    monkeypatch.setattr(task_events, 'resolve_host', lambda host: next(resolved))
+    sent = []
+
+    class Response:
+        status_code = 204
+
+    def send(session, request, **kwargs):
+        sent.append((request, session.get_adapter(request.url)))
+        return Response()
+
+    monkeypatch.setattr(requests.Session, 'send', send)
+    assert task_events.post_callback('https://hooks.example:8443/nlp?x=1', {'taskId': 'abc'}) == 204
+
+    request, adapter = sent[0]
+    assert request.url == 'https://93.184.216.34:8443/nlp?x=1'
+    assert request.headers['Host'] == 'hooks.example:8443'
+    assert adapter.poolmanager.connection_pool_kw['server_hostname'] == 'hooks.example'
+    # A later delivery whose name now resolves to an internal address is refused
+    with pytest.raises(task_events.CallbackError):
+        task_events.post_callback('https://hooks.example/nlp', {'taskId': 'abc'})
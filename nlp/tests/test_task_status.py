@@ -0,0 +1,47 @@
+from celery import Celery
+from celery.backends.base import KeyValueStoreBackend
+from utils.task_status import fetch_task_metas, compact_status, project
+
+class ListMGetBackend(KeyValueStoreBackend):
+    """In-memory key-value backend whose mget returns a list, like Redis"""
+
+    def __init__(self, app):
+        super().__init__(app=app)
+        self.data = {}
+        self.mget_calls = 0
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def mget(self, keys):
+        self.mget_calls += 1
+        return [self.data.get(key) for key in keys]
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+def test_bulk_status_reads_all_tasks_in_one_mget():
+    backend = ListMGetBackend(Celery('test', set_as_current=False))
+    backend.store_result('done', {'success': True, 'data': {'matchScore': 81.5, 'skills': ['python']}}, 'SUCCESS')
+    backend.store_result('bad', {'success': False, 'message': 'Resume file not found'}, 'SUCCESS')
+    backend.store_result('crashed', ValueError('boom'), 'FAILURE')
+
+    task_ids = ['done', 'bad', 'crashed', 'unknown']
+    metas = fetch_task_metas(backend, task_ids)
+    assert backend.mget_calls == 1
+
+    statuses = [compact_status(task_id, meta, ['data.matchScore']) for task_id, meta in zip(task_ids, metas)]
+    assert statuses[0] == {'taskId': 'done', 'status': 'completed', 'success': True,
+                           'result': {'data': {'matchScore': 81.5}}}
+    assert statuses[1]['success'] is False and statuses[1]['error'] == 'Resume file not found'
+    assert statuses[2]['status'] == 'failure' and 'boom' in statuses[2]['error']
+    assert statuses[3] == {'taskId': 'unknown', 'status': 'pending', 'success': True}
+
+def test_project_keeps_only_requested_paths():
+    result = {'data': {'matchScore': 70, 'contactInfo': {'email': 'a@b.c', 'phone': '1'}}, 'timings': {}}
+    assert project(result, ['data.contactInfo.email', 'data.missing', 'timings']) == {
+        'data': {'contactInfo': {'email': 'a@b.c'}}, 'timings': {}
+    }
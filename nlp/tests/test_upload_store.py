@@ -0,0 +1,28 @@
+import io
+import os
+from werkzeug.datastructures import FileStorage
+from utils.upload_store import UploadStore, matches_signature
+
+PDF_BYTES = b'%PDF-1.4\n' + b'x' * 4096
+
+def test_spooled_upload_is_linked_under_a_unique_name(tmp_path):
+    store = UploadStore(str(tmp_path))
+    spool = store.spool_file()
+    spool.write(PDF_BYTES)
+    spool.seek(0)
+
+    upload = FileStorage(spool, 'my resume.pdf')
+    assert matches_signature(upload.stream, '.pdf') and upload.stream.tell() == 0
+    first, second = store.save(upload), store.save(upload)
+    spool.close()
+
+    assert first != second and first.endswith('_my_resume.pdf')
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(first), os.path.basename(second)])
+    with open(first, 'rb') as f:
+        assert f.read() == PDF_BYTES
+
+def test_in_memory_upload_is_copied(tmp_path):
+    store = UploadStore(str(tmp_path))
+    path = store.save(FileStorage(io.BytesIO(PDF_BYTES), 'resume.pdf'))
+    assert os.path.getsize(path) == len(PDF_BYTES)
+    assert not matches_signature(io.BytesIO(b'<html>'), '.docx')
@@ -0,0 +1,160 @@
+import logging
+import traceback
+from .nlp_model import get_nlp, BATCH_SIZE, N_PROCESS
+from .extract_skills import extract_skills
+from .extract_education import extract_education, find_education_section
+from .extract_experience import extract_experience
+from .extract_projects import extract_projects
+from .extract_contact import (
+    extract_contact_info, extract_candidate_name, CONTACT_PARSE_CHARS, NAME_PARSE_CHARS
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Roles a parsed Doc can play for the extractors of a single resume
+FULL_TEXT = 'full_text'      # skills and projects
+EDUCATION = 'education'      # education section
+CONTACT = 'contact'          # first CONTACT_PARSE_CHARS characters
+NAME = 'name'                # first NAME_PARSE_CHARS characters
+
+def _texts_to_parse(text):
+    """
+    Build the (text, roles) pairs that must be parsed for one resume.
+
+    Identical texts (e.g. a short resume whose prefix is the whole text)
+    are parsed once and shared between roles.
+    """
+    texts = {}
+    for role, role_text in (
+        (FULL_TEXT, text),
+        (EDUCATION, find_education_section(text)),
+        (CONTACT, text[:CONTACT_PARSE_CHARS]),
+        (NAME, text[:NAME_PARSE_CHARS]),
+    ):
+        texts.setdefault(role_text, []).append(role)
+    return list(texts.items())
+
+def _empty_result():
+    return {
+        'candidateName': '',
+        'contactInfo': {},
+        'skills': [],
+        'education': [],
+        'experience': [],
+        'projects': []
+    }
+
+def _run_extractor(name, func, *args, **kwargs):
+    """Run one extractor, logging and swallowing its errors like process_resume does"""
+    try:
+        return func(*args, **kwargs)
+    except Exception as e:
+        logger.error("%s extraction failed in batch: %s", name, e)
+        logger.error(traceback.format_exc())
+        return None
+
+def extract_from_docs(text, docs, job_skills=None):
+    """Fan the parsed Docs of one resume out to every extractor"""
+    result = _empty_result()
+    result['skills'] = _run_extractor('Skills', extract_skills, text, job_skills, doc=docs[FULL_TEXT]) or []
+    result['education'] = _run_extractor('Education', extract_education, text, doc=docs[EDUCATION]) or []
+    result['experience'] = _run_extractor('Experience', extract_experience, text) or []
+    result['projects'] = _run_extractor('Projects', extract_projects, text, doc=docs[FULL_TEXT]) or []
+    result['contactInfo'] = _run_extractor('Contact info', extract_contact_info, text, doc=docs[CONTACT]) or {}
+    result['candidateName'] = _run_extractor('Candidate name', extract_candidate_name, text, doc=docs[NAME]) or ''
+    return result
+
+def parse_resume(text):
+    """
+    Parse every text the extractors need for one resume with a single nlp.pipe call
+
+    Returns:
+        Dict mapping each role (FULL_TEXT, EDUCATION, CONTACT, NAME) to its Doc
+    """
+    nlp = get_nlp()
+    if nlp is None:
+        raise RuntimeError("spaCy model is not available")
+
+    pairs = _texts_to_parse(text)
+    docs = {}
+    for doc, (_, roles) in zip(nlp.pipe(role_text for role_text, _ in pairs), pairs):
+        for role in roles:
+            docs[role] = doc
+    return docs
+
+def iter_extract_resumes_batch(resume_texts, job_skills=None, batch_size=None, n_process=None):
+    """
+    Extract structured information from many resumes using nlp.pipe.
+
+    All texts go through a single nlp.pipe call, so spaCy can batch them
+    (and optionally spread them over several processes). Results are
+    yielded in input order as soon as all Docs of a resume are parsed.
+
+    Args:
+        resume_texts: List of resume texts
+        job_skills: List of required skills for the job (optional)
+        batch_size: Number of texts buffered per spaCy batch (defaults to NLP_BATCH_SIZE)
+        n_process: Number of spaCy worker processes (defaults to NLP_N_PROCESS)
+
+    Yields:
+        Tuple of (index, result dict) with candidateName, contactInfo, skills,
+        education, experience and projects keys
+    """
+    nlp = get_nlp()
+    if nlp is None:
+        raise RuntimeError("spaCy model is not available")
+
+    resume_texts = list(resume_texts)
+    logger.info("Batch extracting %s resumes (batch_size=%s, n_process=%s)", len(resume_texts), batch_size or BATCH_SIZE, n_process or N_PROCESS)
+
+    # Remember how many Docs each resume needs so results can be emitted in order
+    parse_plan = []
+    for text in resume_texts:
+        parse_plan.append(_texts_to_parse(text) if text and text.strip() else [])
+
+    def tagged_texts():
+        for index, pairs in enumerate(parse_plan):
+            for role_text, roles in pairs:
+                yield role_text, (index, tuple(roles))
+
+    docs_by_index = {}
+    next_index = 0
+
+    def flush_ready(upto):
+        """Yield results for every resume before `upto` whose Docs are complete"""
+        nonlocal next_index
+        while next_index < upto:
+            if parse_plan[next_index]:
+                docs = docs_by_index.pop(next_index)
+                yield next_index, extract_from_docs(resume_texts[next_index], docs, job_skills)
+            else:
+                yield next_index, _empty_result()
+            next_index += 1
+
+    for doc, (index, roles) in nlp.pipe(
+        tagged_texts(),
+        as_tuples=True,
+        batch_size=batch_size or BATCH_SIZE,
+        n_process=n_process or N_PROCESS
+    ):
+        # Docs arrive in order, so every resume before this one is complete
+        yield from flush_ready(index)
+        docs = docs_by_index.setdefault(index, {})
+        for role in roles:
+            docs[role] = doc
+
+    yield from flush_ready(len(resume_texts))
+
+def extract_resumes_batch(resume_texts, job_skills=None, batch_size=None, n_process=None):
+    """
+    Extract structured information from many resumes using nlp.pipe.
+
+    See iter_extract_resumes_batch for arguments.
+
+    Returns:
+        List of result dicts in input order
+    """
+    return [result for _, result in iter_extract_resumes_batch(
+        resume_texts, job_skills, batch_size=batch_size, n_process=n_process
+    )]
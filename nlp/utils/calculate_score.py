@@ -1,21 +1,14 @@
-from sentence_transformers import SentenceTransformer, util
 import numpy as np
 import re
+import time
 import logging
-from .sbert_scorer import calculate_match_score as sbert_calculate_score
+from .skill_vectors import skill_match_score as skill_match_score_for
+from .embeddings import get_embedding_provider, cos_sim
+from .logging_config import log_payload
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Load SBERT model
-try:
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    logger.info("SBERT model loaded successfully")
-except Exception as e:
-    logger.error(f"Error loading SBERT model: {str(e)}")
-    model = None
-
 # Map frontend/backend category names to internal NLP category keys
 CATEGORY_MAPPING = {
     'UET Peshawar': 'uet_peshawar',
@@ -111,7 +104,182 @@ def detect_job_category(job_description):
         
     return max(category_scores.items(), key=lambda x: x[1])[0]
 
-def calculate_match_score(resume_text, job_description, resume_skills, job_skills, job_category=None):
+def clean_similarity_text(text):
+    """Lowercase and collapse whitespace the way text similarity expects"""
+    return ' '.join(text.lower().split())
+
+def encode_texts(texts, batch_size=32):
+    """
+    Encode many texts with the SBERT model in batches
+    
+    Args:
+        texts: List of resume or job description texts
+        batch_size: Number of texts encoded per forward pass
+    
+    Returns:
+        Tensor of embeddings (one row per text) or None if the model is not loaded
+    """
+    provider = get_embedding_provider()
+    if not provider.available:
+        return None
+    return provider.encode(
+        [clean_similarity_text(text or '') for text in texts],
+        batch_size=batch_size,
+        convert_to_tensor=True
+    )
+
+def calculate_keyword_score(resume_text, job_category, bonuses=None):
+    """
+    Calculate the keyword match score (0-100) of a resume for a job category,
+    including the UET Peshawar bonuses
+    
+    Args:
+        resume_text: The resume text
+        job_category: Internal job category key
+        bonuses: Optional list the names of the applied UET bonuses are appended to
+    """
+    category_data = JOB_CATEGORIES[job_category]
+    if bonuses is None:
+        bonuses = []
+    keyword_score = 0
+    if resume_text:
+        resume_lower = resume_text.lower()
+        matched_keywords = sum(1 for kw in category_data['keywords'] if kw in resume_lower)
+        keyword_density = matched_keywords / len(category_data['keywords'])
+        keyword_score = keyword_density * 100
+        logger.info("Keyword match score: %.2f (matched %s/%s)", keyword_score, matched_keywords, len(category_data['keywords']))
+    
+        # Special handling for UET Peshawar positions
+        if job_category == 'uet_peshawar':
+            # Bonus for PhDs in academic positions
+            if re.search(r'\b(?:phd|ph\.d|doctorate|doctoral)\b', resume_lower):
+                keyword_score = min(keyword_score + 20, 100)
+                bonuses.append('phd')
+                logger.info("Applied PhD bonus for UET position")
+            # Bonus for research publications
+            if re.search(r'\b(?:journal|publication|published|research paper)\b', resume_lower):
+                keyword_score = min(keyword_score + 10, 100)
+                bonuses.append('publications')
+                logger.info("Applied research publication bonus for UET position")
+            # Bonus for teaching experience
+            if re.search(r'\b(?:teaching|lecturer|professor|instructor)\b', resume_lower):
+                keyword_score = min(keyword_score + 10, 100)
+                bonuses.append('teaching')
+                logger.info("Applied teaching experience bonus for UET position")
+                # Bonus for Pakistan/UET Peshawar experience
+                if re.search(r'\b(?:pakistan|peshawar|uet|khyber|pakhtunkhwa)\b', resume_lower):
+                    keyword_score = min(keyword_score + 15, 100)
+                    bonuses.append('pakistan_experience')
+                    logger.info("Applied Pakistan/UET experience bonus")
+    
+    return keyword_score
+
+def score_variability(resume_text):
+    """
+    Deterministic per-resume offset (-2.5 to +2.5) added to the final score
+    
+    Adds slight variation based on a hash of the resume text so that similar
+    quality resumes do not always get exactly the same score.
+    """
+    hash_value = sum(ord(c) for c in resume_text[:100]) % 10
+    return (hash_value - 5) * 0.5
+
+def finalize_score(score):
+    """Round a weighted score and clamp it to the 15-100 range"""
+    final_score = min(round(score, 1), 100.0)
+    return max(final_score, 15.0)  # Minimum score floor
+
+class ScoreComponent:
+    """One weighted component of a match score"""
+
+    def __init__(self, name, score, weight, method, fallback=False, details=None):
+        self.name = name
+        self.score = score
+        self.weight = weight
+        self.method = method
+        self.fallback = fallback
+        self.details = details or {}
+
+    @property
+    def weighted(self):
+        return self.weight * self.score
+
+    def to_dict(self):
+        return {
+            'score': round(float(self.score), 2),
+            'weight': self.weight,
+            'weighted': round(float(self.weighted), 2),
+            'method': self.method,
+            'fallback': self.fallback,
+            'details': self.details
+        }
+
+class MatchScore:
+    """
+    Result of calculate_match_score
+
+    Holds the final score together with every weighted component, the
+    fallback paths that were taken and the wall time of each stage in
+    milliseconds.
+    """
+
+    def __init__(self, score, job_category=None, components=None, variability=0.0, fallback=None):
+        self.score = score
+        self.job_category = job_category
+        self.components = components or []
+        self.variability = variability
+        # Set when the whole calculation short-circuited to a flat score
+        self.fallback = fallback
+        self.timings = {}
+
+    def __float__(self):
+        return float(self.score)
+
+    def __repr__(self):
+        return f"MatchScore(score={self.score}, job_category={self.job_category!r})"
+
+    @property
+    def fallbacks(self):
+        """Names of the fallback paths used (empty when every stage ran normally)"""
+        fallbacks = [f"{c.name}:{c.method}" for c in self.components if c.fallback]
+        if self.fallback:
+            fallbacks.insert(0, self.fallback)
+        return fallbacks
+
+    def to_dict(self):
+        return {
+            'score': self.score,
+            'jobCategory': self.job_category,
+            'components': {c.name: c.to_dict() for c in self.components},
+            'variability': self.variability,
+            'fallbacks': self.fallbacks,
+            'timings': {stage: round(ms, 3) for stage, ms in self.timings.items()}
+        }
+
+class _StageTimer:
+    """Record the wall time of a block in milliseconds into a timings dict"""
+
+    def __init__(self, timings, stage):
+        self.timings = timings
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings[self.stage] = (time.perf_counter() - self.start) * 1000
+        return False
+
+def word_overlap_similarity(clean_resume, clean_job):
+    """Basic word-matching similarity used when no SBERT model can be used"""
+    resume_words = set(clean_resume.split())
+    job_words = set(clean_job.split())
+    common_words = resume_words.intersection(job_words)
+    return len(common_words) / len(job_words) * 50 if job_words else 30
+
+def calculate_match_score(resume_text, job_description, resume_skills, job_skills, job_category=None,
+                          resume_embedding=None, job_embedding=None):
     """
     Calculate match score between resume and job description
     
@@ -121,168 +289,129 @@ def calculate_match_score(resume_text, job_description, resume_skills, job_skill
         resume_skills: List of skills extracted from the resume
         job_skills: List of required skills for the job
         job_category: Optional job category (will be detected from description if not provided)
+        resume_embedding: Optional precomputed SBERT embedding of the resume (see encode_texts)
+        job_embedding: Optional precomputed SBERT embedding of the job description
     
     Returns:
-        Match score (0-100)
+        MatchScore with the final score (0-100) in .score, the weighted
+        components, the fallbacks used and per-stage timings
     """
+    timings = {}
+    total_start = time.perf_counter()
+
+    def finish(result):
+        timings['total'] = (time.perf_counter() - total_start) * 1000
+        result.timings = timings
+        if result.fallbacks:
+            logger.warning("Match score used fallbacks: %s", ', '.join(result.fallbacks))
+        return result
+
     try:
-        # Add debug logging for SBERT model
-        logger.info(f"SBERT model status: {'Loaded' if model is not None else 'Not loaded'}")
-        if model is None:
-            logger.error("SBERT model is None! This will affect score calculation.")
+        # Add debug logging for SBERT model (loaded on first use, shared with SBERTScorer)
+        provider = get_embedding_provider()
+        logger.info("SBERT model status: %s", 'Loaded' if provider.loaded else 'Not loaded')
             
         if not resume_text or not resume_text.strip():
             logger.warning("Empty resume text provided")
-            return 20  # Return low score for empty resume
+            return finish(MatchScore(20, job_category, fallback='empty_resume'))  # Low score for empty resume
             
         if not job_description:
             logger.warning("Empty job description provided")
-            return 30  # Return low-medium score for empty job description
+            return finish(MatchScore(30, job_category, fallback='empty_job_description'))  # Low-medium score
         
         # Log inputs for debugging
-        logger.info(f"Calculating match score for resume length: {len(resume_text)} chars")
-        logger.info(f"Job description length: {len(job_description)} chars")
-        logger.info(f"Resume skills: {resume_skills}")
-        logger.info(f"Job skills: {job_skills}")
-        logger.info(f"Provided job category: {job_category}")
-        
-        score = 0.0
+        logger.info("Calculating match score for resume length: %s chars", len(resume_text))
+        logger.info("Job description length: %s chars", len(job_description))
+        log_payload(logger, "Resume skills", resume_skills)
+        log_payload(logger, "Job skills", job_skills)
+        logger.info("Provided job category: %s", job_category)
         
         # Detect or normalize job category
-        if job_category:
-            job_category = normalize_job_category(job_category)
-            logger.info(f"Normalized job category: {job_category}")
-        else:
-            job_category = detect_job_category(job_description)
-            logger.info(f"Detected job category: {job_category}")
+        with _StageTimer(timings, 'category'):
+            if job_category:
+                job_category = normalize_job_category(job_category)
+                logger.info("Normalized job category: %s", job_category)
+            else:
+                job_category = detect_job_category(job_description)
+                logger.info("Detected job category: %s", job_category)
             
         category_data = JOB_CATEGORIES[job_category]
         weights = category_data['weights']
         
         # Calculate text similarity using SBERT
-        text_similarity_score = 0
-        if job_description and resume_text:
+        with _StageTimer(timings, 'textSimilarity'):
             # Clean and normalize text
-            clean_resume = ' '.join(resume_text.lower().split())
-            clean_job = ' '.join(job_description.lower().split())
+            clean_resume = clean_similarity_text(resume_text)
+            clean_job = clean_similarity_text(job_description)
             
             # Encode and calculate similarity
             try:
-                if model is not None:
-                    embeddings = model.encode([clean_resume, clean_job], convert_to_tensor=True)
-                    similarity = float(util.cos_sim(embeddings[0], embeddings[1]).item())
+                if resume_embedding is not None and job_embedding is not None:
+                    similarity = float(cos_sim(resume_embedding, job_embedding).item())
                     text_similarity_score = similarity * 100
-                    logger.info(f"Text similarity score (primary model): {text_similarity_score:.2f}")
+                    text_method, text_fallback = 'precomputed_embeddings', False
+                elif provider.available:
+                    embeddings = provider.encode([clean_resume, clean_job], convert_to_tensor=True)
+                    similarity = float(cos_sim(embeddings[0], embeddings[1]).item())
+                    text_similarity_score = similarity * 100
+                    text_method, text_fallback = 'sbert', False
                 else:
-                    # Try using the backup SBERT scorer
-                    try:
-                        logger.info("Using backup SBERT scorer")
-                        text_similarity_score = sbert_calculate_score(clean_resume, clean_job)
-                        logger.info(f"Text similarity score (backup model): {text_similarity_score:.2f}")
-                    except Exception as backup_error:
-                        logger.error(f"Backup SBERT scorer failed: {str(backup_error)}")
-                        # Fall back to basic word matching
-                        resume_words = set(clean_resume.split())
-                        job_words = set(clean_job.split())
-                        common_words = resume_words.intersection(job_words)
-                        text_similarity_score = len(common_words) / len(job_words) * 50 if job_words else 30
-                        logger.info(f"Fallback text similarity score: {text_similarity_score:.2f}")
+                    # SBERTScorer shares this provider, so there is no other model to try
+                    logger.warning("SBERT model unavailable, using word overlap")
+                    text_similarity_score = word_overlap_similarity(clean_resume, clean_job)
+                    text_method, text_fallback = 'word_overlap', True
             except Exception as e:
-                logger.error(f"Error calculating SBERT similarity: {str(e)}")
+                logger.error("Error calculating SBERT similarity: %s", e)
                 # Fallback to basic word matching if SBERT fails
-                resume_words = set(clean_resume.split())
-                job_words = set(clean_job.split())
-                common_words = resume_words.intersection(job_words)
-                text_similarity_score = len(common_words) / len(job_words) * 50 if job_words else 30
-                logger.info(f"Fallback text similarity score: {text_similarity_score:.2f}")
-        else:
-            logger.warning("Missing inputs for text similarity calculation or model not loaded")
-            text_similarity_score = 30  # Default fallback score
-        
-        score += weights['text_similarity'] * text_similarity_score
+                text_similarity_score = word_overlap_similarity(clean_resume, clean_job)
+                text_method, text_fallback = 'word_overlap', True
+            logger.info("Text similarity score (%s): %.2f", text_method, text_similarity_score)
         
         # Calculate skill match ratio
-        skill_match_score = 0
-        if job_skills and resume_skills:
-            # Consider partial matches (case insensitive)
-            job_skills_lower = [s.lower() for s in job_skills]
-            resume_skills_lower = [s.lower() for s in resume_skills]
-            
-            # Exact matches
-            matched_skills = set(resume_skills_lower).intersection(set(job_skills_lower))
-            
-            # Partial matches (e.g., "JavaScript" matches "JavaScript React")
-            partial_matches = set()
-            for job_skill in job_skills_lower:
-                for resume_skill in resume_skills_lower:
-                    if job_skill in resume_skill and job_skill not in matched_skills:
-                        partial_matches.add(job_skill)
-                    elif resume_skill in job_skill and resume_skill not in matched_skills:
-                        partial_matches.add(resume_skill)
-            
-            # Calculate score with full and partial matches
-            full_match_count = len(matched_skills)
-            partial_match_count = len(partial_matches) * 0.5  # Partial matches count as half
-            total_match_count = full_match_count + partial_match_count
-            
-            skill_match_ratio = total_match_count / len(job_skills) if job_skills else 0
-            skill_match_score = skill_match_ratio * 100
-            logger.info(f"Skill match score: {skill_match_score:.2f} (matched {full_match_count} full, {len(partial_matches)} partial)")
-        else:
-            logger.warning("Missing skills for match calculation")
-            skill_match_score = 25  # Default fallback score
-            
-        score += weights['skill_match'] * skill_match_score
+        with _StageTimer(timings, 'skillMatch'):
+            skill_details = {}
+            if job_skills and resume_skills:
+                # Full and partial matches (e.g., "JavaScript" matches "JavaScript React") via skill bitsets
+                skill_match_score, full_match_count, partial_match_count = skill_match_score_for(resume_skills, job_skills)
+                skill_method, skill_fallback = 'skill_vectors', False
+                skill_details = {'fullMatches': full_match_count, 'partialMatches': partial_match_count}
+                logger.info("Skill match score: %.2f (matched %s full, %s partial)", skill_match_score, full_match_count, partial_match_count)
+            else:
+                logger.warning("Missing skills for match calculation")
+                skill_match_score = 25  # Default fallback score
+                skill_method, skill_fallback = 'default', True
         
         # Calculate keyword match for the specific job category
-        keyword_score = 0
-        if resume_text:
-            resume_lower = resume_text.lower()
-            matched_keywords = sum(1 for kw in category_data['keywords'] if kw in resume_lower)
-            keyword_density = matched_keywords / len(category_data['keywords'])
-            keyword_score = keyword_density * 100
-            logger.info(f"Keyword match score: {keyword_score:.2f} (matched {matched_keywords}/{len(category_data['keywords'])})")
-        
-            # Special handling for UET Peshawar positions
-            if job_category == 'uet_peshawar':
-                # Bonus for PhDs in academic positions
-                if re.search(r'\b(?:phd|ph\.d|doctorate|doctoral)\b', resume_lower):
-                    keyword_score = min(keyword_score + 20, 100)
-                    logger.info("Applied PhD bonus for UET position")
-                # Bonus for research publications
-                if re.search(r'\b(?:journal|publication|published|research paper)\b', resume_lower):
-                    keyword_score = min(keyword_score + 10, 100)
-                    logger.info("Applied research publication bonus for UET position")
-                # Bonus for teaching experience
-                if re.search(r'\b(?:teaching|lecturer|professor|instructor)\b', resume_lower):
-                    keyword_score = min(keyword_score + 10, 100)
-                    logger.info("Applied teaching experience bonus for UET position")
-                    # Bonus for Pakistan/UET Peshawar experience
-                    if re.search(r'\b(?:pakistan|peshawar|uet|khyber|pakhtunkhwa)\b', resume_lower):
-                        keyword_score = min(keyword_score + 15, 100)
-                        logger.info("Applied Pakistan/UET experience bonus")
-
-        score += weights['keyword_match'] * keyword_score
+        with _StageTimer(timings, 'keywordMatch'):
+            bonuses = []
+            keyword_score = calculate_keyword_score(resume_text, job_category, bonuses)
+
+        components = [
+            ScoreComponent('textSimilarity', text_similarity_score, weights['text_similarity'],
+                           text_method, text_fallback),
+            ScoreComponent('skillMatch', skill_match_score, weights['skill_match'],
+                           skill_method, skill_fallback, skill_details),
+            ScoreComponent('keywordMatch', keyword_score, weights['keyword_match'],
+                           'category_keywords', details={'bonuses': bonuses} if bonuses else None)
+        ]
+        score = sum(component.weighted for component in components)
 
         # Apply variability to avoid always returning the same score
-        # Add slight randomness based on hash of resume text to ensure deterministic but varied scores
-        # for similar quality resumes
-        hash_value = sum(ord(c) for c in resume_text[:100]) % 10
-        variability = (hash_value - 5) * 0.5  # -2.5 to +2.5 range
+        variability = score_variability(resume_text)
         
-        final_score = min(round(score + variability, 1), 100.0)
-        final_score = max(final_score, 15.0)  # Minimum score floor
+        final_score = finalize_score(score + variability)
         
         # Ensure the score is a valid number
         if not isinstance(final_score, (int, float)) or np.isnan(final_score):
-            logger.error(f"Invalid score calculated: {final_score}, using default")
-            final_score = 50.0  # Use a middle-range default score
+            logger.error("Invalid score calculated: %s, using default", final_score)
+            # Use a middle-range default score
+            return finish(MatchScore(50.0, job_category, components, variability, fallback='invalid_score'))
         
-        logger.info(f"Final match score: {final_score:.1f}")
-        return final_score
+        logger.info("Final match score: %.1f", final_score)
+        return finish(MatchScore(final_score, job_category, components, variability))
     except Exception as e:
-        logger.error(f"Error calculating match score: {str(e)}")
-        return 35.0  # Default score in case of errors
+        logger.error("Error calculating match score: %s", e)
+        return finish(MatchScore(35.0, job_category, fallback='error'))  # Default score in case of errors
 
 def detect_duplicate(resume_text, existing_resume_texts):
     """
@@ -299,7 +428,8 @@ def detect_duplicate(resume_text, existing_resume_texts):
         if not existing_resume_texts:
             return False, []
 
-        if not model:
+        provider = get_embedding_provider()
+        if not provider.available:
             logger.warning("SBERT model not loaded, using fallback duplicate detection")
             # Fallback method - simple text comparison
             duplicate_indices = []
@@ -310,14 +440,14 @@ def detect_duplicate(resume_text, existing_resume_texts):
                         duplicate_indices.append(i)
             return len(duplicate_indices) > 0, duplicate_indices
 
-        resume_embedding = model.encode(resume_text, convert_to_tensor=True)
-        existing_embeddings = model.encode(existing_resume_texts, convert_to_tensor=True)
-        similarities = util.cos_sim(resume_embedding, existing_embeddings)[0]
+        resume_embedding = provider.encode(resume_text, convert_to_tensor=True)
+        existing_embeddings = provider.encode(existing_resume_texts, convert_to_tensor=True)
+        similarities = cos_sim(resume_embedding, existing_embeddings)[0]
 
         threshold = 0.95
         duplicate_indices = [i for i, sim in enumerate(similarities) if sim > threshold]
 
         return len(duplicate_indices) > 0, duplicate_indices
     except Exception as e:
-        logger.error(f"Error detecting duplicates: {str(e)}")
+        logger.error("Error detecting duplicates: %s", e)
         return False, []
\ No newline at end of file
@@ -0,0 +1,419 @@
+import os
+import re
+import json
+import base64
+import logging
+import threading
+from contextlib import contextmanager
+import numpy as np
+from .calculate_score import (
+    JOB_CATEGORIES, calculate_keyword_score, score_variability, normalize_job_category,
+    detect_job_category, encode_texts
+)
+from .skill_vectors import SkillMatrix
+from .metrics import CACHE_REQUESTS
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Directory holding one snapshot (.npz) and one append log (.jsonl) per pool
+POOL_DIR = os.environ.get('CANDIDATE_POOL_DIR', 'candidate_pools')
+DEFAULT_POOL = 'default'
+# Append log records after which load() folds the log into the snapshot (0 disables)
+POOL_COMPACT_THRESHOLD = int(os.environ.get('CANDIDATE_POOL_COMPACT_THRESHOLD', '200'))
+POOL_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Category order of the per-candidate keyword score columns
+CATEGORY_KEYS = list(JOB_CATEGORIES.keys())
+
+# Component defaults used by calculate_match_score when an input is missing
+DEFAULT_TEXT_SIMILARITY = 30
+DEFAULT_SKILL_MATCH = 25
+
+def _to_numpy(embedding):
+    """Convert a torch tensor or array-like embedding to a float32 vector"""
+    if hasattr(embedding, 'cpu'):
+        embedding = embedding.cpu().numpy()
+    return np.asarray(embedding, dtype=np.float32).reshape(-1)
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+class CandidatePool:
+    """
+    Precomputed scoring inputs for a pool of stored candidates.
+
+    For each candidate the pool keeps the normalized SBERT embedding, the
+    extracted skills, the keyword score for every job category and the
+    deterministic score variability. That is everything calculate_match_score
+    needs, so a new job can be scored against the whole pool with matrix
+    operations instead of re-processing each resume.
+
+    New candidates are appended to <pool>.jsonl; compact() folds the log
+    into the <pool>.npz snapshot, which loads much faster than the log.
+    load() compacts automatically once the log reaches POOL_COMPACT_THRESHOLD
+    records. API and worker processes share the files: compaction holds an
+    exclusive lock on <pool>.lock, additions and loads a shared one.
+    """
+
+    def __init__(self, name=DEFAULT_POOL, pool_dir=None):
+        self.name = name
+        self.pool_dir = pool_dir or POOL_DIR
+        self._lock = threading.Lock()
+        self._cache = None
+        self._cache_key = None
+
+    @property
+    def log_path(self):
+        return os.path.join(self.pool_dir, f"{self.name}.jsonl")
+
+    @property
+    def snapshot_path(self):
+        return os.path.join(self.pool_dir, f"{self.name}.npz")
+
+    @contextmanager
+    def _file_lock(self, exclusive=False):
+        """Cross-process lock of the pool files (a no-op where fcntl is unavailable or before the pool exists)"""
+        if fcntl is None or not os.path.isdir(self.pool_dir):
+            yield
+            return
+        with open(os.path.join(self.pool_dir, f"{self.name}.lock"), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def add(self, candidate_id, resume_text, skills, embedding, metadata=None):
+        """
+        Add or replace a candidate in the pool
+
+        Args:
+            candidate_id: Unique id of the candidate (later additions replace earlier ones)
+            resume_text: The resume text, used to precompute keyword scores and variability
+            skills: List of skills extracted from the resume
+            embedding: SBERT embedding of the resume (see calculate_score.encode_texts)
+            metadata: Optional JSON-serializable dict returned with ranking results
+        """
+        vector = _to_numpy(embedding)
+        record = {
+            'id': str(candidate_id),
+            'embedding': base64.b64encode(vector.tobytes()).decode('ascii'),
+            'skills': list(dict.fromkeys(s.lower() for s in (skills or []))),
+            'keywordScores': [calculate_keyword_score(resume_text, category) for category in CATEGORY_KEYS],
+            'variability': score_variability(resume_text or ''),
+            'metadata': metadata or {}
+        }
+        os.makedirs(self.pool_dir, exist_ok=True)
+        # A single write of one line to a file opened in append mode keeps concurrent writers from interleaving;
+        # the lock keeps compaction from moving the log away between the open and the write
+        with self._file_lock(), open(self.log_path, 'a', encoding='utf-8') as log_file:
+            log_file.write(json.dumps(record) + '\n')
+        logger.info("Added candidate %s to pool '%s'", candidate_id, self.name)
+
+    def _read_snapshot(self):
+        """Arrays of the npz snapshot, or None without one"""
+        if not os.path.exists(self.snapshot_path):
+            return None
+        with np.load(self.snapshot_path) as data:
+            return {
+                'ids': data['ids'].tolist(),
+                'embeddings': data['embeddings'],
+                'keyword_scores': data['keyword_scores'],
+                'variability': data['variability'],
+                'skill_vocab': data['skill_vocab'].tolist(),
+                'skill_indptr': data['skill_indptr'],
+                'skill_indices': data['skill_indices'],
+                'metadata': json.loads(str(data['metadata']))
+            }
+
+    def _snapshot_skills(self, snapshot):
+        skill_vocab, indptr, indices = snapshot['skill_vocab'], snapshot['skill_indptr'], snapshot['skill_indices']
+        return [[skill_vocab[i] for i in indices[indptr[row]:indptr[row + 1]]] for row in range(len(indptr) - 1)]
+
+    def _snapshot_records(self, snapshot):
+        records = []
+        for row, (candidate_id, skills) in enumerate(zip(snapshot['ids'], self._snapshot_skills(snapshot))):
+            records.append({
+                'id': candidate_id,
+                'embedding': snapshot['embeddings'][row],
+                'skills': skills,
+                'keywordScores': snapshot['keyword_scores'][row],
+                'variability': float(snapshot['variability'][row]),
+                'metadata': snapshot['metadata'][row]
+            })
+        return records
+
+    def _read_log(self, path):
+        records = []
+        if not os.path.exists(path):
+            return records
+        with open(path, 'r', encoding='utf-8') as log_file:
+            for line in log_file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning("Skipping corrupt pool record in %s", path)
+                    continue
+                record['embedding'] = np.frombuffer(base64.b64decode(record['embedding']), dtype=np.float32)
+                records.append(record)
+        return records
+
+    def _file_state(self):
+        state = []
+        for path in (self.snapshot_path, self.log_path + '.compacting', self.log_path):
+            try:
+                stat = os.stat(path)
+                state.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                state.append(None)
+        return tuple(state)
+
+    def load(self):
+        """
+        Load the pool into dense arrays, cached until the pool files change
+
+        Once the append log holds POOL_COMPACT_THRESHOLD records the pool is
+        compacted, so later loads read the snapshot instead of replaying the log.
+
+        Returns:
+            Dict with ids, embeddings (normalized, N x d), skills (list of lists),
+            skill_matrix (SkillMatrix), keyword_scores (N x categories),
+            variability (N) and metadata
+        """
+        data, log_records = self._load()
+        if POOL_COMPACT_THRESHOLD and log_records >= POOL_COMPACT_THRESHOLD:
+            try:
+                data = self.compact()
+            except Exception as e:
+                logger.error("Could not compact pool '%s': %s", self.name, e)
+        return data
+
+    def _load(self):
+        """Pool arrays and the number of records read from the append log (0 on a cache hit)"""
+        with self._file_lock():
+            return self._read_pool()
+
+    def _read_pool(self):
+        """_load without taking the file lock, for callers that already hold it"""
+        with self._lock:
+            file_state = self._file_state()
+            if self._cache is not None and self._cache_key == file_state:
+                CACHE_REQUESTS.inc(cache='candidate_pool', result='hit')
+                return self._cache, 0
+            CACHE_REQUESTS.inc(cache='candidate_pool', result='miss')
+
+            snapshot = self._read_snapshot()
+            compacting_records = self._read_log(self.log_path + '.compacting')
+            log_records = self._read_log(self.log_path)
+
+            if snapshot is not None and not compacting_records and not log_records:
+                # Compacted pool: use the snapshot arrays as they are
+                self._cache = {
+                    'ids': snapshot['ids'],
+                    'embeddings': snapshot['embeddings'],
+                    'skills': self._snapshot_skills(snapshot),
+                    'skill_matrix': SkillMatrix.from_csr(snapshot['skill_vocab'], snapshot['skill_indptr'],
+                                                         snapshot['skill_indices']),
+                    'keyword_scores': snapshot['keyword_scores'],
+                    'variability': np.asarray(snapshot['variability'], dtype=np.float32),
+                    'metadata': snapshot['metadata']
+                }
+            else:
+                records = self._snapshot_records(snapshot) if snapshot is not None else []
+                records += compacting_records + log_records
+                self._cache = self._build(records)
+            self._cache_key = file_state
+            logger.info("Loaded %s candidates from pool '%s'", len(self._cache['ids']), self.name)
+            return self._cache, len(log_records)
+
+    def _build(self, records):
+        # Later records replace earlier ones with the same id
+        latest = {}
+        for record in records:
+            latest[record['id']] = record
+        records = list(latest.values())
+
+        if records:
+            embeddings = _normalize_rows(np.vstack([r['embedding'] for r in records]).astype(np.float32))
+            keyword_scores = np.vstack([np.asarray(r['keywordScores'], dtype=np.float32) for r in records])
+        else:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+            keyword_scores = np.zeros((0, len(CATEGORY_KEYS)), dtype=np.float32)
+
+        return {
+            'ids': [r['id'] for r in records],
+            'embeddings': embeddings,
+            'skills': [list(r['skills']) for r in records],
+            'skill_matrix': SkillMatrix([r['skills'] for r in records]),
+            'keyword_scores': keyword_scores,
+            'variability': np.asarray([r['variability'] for r in records], dtype=np.float32),
+            'metadata': [r.get('metadata') or {} for r in records]
+        }
+
+    def compact(self):
+        """
+        Fold the append log into the npz snapshot
+
+        Returns:
+            The pool arrays, as load() returns them
+        """
+        os.makedirs(self.pool_dir, exist_ok=True)
+        # Another process compacting at the same time would write a snapshot without this one's records
+        with self._file_lock(exclusive=True):
+            compacting_path = self.log_path + '.compacting'
+            if os.path.exists(self.log_path) and not os.path.exists(compacting_path):
+                # A .compacting log left by a crashed compaction is kept and folded in below as well
+                os.replace(self.log_path, compacting_path)
+
+            pool, _ = self._read_pool()
+            skill_matrix = pool['skill_matrix']
+
+            temp_path = f"{self.snapshot_path}.{os.getpid()}.tmp.npz"
+            np.savez(
+                temp_path,
+                ids=np.asarray(pool['ids'], dtype=str),
+                embeddings=pool['embeddings'],
+                keyword_scores=pool['keyword_scores'],
+                variability=pool['variability'],
+                skill_vocab=np.asarray([skill_matrix.vocabulary.skill(i) for i in range(len(skill_matrix.vocabulary))], dtype=str),
+                skill_indptr=skill_matrix.indptr,
+                skill_indices=skill_matrix.indices,
+                metadata=np.asarray(json.dumps(pool['metadata']))
+            )
+            os.replace(temp_path, self.snapshot_path)
+            try:
+                os.remove(compacting_path)
+            except FileNotFoundError:
+                pass
+
+            with self._lock:
+                # The loaded arrays are the snapshot just written
+                file_state = self._file_state()
+                if file_state[1] is None and file_state[2] is None and self._cache is pool:
+                    self._cache_key = file_state
+        logger.info("Compacted pool '%s' to %s candidates", self.name, len(pool['ids']))
+        return pool
+
+def skill_match_scores(data, job_skills):
+    """
+    Vectorized skill match score (0-100) of every candidate against one job
+
+    Follows calculate_match_score: exact matches count fully, partial matches
+    half, and candidates without skills get the default score.
+
+    Args:
+        data: Pool arrays as returned by CandidatePool.load
+        job_skills: List of required skills for the job
+
+    Returns:
+        Array with one score per candidate
+    """
+    skill_matrix = data['skill_matrix']
+    if not job_skills:
+        return np.full(len(skill_matrix), DEFAULT_SKILL_MATCH, dtype=np.float32)
+
+    full_count, partial_count = skill_matrix.match_counts(job_skills)
+    scores = (full_count + 0.5 * partial_count) / len(job_skills) * 100
+    return np.where(skill_matrix.has_skills(), scores, DEFAULT_SKILL_MATCH).astype(np.float32)
+
+def rank_candidates(pool, job_description, job_skills, job_category=None, top_k=10, job_embedding=None):
+    """
+    Score every candidate of a pool against one job and return the top k
+
+    Args:
+        pool: CandidatePool to rank
+        job_description: The job description text
+        job_skills: List of required skills for the job
+        job_category: Optional job category (will be detected from description if not provided)
+        top_k: Number of candidates to return
+        job_embedding: Optional precomputed SBERT embedding of the job description
+
+    Returns:
+        Dict with the resolved category, pool size and the ranked candidates
+    """
+    data = pool.load()
+    total = len(data['ids'])
+
+    if job_category:
+        job_category = normalize_job_category(job_category)
+    else:
+        job_category = detect_job_category(job_description)
+    weights = JOB_CATEGORIES[job_category]['weights']
+
+    if total == 0:
+        return {'jobCategory': job_category, 'poolSize': 0, 'candidates': []}
+
+    if not job_description:
+        # calculate_match_score returns a flat score without a job description
+        scores = np.full(total, 30.0, dtype=np.float32)
+        text_similarity = skill_match = keyword_match = np.zeros(total, dtype=np.float32)
+    else:
+        # Text similarity: cosine of normalized embeddings in one matrix-vector product
+        if job_embedding is None:
+            encoded = encode_texts([job_description])
+            job_embedding = encoded[0] if encoded is not None else None
+        if job_embedding is not None and data['embeddings'].shape[1]:
+            job_vector = _to_numpy(job_embedding)
+            job_vector = job_vector / (np.linalg.norm(job_vector) or 1.0)
+            text_similarity = data['embeddings'] @ job_vector * 100
+        else:
+            logger.warning("No job embedding available, using default text similarity")
+            text_similarity = np.full(total, DEFAULT_TEXT_SIMILARITY, dtype=np.float32)
+
+        skill_match = skill_match_scores(data, job_skills or [])
+        keyword_match = data['keyword_scores'][:, CATEGORY_KEYS.index(job_category)]
+
+        raw = (weights['text_similarity'] * text_similarity
+               + weights['skill_match'] * skill_match
+               + weights['keyword_match'] * keyword_match
+               + data['variability'])
+        scores = np.clip(np.round(raw, 1), 15.0, 100.0)
+
+    top_k = max(1, min(int(top_k), total))
+    top = np.argpartition(-scores, top_k - 1)[:top_k]
+    top = top[np.argsort(-scores[top], kind='stable')]
+
+    candidates = []
+    for row in top:
+        score = float(scores[row])
+        candidates.append({
+            'candidateId': data['ids'][row],
+            'matchScore': round(score, 1),
+            'isShortlisted': score >= 75,
+            'components': {
+                'textSimilarity': round(float(text_similarity[row]), 2),
+                'skillMatch': round(float(skill_match[row]), 2),
+                'keywordMatch': round(float(keyword_match[row]), 2)
+            },
+            'metadata': data['metadata'][row]
+        })
+
+    return {'jobCategory': job_category, 'poolSize': total, 'candidates': candidates}
+
+# Pools are cached per process so repeated rankings reuse loaded arrays
+_pools = {}
+
+def get_pool(name=None):
+    """
+    Get or create the CandidatePool instance for a pool name
+
+    Raises:
+        ValueError: If the pool name contains characters other than letters, digits, '-' and '_'
+    """
+    name = name or DEFAULT_POOL
+    if not POOL_NAME_PATTERN.match(name):
+        raise ValueError(f"Invalid pool name: {name}")
+    if name not in _pools:
+        _pools[name] = CandidatePool(name)
+    return _pools[name]
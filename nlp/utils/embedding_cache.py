@@ -0,0 +1,102 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from .calculate_score import clean_similarity_text, encode_texts
+from .metrics import CACHE_REQUESTS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Number of job description embeddings kept per process
+EMBEDDING_CACHE_SIZE = int(os.environ.get('EMBEDDING_CACHE_SIZE', 1024))
+
+def embedding_key(text):
+    """Cache key of a text: the hash of the text actually fed to the model"""
+    return hashlib.sha1(clean_similarity_text(text or '').encode('utf-8')).hexdigest()
+
+class EmbeddingCache:
+    """
+    LRU cache of SBERT embeddings keyed by the hash of the cleaned text
+
+    Job descriptions are usually scored against many resumes, so their
+    embeddings are worth keeping between tasks.
+    """
+
+    def __init__(self, max_size=EMBEDDING_CACHE_SIZE, name='embeddings'):
+        self.name = name
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_many(self, texts):
+        """
+        Get the embeddings of several texts, encoding all cache misses in one batch
+
+        Returns:
+            List of embeddings in input order (None for empty texts or if encoding failed)
+        """
+        keys = [embedding_key(text) if text else None for text in texts]
+        embeddings = [None] * len(texts)
+        missing = {}
+        hits = 0
+        with self._lock:
+            for index, key in enumerate(keys):
+                if key is None:
+                    continue
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    embeddings[index] = self._entries[key]
+                    hits += 1
+                elif key in missing:
+                    # Repeated within this call: encoded once with the first occurrence
+                    missing[key].append(index)
+                    hits += 1
+                else:
+                    missing[key] = [index]
+            self.hits += hits
+            self.misses += len(missing)
+        CACHE_REQUESTS.inc(hits, cache=self.name, result='hit')
+        CACHE_REQUESTS.inc(len(missing), cache=self.name, result='miss')
+
+        if missing:
+            encoded = encode_texts([texts[indices[0]] for indices in missing.values()])
+            if encoded is None:
+                logger.warning("Could not encode %s uncached texts", len(missing))
+                return embeddings
+            with self._lock:
+                for (key, indices), embedding in zip(missing.items(), encoded):
+                    for index in indices:
+                        embeddings[index] = embedding
+                    self._entries[key] = embedding
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+        return embeddings
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRatio': self.hits / lookups if lookups else 0.0
+        }
+
+_job_embedding_cache = None
+_job_embedding_cache_lock = threading.Lock()
+
+def get_job_embedding_cache():
+    """Get the per-process cache of job description embeddings"""
+    global _job_embedding_cache
+    with _job_embedding_cache_lock:
+        if _job_embedding_cache is None:
+            _job_embedding_cache = EmbeddingCache(name='job_embeddings')
+        return _job_embedding_cache
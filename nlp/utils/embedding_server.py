@@ -0,0 +1,217 @@
+"""
+Embedding server shared by the API and the Celery workers of a node
+
+Loads the SBERT model once and serves embeddings over local HTTP, so API
+and worker processes with EMBEDDING_BACKEND=remote do not hold a model of
+their own. Concurrent requests are coalesced into batched forward passes.
+
+Usage (from the nlp directory):
+
+    EMBEDDING_BACKEND=onnx python -m utils.embedding_server --port 8765
+
+POST /embed with {"texts": [...]} returns the float32 embeddings as raw
+little-endian bytes (X-Embedding-Rows x X-Embedding-Dimension); GET /health
+describes the model and GET /metrics exposes the server's metrics.
+"""
+
+import os
+import json
+import time
+import queue
+import logging
+import argparse
+import threading
+import traceback
+import numpy as np
+from concurrent.futures import Future
+from .embeddings import get_embedding_provider, SBERT_MODEL, EMBEDDING_BACKEND
+from .metrics import EMBEDDING_BATCH_SIZE, render_prometheus, PROMETHEUS_CONTENT_TYPE
+from .logging_config import configure_logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+EMBEDDING_SERVER_HOST = os.environ.get('EMBEDDING_SERVER_HOST', '127.0.0.1')
+EMBEDDING_SERVER_PORT = int(os.environ.get('EMBEDDING_SERVER_PORT', '8765'))
+# Most texts encoded in one forward pass
+EMBEDDING_SERVER_MAX_BATCH = int(os.environ.get('EMBEDDING_SERVER_MAX_BATCH', '64'))
+# Milliseconds the first request of a batch waits for others to join it
+EMBEDDING_SERVER_MAX_WAIT_MS = float(os.environ.get('EMBEDDING_SERVER_MAX_WAIT_MS', '5'))
+# Most texts accepted in one request
+EMBEDDING_SERVER_MAX_TEXTS = int(os.environ.get('EMBEDDING_SERVER_MAX_TEXTS', '512'))
+
+EMBEDDING_CONTENT_TYPE = 'application/octet-stream'
+
+class DynamicBatcher:
+    """
+    Coalesces concurrent encode requests into batched forward passes
+
+    Request threads submit their texts and wait on a Future. A single
+    encoding thread takes the first waiting request, gathers more for up to
+    max_wait_ms or until max_batch texts are pending, encodes them in one
+    call and hands every request its rows.
+    """
+
+    def __init__(self, encode, max_batch=None, max_wait_ms=None):
+        self.encode = encode
+        self.max_batch = max_batch or EMBEDDING_SERVER_MAX_BATCH
+        self.max_wait = (EMBEDDING_SERVER_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000
+        self.batches = 0
+        self.texts = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='embedding-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        """Queue texts for encoding; the Future resolves to one float32 row per text"""
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future
+
+    def _collect(self):
+        pending = [self._queue.get()]
+        size = len(pending[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            texts = [text for item_texts, _ in pending for text in item_texts]
+            try:
+                embeddings = np.asarray(self.encode(texts, batch_size=self.max_batch), dtype=np.float32)
+            except Exception as e:
+                logger.error("Encoding a batch of %s texts failed: %s", len(texts), e)
+                logger.error(traceback.format_exc())
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.texts += len(texts)
+            EMBEDDING_BATCH_SIZE.observe(len(texts))
+            start = 0
+            for item_texts, future in pending:
+                future.set_result(embeddings[start:start + len(item_texts)])
+                start += len(item_texts)
+
+def start_embedding_server(host=None, port=None, provider=None, max_batch=None, max_wait_ms=None, background=False):
+    """
+    Load the model and serve it
+
+    Args:
+        host, port: Address to listen on (EMBEDDING_SERVER_HOST/PORT by default)
+        provider: EmbeddingProvider to serve (the process-wide one by default)
+        max_batch, max_wait_ms: DynamicBatcher settings
+        background: Serve from a daemon thread instead of blocking
+
+    Returns:
+        The ThreadingHTTPServer
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    provider = provider or get_embedding_provider()
+    dimension = int(np.asarray(provider.encode(['warm up the embedding server'])).shape[1])
+    batcher = DynamicBatcher(provider.encode, max_batch, max_wait_ms)
+
+    class EmbeddingHandler(BaseHTTPRequestHandler):
+        # Keep-alive, so clients can reuse pooled connections
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status, body, content_type='application/json', headers=None):
+            if isinstance(body, dict):
+                body = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, str(value))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split('?')[0]
+            if path == '/health':
+                self._send(200, {
+                    'success': True,
+                    'model': provider.model_name,
+                    'backend': provider.backend,
+                    'dimension': dimension,
+                    'batches': batcher.batches,
+                    'texts': batcher.texts
+                })
+            elif path == '/metrics':
+                self._send(200, render_prometheus().encode('utf-8'), PROMETHEUS_CONTENT_TYPE)
+            else:
+                self._send(404, {'success': False, 'message': 'Not found'})
+
+        def do_POST(self):
+            if self.path.split('?')[0] != '/embed':
+                self._send(404, {'success': False, 'message': 'Not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                texts = json.loads(self.rfile.read(length) or b'{}').get('texts')
+            except (ValueError, AttributeError):
+                self._send(400, {'success': False, 'message': 'Body must be JSON with a texts list'})
+                return
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                self._send(400, {'success': False, 'message': 'texts must be a list of strings'})
+                return
+            if len(texts) > EMBEDDING_SERVER_MAX_TEXTS:
+                self._send(413, {'success': False, 'message': f'At most {EMBEDDING_SERVER_MAX_TEXTS} texts per request'})
+                return
+            try:
+                embeddings = batcher.submit(texts).result() if texts else np.zeros((0, dimension), dtype=np.float32)
+            except Exception as e:
+                self._send(500, {'success': False, 'message': f'Error encoding texts: {str(e)}'})
+                return
+            self._send(200, embeddings.astype('<f4').tobytes(), EMBEDDING_CONTENT_TYPE, {
+                'X-Embedding-Rows': len(texts),
+                'X-Embedding-Dimension': dimension
+            })
+
+        def log_message(self, format, *args):
+            logger.debug("Embedding request: " + format, *args)
+
+    host = host or EMBEDDING_SERVER_HOST
+    port = EMBEDDING_SERVER_PORT if port is None else port
+    server = ThreadingHTTPServer((host, port), EmbeddingHandler)
+    server.daemon_threads = True
+    logger.info("Serving %s (%s, dimension %s) on %s:%s",
+                provider.model_name, provider.backend, dimension, host, server.server_address[1])
+    if background:
+        threading.Thread(target=server.serve_forever, name='embedding-server', daemon=True).start()
+    else:
+        server.serve_forever()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve SBERT embeddings to the API and workers of this node')
+    parser.add_argument('--host', default=EMBEDDING_SERVER_HOST)
+    parser.add_argument('--port', type=int, default=EMBEDDING_SERVER_PORT)
+    parser.add_argument('--model', default=SBERT_MODEL)
+    parser.add_argument('--backend', default=None, choices=('torch', 'onnx'),
+                        help="Backend the server encodes with (EMBEDDING_BACKEND unless that is 'remote')")
+    parser.add_argument('--max-batch', type=int, default=EMBEDDING_SERVER_MAX_BATCH)
+    parser.add_argument('--max-wait-ms', type=float, default=EMBEDDING_SERVER_MAX_WAIT_MS)
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    backend = args.backend or (EMBEDDING_BACKEND if EMBEDDING_BACKEND != 'remote' else 'torch')
+    provider = get_embedding_provider(args.model, backend)
+    if not provider.available:
+        raise SystemExit(f"Could not load {args.model} with the {backend} backend")
+    start_embedding_server(args.host, args.port, provider, args.max_batch, args.max_wait_ms)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+import os
+import json
+import time
+import logging
+import threading
+import numpy as np
+from .metrics import MODEL_LOAD_DURATION
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# sentence-transformers model behind every SBERT embedding
+SBERT_MODEL = os.environ.get('SBERT_MODEL', 'all-MiniLM-L6-v2')
+# 'torch' (sentence-transformers), 'onnx' (ONNX Runtime, see export_onnx_model.py)
+# or 'remote' (the node's embedding server, see utils/embedding_server.py)
+EMBEDDING_BACKEND = os.environ.get('EMBEDDING_BACKEND', 'torch').lower()
+# Exported models live in <ONNX_MODEL_DIR>/<model name>
+ONNX_MODEL_DIR = os.environ.get('ONNX_MODEL_DIR', 'models/onnx')
+# model_int8.onnx (dynamically quantized) or model.onnx (float32)
+ONNX_MODEL_FILE = os.environ.get('ONNX_MODEL_FILE', 'model_int8.onnx')
+ONNX_THREADS = int(os.environ.get('ONNX_THREADS', '0'))
+# Embedding server used by the remote backend
+EMBEDDING_SERVICE_URL = os.environ.get('EMBEDDING_SERVICE_URL', 'http://127.0.0.1:8765')
+EMBEDDING_SERVICE_TIMEOUT = float(os.environ.get('EMBEDDING_SERVICE_TIMEOUT', '30'))
+# Keep-alive connections per process (one per thread encoding at the same time)
+EMBEDDING_SERVICE_POOL_SIZE = int(os.environ.get('EMBEDDING_SERVICE_POOL_SIZE', '8'))
+
+EMBEDDING_BACKENDS = ('torch', 'onnx', 'remote')
+
+def load_sentence_transformer(model_name):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+def _as_output(embeddings, single, convert_to_tensor):
+    """Shape numpy embeddings the way SentenceTransformer.encode returns them"""
+    if convert_to_tensor:
+        try:
+            import torch
+            embeddings = torch.from_numpy(np.array(embeddings))
+        except ImportError:
+            pass
+    return embeddings[0] if single else embeddings
+
+def onnx_model_path(model_name, model_dir=None):
+    return os.path.join(model_dir or ONNX_MODEL_DIR, model_name.replace('/', '__'))
+
+class OnnxEncoder:
+    """
+    Sentence embeddings from a model exported by export_onnx_model.py
+
+    Tokenizes with the model's own tokenizer, runs the transformer with ONNX
+    Runtime and applies the pooling and normalization recorded at export
+    time, so encode() matches SentenceTransformer.encode without torch.
+    """
+
+    def __init__(self, path, model_file=None, threads=None):
+        import onnxruntime
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(path, 'embedding_config.json'), 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
+        self.tokenizer = AutoTokenizer.from_pretrained(path)
+        options = onnxruntime.SessionOptions()
+        threads = ONNX_THREADS if threads is None else threads
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(path, model_file or ONNX_MODEL_FILE), options, providers=['CPUExecutionProvider'])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    def _encode_batch(self, texts):
+        tokens = self.tokenizer(texts, padding=True, truncation=True,
+                                max_length=self.config['max_seq_length'], return_tensors='np')
+        feed = {name: tokens[name].astype(np.int64) for name in self.input_names if name in tokens}
+        hidden = self.session.run(None, feed)[0]
+        if self.config['pooling'] == 'cls':
+            pooled = hidden[:, 0]
+        else:
+            mask = tokens['attention_mask'][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.config['normalize']:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32)
+
+    def encode(self, texts, batch_size=32, convert_to_tensor=False):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        # Sorting by length keeps padding within a batch small
+        order = sorted(range(len(texts)), key=lambda index: -len(texts[index]))
+        embeddings = np.zeros((len(texts), self.config['dimension']), dtype=np.float32)
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            embeddings[indices] = self._encode_batch([texts[index] for index in indices])
+        return _as_output(embeddings, single, convert_to_tensor)
+
+class RemoteEncoder:
+    """
+    Client of the node's embedding server (utils/embedding_server.py)
+
+    One requests session with a pool of keep-alive connections is shared by
+    the threads of a process; a forked process (e.g. a prefork pool process
+    after worker preloading) opens its own. Encoding errors raise, so callers
+    fall back the same way as when no model is available.
+    """
+
+    # Texts per request; the server accepts up to EMBEDDING_SERVER_MAX_TEXTS
+    max_texts = 256
+
+    def __init__(self, url=None, timeout=None, pool_size=None):
+        self.url = (url or EMBEDDING_SERVICE_URL).rstrip('/')
+        self.timeout = timeout or EMBEDDING_SERVICE_TIMEOUT
+        self.pool_size = pool_size or EMBEDDING_SERVICE_POOL_SIZE
+        self._session = None
+        self._pid = None
+        response = self.session.get(f"{self.url}/health", timeout=min(self.timeout, 2.0))
+        response.raise_for_status()
+        self.info = response.json()
+        self.dimension = int(self.info['dimension'])
+
+    @property
+    def session(self):
+        if self._session is None or self._pid != os.getpid():
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            # max_retries only retries connecting, e.g. after the server closed an idle connection
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=1)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._session, self._pid = session, os.getpid()
+        return self._session
+
+    def _post(self, texts):
+        response = self.session.post(f"{self.url}/embed", json={'texts': texts}, timeout=self.timeout)
+        if response.status_code != 200:
+            raise RuntimeError(f"Embedding service returned HTTP {response.status_code}: {response.text[:200]}")
+        dimension = int(response.headers.get('X-Embedding-Dimension', self.dimension))
+        return np.frombuffer(response.content, dtype='<f4').reshape(len(texts), dimension)
+
+    def encode(self, texts, batch_size=32, convert_to_tensor=False):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        # The server batches across requests, so batch_size is left to it
+        chunks = [self._post(texts[start:start + self.max_texts]) for start in range(0, len(texts), self.max_texts)]
+        embeddings = np.concatenate(chunks) if chunks else np.zeros((0, self.dimension), dtype=np.float32)
+        return _as_output(embeddings, single, convert_to_tensor)
+
+def load_model(model_name, backend):
+    """
+    Load a model with the given backend
+
+    A model that was not exported for the onnx backend, or an embedding
+    server that does not answer when the remote backend is first used,
+    falls back to torch, so either degrades speed or memory rather than
+    scoring.
+    """
+    if backend == 'onnx':
+        try:
+            return OnnxEncoder(onnx_model_path(model_name))
+        except Exception as e:
+            logger.error("Could not load ONNX model %s from %s: %s", model_name, onnx_model_path(model_name), e)
+            logger.warning("Falling back to the torch embedding backend")
+    elif backend == 'remote':
+        try:
+            encoder = RemoteEncoder()
+            if encoder.info.get('model') != model_name:
+                logger.warning("Embedding service serves %s, not %s", encoder.info.get('model'), model_name)
+            return encoder
+        except Exception as e:
+            logger.error("Embedding service at %s is not available: %s", EMBEDDING_SERVICE_URL, e)
+            logger.warning("Falling back to the torch embedding backend")
+    elif backend != 'torch':
+        logger.warning("Unknown EMBEDDING_BACKEND %s, using torch", backend)
+    return load_sentence_transformer(model_name)
+
+class EmbeddingProvider:
+    """
+    Owns the SBERT model of a process, loaded on first use
+
+    calculate_score and SBERTScorer share one provider, so a process holds a
+    single copy of the model, and processes that never embed anything (the
+    API unless it checks duplicates) never load it. A failed load is not
+    retried; callers fall back to their non-SBERT scoring.
+    """
+
+    def __init__(self, model_name=SBERT_MODEL, backend=None):
+        self.model_name = model_name
+        self.backend = backend or EMBEDDING_BACKEND
+        self._model = None
+        self._load_failed = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    @property
+    def model(self):
+        """The loaded model, or None if it could not be loaded"""
+        if self._model is None and not self._load_failed:
+            with self._lock:
+                if self._model is None and not self._load_failed:
+                    try:
+                        logger.info("Loading SBERT model: %s (%s)", self.model_name, self.backend)
+                        start_time = time.perf_counter()
+                        self._model = load_model(self.model_name, self.backend)
+                        MODEL_LOAD_DURATION.observe(time.perf_counter() - start_time, model='sbert')
+                        logger.info("SBERT model loaded successfully")
+                    except Exception as e:
+                        logger.error("Error loading SBERT model %s: %s", self.model_name, e)
+                        self._load_failed = True
+        return self._model
+
+    @property
+    def available(self):
+        return self.model is not None
+
+    def encode(self, texts, batch_size=32, convert_to_tensor=False):
+        """
+        Embed one text or a list of texts
+
+        Args:
+            texts: A string or list of strings
+            batch_size: Number of texts per forward pass
+            convert_to_tensor: Return a torch tensor instead of a numpy array
+
+        Returns:
+            One embedding for a string, otherwise one row per text
+
+        Raises:
+            RuntimeError: If the model is not available
+        """
+        model = self.model
+        if model is None:
+            raise RuntimeError(f"SBERT model {self.model_name} is not available")
+        return model.encode(texts, batch_size=batch_size, convert_to_tensor=convert_to_tensor)
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+def get_embedding_provider(model_name=None, backend=None):
+    """Get the per-process provider of a model (SBERT_MODEL and EMBEDDING_BACKEND by default)"""
+    key = (model_name or SBERT_MODEL, backend or EMBEDDING_BACKEND)
+    with _providers_lock:
+        if key not in _providers:
+            _providers[key] = EmbeddingProvider(*key)
+        return _providers[key]
+
+def cos_sim(a, b):
+    """
+    Cosine similarity of every row of a with every row of b
+
+    Accepts torch tensors (computed with sentence_transformers.util) or
+    array-likes (computed with numpy), single embeddings or batches.
+
+    Returns:
+        2-D matrix of shape (len(a), len(b))
+    """
+    if hasattr(a, 'cpu') or hasattr(b, 'cpu'):
+        from sentence_transformers import util
+        return util.cos_sim(a, b)
+    a = np.atleast_2d(np.asarray(a, dtype=np.float32))
+    b = np.atleast_2d(np.asarray(b, dtype=np.float32))
+    a_norm = np.linalg.norm(a, axis=1, keepdims=True)
+    b_norm = np.linalg.norm(b, axis=1, keepdims=True)
+    a_norm[a_norm == 0] = 1.0
+    b_norm[b_norm == 0] = 1.0
+    return (a / a_norm) @ (b / b_norm).T
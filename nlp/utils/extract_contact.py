@@ -0,0 +1,95 @@
+import re
+import logging
+from .nlp_model import get_nlp
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load spaCy model
+nlp = get_nlp()
+
+# Number of leading characters parsed by spaCy for each extractor
+CONTACT_PARSE_CHARS = 5000  # Process first 5000 chars to save time
+NAME_PARSE_CHARS = 1000  # Names appear at the beginning of the resume
+
+def extract_contact_info(text, doc=None):
+    """
+    Extract contact information from resume text
+
+    Args:
+        text: The resume text
+        doc: Optional pre-parsed spaCy Doc of text[:CONTACT_PARSE_CHARS]
+    """
+    if not text:
+        return {}
+
+    contact = {}
+    # Email pattern
+    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+    # Phone pattern - handle various formats
+    phone_pattern = r'(?:\+\d{1,3}[-.\s]?)?(?:\(?\d{3}\)?[-.\s]?)?\d{3}[-.\s]?\d{4}'
+    # LinkedIn pattern
+    linkedin_pattern = r'(?:linkedin\.com/in/|linkedin:\s*)([a-zA-Z0-9_-]+)'
+
+    emails = re.findall(email_pattern, text)
+    phones = re.findall(phone_pattern, text)
+    linkedin = re.findall(linkedin_pattern, text.lower())
+
+    if emails:
+        contact['email'] = emails[0]
+    if phones:
+        contact['phone'] = phones[0]
+    if linkedin:
+        contact['linkedin'] = f"linkedin.com/in/{linkedin[0]}"
+
+    # Extract address if NLP is available
+    if nlp:
+        try:
+            if doc is None:
+                doc = nlp(text[:CONTACT_PARSE_CHARS])
+            for ent in doc.ents:
+                if ent.label_ in ['GPE', 'LOC']:
+                    if 'address' not in contact:
+                        contact['address'] = ent.text
+                    else:
+                        contact['address'] += f", {ent.text}"
+        except Exception as e:
+            logger.error("Error extracting address with spaCy: %s", e)
+
+    return contact
+
+def extract_candidate_name(text, doc=None):
+    """
+    Extract candidate name from resume
+
+    Args:
+        text: The resume text
+        doc: Optional pre-parsed spaCy Doc of text[:NAME_PARSE_CHARS]
+    """
+    if not text or not nlp:
+        return ''
+
+    try:
+        # Look for name at the beginning of the resume (first 1000 chars)
+        if doc is None:
+            doc = nlp(text[:NAME_PARSE_CHARS])
+
+        # First check for PERSON entities
+        for ent in doc.ents:
+            if ent.label_ == 'PERSON':
+                # Validate this isn't a company name
+                if not any(term in ent.text.lower() for term in ['inc', 'corp', 'llc', 'ltd', 'company']):
+                    return ent.text
+
+        # If no clear PERSON entity, look for capitalized words at the start
+        lines = text[:NAME_PARSE_CHARS].split('\n')
+        for line in lines[:5]:  # Check first 5 lines
+            line = line.strip()
+            if 2 <= len(line.split()) <= 5 and all(word[0].isupper() for word in line.split() if word):
+                # Likely a name if 2-5 capitalized words
+                return line
+
+    except Exception as e:
+        logger.error("Error extracting candidate name: %s", e)
+
+    return ''
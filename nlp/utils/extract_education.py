@@ -1,8 +1,8 @@
 import re
-import spacy
 from datetime import datetime
+from .nlp_model import get_nlp
 
-nlp = spacy.load('en_core_web_sm')
+nlp = get_nlp()
 
 # Common degrees
 DEGREES = [
@@ -26,19 +26,13 @@ EDUCATION_HEADERS = [
     "academic history", "qualifications", "degrees", "academic credentials"
 ]
 
-def extract_education(text):
+def find_education_section(text):
     """
-    Extract education information from resume text
+    Find the education section of a resume
     
     Returns:
-        List of dictionaries with education information
+        The education section text, or the entire text if no section was found
     """
-    # Check if text is empty
-    if not text or len(text.strip()) == 0:
-        return []
-    
-    education_list = []
-    
     # Pre-process text to identify sections
     lines = text.split('\n')
     education_section = False
@@ -64,8 +58,28 @@ def extract_education(text):
     if not education_text:
         education_text = text
     
-    # Process with NLP
-    doc = nlp(education_text)
+    return education_text
+
+def extract_education(text, doc=None):
+    """
+    Extract education information from resume text
+    
+    Args:
+        text: The resume text
+        doc: Optional pre-parsed spaCy Doc of find_education_section(text)
+    
+    Returns:
+        List of dictionaries with education information
+    """
+    # Check if text is empty
+    if not text or len(text.strip()) == 0:
+        return []
+    
+    education_list = []
+    
+    # Process with NLP unless a parsed Doc was supplied
+    if doc is None:
+        doc = nlp(find_education_section(text))
     
     # Extract sentences that contain degree keywords
     degree_sentences = []
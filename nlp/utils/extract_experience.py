@@ -1,12 +1,12 @@
 import re
-import spacy
 import logging
+from .nlp_model import get_nlp
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
 # Load spaCy model
-nlp = spacy.load('en_core_web_sm')
+nlp = get_nlp()
 
 # Common job titles and roles to help with detection
 JOB_TITLES = [
@@ -66,7 +66,7 @@ def extract_experience(text):
             # Check if this is an experience section header
             if any(header.lower() in line.lower() for header in EXPERIENCE_HEADERS):
                 in_experience_section = True
-                logger.info(f"Found experience section at line: {line}")
+                logger.info("Found experience section at line: %s", line)
                 continue
                 
             # Check if we've moved to a different section
@@ -77,7 +77,7 @@ def extract_experience(text):
                     description_lines = []
                     current_experience = None
                 in_experience_section = False
-                logger.info(f"Exiting experience section at line: {line}")
+                logger.info("Exiting experience section at line: %s", line)
                 continue
                 
             if not in_experience_section:
@@ -178,9 +178,9 @@ def extract_experience(text):
                 
             processed_experiences.append(exp)
             
-        logger.info(f"Extracted {len(processed_experiences)} experience entries")
+        logger.info("Extracted %s experience entries", len(processed_experiences))
         return processed_experiences
         
     except Exception as e:
-        logger.error(f"Error extracting experience: {str(e)}")
+        logger.error("Error extracting experience: %s", e)
         return []
\ No newline at end of file
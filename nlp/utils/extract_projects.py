@@ -1,15 +1,16 @@
-import spacy
 import re
 import logging
+from .nlp_model import get_nlp
 
-nlp = spacy.load('en_core_web_sm')
+nlp = get_nlp()
 
-def extract_projects(resume_text):
+def extract_projects(resume_text, doc=None):
     """
     Extract project details from resume text.
     
     Args:
         resume_text: The resume text to extract projects from
+        doc: Optional pre-parsed spaCy Doc of the resume text
         
     Returns:
         List of dictionaries containing project details:
@@ -19,7 +20,8 @@ def extract_projects(resume_text):
         - duration: Project duration
     """
     try:
-        doc = nlp(resume_text)
+        if doc is None:
+            doc = nlp(resume_text)
         projects = []
         project_pattern = r'(?:project|work|developed)\s*:\s*([\w\s]+?)(?:\s*(?:,|\(|from)?\s*(\d{4}\s*-\s*(?:\d{4}|present)))?(?:\s*using\s*([\w\s,]+))?'
 
@@ -1,56 +1,34 @@
-import spacy
 import re
 import logging
 from collections import Counter
+from functools import lru_cache
 from spacy.matcher import PhraseMatcher
+from .nlp_model import get_nlp
+from .skill_taxonomy import COMMON_TECH_SKILLS, ACADEMIC_SKILLS
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Load spaCy model
-try:
-    nlp = spacy.load('en_core_web_sm')
-    logger.info("Loaded spaCy model successfully")
-except Exception as e:
-    logger.error(f"Error loading spaCy model: {str(e)}")
-    nlp = None
+nlp = get_nlp()
 
-# Common tech skills
-COMMON_TECH_SKILLS = [
-    'python', 'java', 'javascript', 'react', 'node.js', 'nodejs', 'vue', 'angular',
-    'html', 'css', 'mongodb', 'mysql', 'postgresql', 'sql', 'nosql',
-    'express', 'django', 'flask', 'php', 'laravel', 'spring', 'docker',
-    'kubernetes', 'aws', 'azure', 'gcp', 'cloud', 'devops', 'ci/cd',
-    'git', 'github', 'gitlab', 'rest api', 'graphql', 'typescript',
-    'machine learning', 'data science', 'artificial intelligence', 'ai', 'ml',
-    'nlp', 'deep learning', 'tensorflow', 'pytorch', 'keras', 'numpy', 'pandas',
-    'data analysis', 'data visualization', 'tableau', 'power bi', 'excel',
-    'frontend', 'backend', 'full stack', 'mobile', 'ios', 'android', 'react native',
-    'flutter', 'swift', 'kotlin', 'c++', 'c#', '.net', 'ruby', 'rails',
-    'agile', 'scrum', 'jira', 'confluence', 'jenkins', 'cybersecurity', 'security',
-    'penetration testing', 'ethical hacking', 'malware analysis', 'incident response',
-    'firewall', 'encryption', 'vpn', 'authentication', 'authorization',
-]
+@lru_cache(maxsize=32)
+def _build_skill_matcher(multi_token_skills):
+    """Build a PhraseMatcher for a frozenset of multi-token skills (cached)"""
+    skill_patterns = list(nlp.pipe(sorted(multi_token_skills)))
+    matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    for skill in skill_patterns:
+        matcher.add(skill.text, None, skill)
+    return matcher
 
-# Academic and teaching skills for lectureship positions
-ACADEMIC_SKILLS = [
-    'teaching', 'lecturing', 'research', 'curriculum development', 'academic writing',
-    'course design', 'assessment', 'pedagogy', 'instructional design', 'student mentoring',
-    'phd', 'doctorate', 'masters', 'ms', 'mphil', 'thesis supervision', 'grant writing',
-    'academic publishing', 'scholarly activity', 'peer review', 'journal publication',
-    'conference presentation', 'workshop facilitation', 'lab supervision',
-    'classroom management', 'online teaching', 'lms', 'blackboard', 'moodle', 'canvas',
-    'education technology', 'higher education', 'academic administration', 'faculty development',
-]
-
-def extract_skills(text, job_required_skills=None):
+def extract_skills(text, job_required_skills=None, doc=None):
     """
     Extract skills from resume text
     
     Args:
         text: The resume text
         job_required_skills: List of required skills for the job
+        doc: Optional pre-parsed spaCy Doc of the resume text (e.g. from nlp.pipe)
         
     Returns:
         List of extracted skills
@@ -62,7 +40,7 @@ def extract_skills(text, job_required_skills=None):
         
     text = text.lower()
     
-    logger.info(f"Extracting skills from text of length {len(text)}")    
+    logger.info("Extracting skills from text of length %s", len(text))    
         
     # Combine all skill lists and job-required skills
     all_skills = set(COMMON_TECH_SKILLS + ACADEMIC_SKILLS)
@@ -71,7 +49,7 @@ def extract_skills(text, job_required_skills=None):
         # Clean and normalize the job required skills
         cleaned_job_skills = [skill.lower().strip() for skill in job_required_skills if skill.strip()]
         all_skills.update(cleaned_job_skills)
-        logger.info(f"Added {len(cleaned_job_skills)} job-specific skills to the skills corpus")
+        logger.info("Added %s job-specific skills to the skills corpus", len(cleaned_job_skills))
     
     extracted_skills = []
     
@@ -79,14 +57,11 @@ def extract_skills(text, job_required_skills=None):
     if nlp:
         try:
             # Create skill patterns for the matcher
-            skill_patterns = list(nlp.pipe([skill for skill in all_skills if ' ' in skill]))
-            
-            matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-            for skill in skill_patterns:
-                matcher.add(skill.text, None, skill)
+            matcher = _build_skill_matcher(frozenset(skill for skill in all_skills if ' ' in skill))
             
-            # Process the text
-            doc = nlp(text)
+            # Process the text unless a parsed Doc was supplied
+            if doc is None:
+                doc = nlp(text)
             
             # Find matches
             matches = matcher(doc)
@@ -96,9 +71,9 @@ def extract_skills(text, job_required_skills=None):
                 if skill_text not in extracted_skills:
                     extracted_skills.append(skill_text)
                     
-            logger.info(f"Extracted {len(extracted_skills)} multi-token skills with spaCy matcher")
+            logger.info("Extracted %s multi-token skills with spaCy matcher", len(extracted_skills))
         except Exception as e:
-            logger.error(f"Error in spaCy skills extraction: {str(e)}")
+            logger.error("Error in spaCy skills extraction: %s", e)
     
     # Method 2: Use regex pattern matching for all skills (single and multi-token)
     for skill in all_skills:
@@ -109,9 +84,9 @@ def extract_skills(text, job_required_skills=None):
                 if skill not in extracted_skills:
                     extracted_skills.append(skill)
         except Exception as e:
-            logger.warning(f"Error matching skill '{skill}': {str(e)}")
+            logger.warning("Error matching skill '%s': %s", skill, e)
     
-    logger.info(f"Total extracted skills: {len(extracted_skills)}")
+    logger.info("Total extracted skills: %s", len(extracted_skills))
     
     # Remove any duplicates and normalize skill names
     normalized_skills = []
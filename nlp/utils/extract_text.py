@@ -4,6 +4,7 @@ import re
 import tempfile
 import subprocess
 from io import StringIO
+from .metrics import TEXT_EXTRACTIONS, BYTES_PROCESSED
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -25,6 +26,11 @@ def _load_docx_module():
         logger.warning("python-docx not available, DOCX extraction may be limited")
         return None
 
+def _extracted(text, file_type, method):
+    """Count which extraction method produced the text and clean it"""
+    TEXT_EXTRACTIONS.inc(file_type=file_type, method=method)
+    return clean_text(text)
+
 def extract_text(file_path):
     """
     Extract text from resume file (PDF or DOCX)
@@ -37,27 +43,28 @@ def extract_text(file_path):
     """
     try:
         if not os.path.exists(file_path):
-            logger.error(f"File not found: {file_path}")
+            logger.error("File not found: %s", file_path)
             return None
             
         file_extension = os.path.splitext(file_path)[1].lower()
-        logger.info(f"Extracting text from {file_path} with extension {file_extension}")
+        logger.info("Extracting text from %s with extension %s", file_path, file_extension)
         
         # Basic file validation
         file_size = os.path.getsize(file_path)
         if file_size == 0:
-            logger.error(f"Empty file: {file_path}")
+            logger.error("Empty file: %s", file_path)
             return None
         elif file_size > 10 * 1024 * 1024:  # 10MB
-            logger.warning(f"Very large file ({file_size} bytes): {file_path}")
+            logger.warning("Very large file (%s bytes): %s", file_size, file_path)
+        BYTES_PROCESSED.inc(file_size, file_type=file_extension.lstrip('.'))
         
         # Check if file is readable
         try:
             with open(file_path, 'rb') as f:
                 first_bytes = f.read(8)
-                logger.info(f"First bytes of file: {first_bytes.hex()}")
+                logger.info("First bytes of file: %s", first_bytes.hex())
         except Exception as read_error:
-            logger.error(f"Could not read file: {str(read_error)}")
+            logger.error("Could not read file: %s", read_error)
             return None
             
         # PDF extraction
@@ -70,21 +77,22 @@ def extract_text(file_path):
             
             # If the result is empty or very short, try a secondary method
             if not result or len(result.strip()) < 100:
-                logger.warning(f"Primary DOCX extraction yielded limited text ({len(result) if result else 0} chars), trying alternative methods")
+                logger.warning("Primary DOCX extraction yielded limited text (%s chars), trying alternative methods", len(result) if result else 0)
                 try:
                     alt_result = extract_text_from_docx_alternative(file_path)
                     if alt_result and len(alt_result) > len(result or ""):
-                        logger.info(f"Alternative DOCX extraction succeeded with {len(alt_result)} chars")
+                        logger.info("Alternative DOCX extraction succeeded with %s chars", len(alt_result))
                         return alt_result
                 except Exception as alt_error:
-                    logger.error(f"Alternative DOCX extraction failed: {str(alt_error)}")
+                    logger.error("Alternative DOCX extraction failed: %s", alt_error)
             
             return result
         else:
-            logger.error(f"Unsupported file format: {file_extension}")
+            logger.error("Unsupported file format: %s", file_extension)
+            TEXT_EXTRACTIONS.inc(file_type=file_extension.lstrip('.'), method='unsupported')
             return None
     except Exception as e:
-        logger.error(f"Error extracting text from {file_path}: {str(e)}")
+        logger.error("Error extracting text from %s: %s", file_path, e)
         import traceback
         logger.error(traceback.format_exc())
         return None
@@ -95,7 +103,7 @@ def extract_text_from_pdf(file_path):
     
     # First try PyPDF2
     try:
-        logger.info(f"Extracting text from PDF using PyPDF2: {file_path}")
+        logger.info("Extracting text from PDF using PyPDF2: %s", file_path)
         PdfReader = _load_pdf_module()
         if not PdfReader:
             raise ImportError("PyPDF2 not available")
@@ -109,14 +117,14 @@ def extract_text_from_pdf(file_path):
         
         # If we got reasonable text, return it
         if len(text.strip()) > 100:
-            logger.info(f"Successfully extracted {len(text)} characters with PyPDF2")
-            return clean_text(text)
+            logger.info("Successfully extracted %s characters with PyPDF2", len(text))
+            return _extracted(text, 'pdf', 'pypdf2')
     except Exception as e:
-        logger.warning(f"PyPDF2 extraction failed: {str(e)}")
+        logger.warning("PyPDF2 extraction failed: %s", e)
     
     # If PyPDF2 failed or extracted too little text, try pdftotext if available
     try:
-        logger.info(f"Trying pdftotext for {file_path}")
+        logger.info("Trying pdftotext for %s", file_path)
         with tempfile.NamedTemporaryFile(suffix='.txt') as temp_txt:
             # Try to use pdftotext command line tool if available
             result = subprocess.run(
@@ -131,19 +139,20 @@ def extract_text_from_pdf(file_path):
                     text = f.read()
                 
                 if len(text.strip()) > 0:
-                    logger.info(f"Successfully extracted {len(text)} characters with pdftotext")
-                    return clean_text(text)
+                    logger.info("Successfully extracted %s characters with pdftotext", len(text))
+                    return _extracted(text, 'pdf', 'pdftotext')
             else:
-                logger.warning(f"pdftotext failed: {result.stderr}")
+                logger.warning("pdftotext failed: %s", result.stderr)
     except (FileNotFoundError, subprocess.SubprocessError) as e:
-        logger.warning(f"pdftotext extraction failed: {str(e)}")
+        logger.warning("pdftotext extraction failed: %s", e)
     
     # If we have some text from PyPDF2 but it's not ideal, return it anyway
     if len(text.strip()) > 0:
-        logger.info(f"Returning partial text ({len(text)} chars) from PyPDF2")
-        return clean_text(text)
+        logger.info("Returning partial text (%s chars) from PyPDF2", len(text))
+        return _extracted(text, 'pdf', 'pypdf2_partial')
     
-    logger.error(f"Failed to extract text from PDF: {file_path}")
+    logger.error("Failed to extract text from PDF: %s", file_path)
+    TEXT_EXTRACTIONS.inc(file_type='pdf', method='failed')
     return None
 
 def extract_text_from_docx(file_path):
@@ -152,21 +161,21 @@ def extract_text_from_docx(file_path):
     
     # Method 1: python-docx library
     try:
-        logger.info(f"Extracting text from DOCX using python-docx: {file_path}")
+        logger.info("Extracting text from DOCX using python-docx: %s", file_path)
         docx = _load_docx_module()
         if not docx:
             raise ImportError("python-docx not available")
         
         # Log file details before opening
         file_size = os.path.getsize(file_path)
-        logger.info(f"DOCX file size: {file_size} bytes")
+        logger.info("DOCX file size: %s bytes", file_size)
         
         # Try opening document with detailed error reporting
         try:
             doc = docx.Document(file_path)
-            logger.info(f"DOCX opened successfully. Paragraphs: {len(doc.paragraphs)}, Tables: {len(doc.tables)}")
+            logger.info("DOCX opened successfully. Paragraphs: %s, Tables: %s", len(doc.paragraphs), len(doc.tables))
         except Exception as doc_error:
-            logger.error(f"Error opening DOCX with python-docx: {str(doc_error)}")
+            logger.error("Error opening DOCX with python-docx: %s", doc_error)
             import traceback
             logger.error(traceback.format_exc())
             raise
@@ -179,11 +188,11 @@ def extract_text_from_docx(file_path):
                 if text:
                     paragraphs.append(text)
                     if i < 5:  # Log first few paragraphs for debugging
-                        logger.info(f"Paragraph {i}: {text[:50]}...")
+                        logger.debug("Paragraph %s: %s...", i, text[:50])
             except Exception as para_error:
-                logger.error(f"Error extracting paragraph {i}: {str(para_error)}")
+                logger.error("Error extracting paragraph %s: %s", i, para_error)
         
-        logger.info(f"Extracted {len(paragraphs)} non-empty paragraphs from DOCX")
+        logger.info("Extracted %s non-empty paragraphs from DOCX", len(paragraphs))
         
         # Extract tables with error tracking
         tables_text = []
@@ -194,9 +203,9 @@ def extract_text_from_docx(file_path):
                     if row_text:
                         tables_text.append(' | '.join(row_text))
             except Exception as table_error:
-                logger.error(f"Error extracting table {i}: {str(table_error)}")
+                logger.error("Error extracting table %s: %s", i, table_error)
         
-        logger.info(f"Extracted {len(tables_text)} table rows from DOCX")
+        logger.info("Extracted %s table rows from DOCX", len(tables_text))
         
         # Combine text
         text = '\n'.join(paragraphs)
@@ -204,45 +213,46 @@ def extract_text_from_docx(file_path):
             text += '\n\n' + '\n'.join(tables_text)
             
         if len(text.strip()) > 100:
-            logger.info(f"Successfully extracted {len(text)} characters from DOCX using python-docx")
-            return clean_text(text)
+            logger.info("Successfully extracted %s characters from DOCX using python-docx", len(text))
+            return _extracted(text, 'docx', 'python_docx')
     except Exception as e:
-        logger.warning(f"python-docx extraction failed: {str(e)}")
+        logger.warning("python-docx extraction failed: %s", e)
     
     # Fallback Method 2: Try using textract if available
     if not text.strip() or len(text.strip()) < 100:
         try:
             import textract
-            logger.info(f"Trying textract for DOCX extraction: {file_path}")
+            logger.info("Trying textract for DOCX extraction: %s", file_path)
             extracted_text = textract.process(file_path).decode('utf-8', errors='ignore')
             if extracted_text and len(extracted_text.strip()) > 0:
-                logger.info(f"Successfully extracted {len(extracted_text)} characters using textract")
-                return clean_text(extracted_text)
+                logger.info("Successfully extracted %s characters using textract", len(extracted_text))
+                return _extracted(extracted_text, 'docx', 'textract')
         except ImportError:
             logger.warning("textract not available for DOCX extraction fallback")
         except Exception as e:
-            logger.warning(f"textract extraction failed: {str(e)}")
+            logger.warning("textract extraction failed: %s", e)
     
     # Fallback Method 3: Try using docx2txt if available
     if not text.strip() or len(text.strip()) < 100:
         try:
             import docx2txt
-            logger.info(f"Trying docx2txt for DOCX extraction: {file_path}")
+            logger.info("Trying docx2txt for DOCX extraction: %s", file_path)
             extracted_text = docx2txt.process(file_path)
             if extracted_text and len(extracted_text.strip()) > 0:
-                logger.info(f"Successfully extracted {len(extracted_text)} characters using docx2txt")
-                return clean_text(extracted_text)
+                logger.info("Successfully extracted %s characters using docx2txt", len(extracted_text))
+                return _extracted(extracted_text, 'docx', 'docx2txt')
         except ImportError:
             logger.warning("docx2txt not available for DOCX extraction fallback")
         except Exception as e:
-            logger.warning(f"docx2txt extraction failed: {str(e)}")
+            logger.warning("docx2txt extraction failed: %s", e)
     
     # If we got at least something from python-docx, return that
     if text.strip():
-        logger.info(f"Returning partial text ({len(text)} chars) from python-docx")
-        return clean_text(text)
+        logger.info("Returning partial text (%s chars) from python-docx", len(text))
+        return _extracted(text, 'docx', 'python_docx_partial')
     
-    logger.error(f"All DOCX extraction methods failed for: {file_path}")
+    logger.error("All DOCX extraction methods failed for: %s", file_path)
+    TEXT_EXTRACTIONS.inc(file_type='docx', method='failed')
     return None
 
 def extract_text_from_docx_alternative(file_path):
@@ -251,7 +261,7 @@ def extract_text_from_docx_alternative(file_path):
     for cases where standard libraries fail
     """
     try:
-        logger.info(f"Attempting alternative DOCX extraction for: {file_path}")
+        logger.info("Attempting alternative DOCX extraction for: %s", file_path)
         import zipfile
         import xml.etree.ElementTree as ET
         
@@ -260,19 +270,19 @@ def extract_text_from_docx_alternative(file_path):
         
         # Check if file can be opened as a ZIP
         if not zipfile.is_zipfile(file_path):
-            logger.error(f"File is not a valid ZIP/DOCX: {file_path}")
+            logger.error("File is not a valid ZIP/DOCX: %s", file_path)
             return None
             
         # Extract document.xml which contains the main content
         with zipfile.ZipFile(file_path) as docx_zip:
             # List the contents for debugging
             file_list = docx_zip.namelist()
-            logger.info(f"ZIP contents: {file_list[:10]}...")
+            logger.info("ZIP contents: %s...", file_list[:10])
             
             # Look for document.xml in standard location
             doc_xml_path = 'word/document.xml'
             if doc_xml_path not in file_list:
-                logger.error(f"document.xml not found in DOCX")
+                logger.error("document.xml not found in DOCX")
                 return None
                 
             # Extract and parse XML
@@ -294,15 +304,15 @@ def extract_text_from_docx_alternative(file_path):
         
         # Combine all paragraphs
         full_text = '\n'.join(text_content)
-        logger.info(f"Alternative extraction found {len(text_content)} paragraphs, {len(full_text)} chars")
+        logger.info("Alternative extraction found %s paragraphs, %s chars", len(text_content), len(full_text))
         
         if not full_text.strip():
             logger.warning("Alternative extraction returned empty text")
             return None
             
-        return clean_text(full_text)
+        return _extracted(full_text, 'docx', 'docx_xml')
     except Exception as e:
-        logger.error(f"Alternative DOCX extraction failed: {str(e)}")
+        logger.error("Alternative DOCX extraction failed: %s", e)
         import traceback
         logger.error(traceback.format_exc())
         return None
@@ -0,0 +1,133 @@
+"""
+Central logging configuration of the API, the Celery worker and the tools
+
+Records are handed to a QueueHandler, so a request or task thread only
+formats the message and puts it on a queue; a QueueListener thread does the
+file and console I/O. Modules only create `logging.getLogger(__name__)` and
+never configure handlers themselves.
+"""
+
+import os
+import sys
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+
+# Root level: DEBUG also enables the sampled payload logs (see log_payload)
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+LOG_FILE_MAX_BYTES = int(os.environ.get('LOG_FILE_MAX_BYTES', str(10 * 1024 * 1024)))
+LOG_FILE_BACKUPS = int(os.environ.get('LOG_FILE_BACKUPS', '5'))
+# 0 writes records from the logging thread itself (simpler to debug, slower on the hot path)
+LOG_QUEUE = os.environ.get('LOG_QUEUE', '1') == '1'
+# Fraction of payload logs (task results, skill lists) written when DEBUG is on
+LOG_PAYLOAD_SAMPLE_RATE = float(os.environ.get('LOG_PAYLOAD_SAMPLE_RATE', '0.01'))
+# Payloads are cut to this many characters
+LOG_PAYLOAD_MAX_CHARS = int(os.environ.get('LOG_PAYLOAD_MAX_CHARS', '2000'))
+
+_state = {'configured': False, 'listener': None, 'handler': None, 'handlers': ()}
+
+def _start_listener():
+    log_queue = queue.SimpleQueue()
+    _state['handler'].queue = log_queue
+    listener = logging.handlers.QueueListener(log_queue, *_state['handlers'], respect_handler_level=True)
+    listener.start()
+    _state['listener'] = listener
+
+def _restart_listener_after_fork():
+    # The listener thread does not survive fork (gunicorn preload, Celery prefork), so children start their own
+    if _state['handler'] is not None:
+        _start_listener()
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    listener = _state['listener']
+    if listener is not None:
+        _state['listener'] = None
+        try:
+            listener.stop()
+        except Exception:
+            pass
+
+def configure_logging(log_file=None, level=None, console=True, queued=None):
+    """
+    Install the root handlers (once per process; later calls are ignored)
+
+    Args:
+        log_file: Optional path of a size-rotated log file
+        level: Root level name or number (defaults to LOG_LEVEL)
+        console: Also log to stdout
+        queued: Hand records to a listener thread (defaults to LOG_QUEUE)
+
+    Returns:
+        The root logger
+    """
+    root = logging.getLogger()
+    if _state['configured']:
+        return root
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS))
+    if console:
+        handlers.append(logging.StreamHandler(sys.stdout))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # Replace whatever basicConfig or a library installed, so records are not written twice
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    _state['configured'] = True
+    root.setLevel(level if isinstance(level, int) else (level or LOG_LEVEL).upper())
+    if not (LOG_QUEUE if queued is None else queued):
+        for handler in handlers:
+            root.addHandler(handler)
+        return root
+
+    _state['handlers'] = tuple(handlers)
+    _state['handler'] = logging.handlers.QueueHandler(None)
+    _start_listener()
+    root.addHandler(_state['handler'])
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_restart_listener_after_fork)
+    atexit.register(stop_logging)
+    return root
+
+class _Truncated:
+    """Formats a payload only when the record is formatted, cut to LOG_PAYLOAD_MAX_CHARS"""
+
+    def __init__(self, payload, max_chars):
+        self.payload = payload
+        self.max_chars = max_chars
+
+    def __str__(self):
+        text = str(self.payload)
+        if len(text) > self.max_chars:
+            return f"{text[:self.max_chars]}... ({len(text)} chars)"
+        return text
+
+def log_payload(logger, message, payload, *args, level=logging.DEBUG, sample_rate=None):
+    """
+    Log a potentially large payload (a task result, a skill list) at DEBUG, for a sample of calls
+
+    Nothing is formatted unless the level is enabled and the call is sampled.
+
+    Args:
+        logger: Logger to write to
+        message: %-style message for args; the payload is appended after ': '
+        payload: Object to log
+        args: Arguments of message
+        level: Level of the record
+        sample_rate: Fraction of calls logged (defaults to LOG_PAYLOAD_SAMPLE_RATE)
+    """
+    if not logger.isEnabledFor(level):
+        return
+    rate = LOG_PAYLOAD_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate < 1 and random.random() >= rate:
+        return
+    logger.log(level, message + ': %s', *args, _Truncated(payload, LOG_PAYLOAD_MAX_CHARS))
@@ -0,0 +1,551 @@
+import os
+import re
+import json
+import time
+import bisect
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Directory where every process dumps its metrics so one endpoint can export
+# all of them (Celery prefork children, several web workers). Unset means
+# each process only exports its own metrics.
+METRICS_DIR = os.environ.get('METRICS_DIR')
+
+# Stage durations range from sub-millisecond regexes to OCR runs of a minute
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with optional labels, exported in Prometheus format
+
+    Observations only touch a small per-labelset list under a lock, so it is
+    cheap enough to leave on in production.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+    @staticmethod
+    def merge(target, series):
+        for key, values in series.items():
+            current = target.get(key)
+            if current is None:
+                target[key] = list(values)
+            else:
+                for i, value in enumerate(values):
+                    current[i] += value
+
+    def quantile(self, q, series=None, **labels):
+        """
+        Estimate a quantile from the buckets like Prometheus' histogram_quantile
+
+        Returns:
+            The estimated value in seconds, or None without observations
+        """
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        values = (series or self.snapshot()).get(key)
+        if not values:
+            return None
+        counts = values[:-1]
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                if i >= len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def render(self, series):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for key in sorted(series):
+            values = series[key]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), values[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+                lines.append(f'{self.name}_bucket{labels} {_format_value(cumulative)}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(values[-1])}')
+            lines.append(f'{self.name}_count{labels} {_format_value(cumulative)}')
+        return lines
+
+class Counter:
+    """Monotonic counter with optional labels, summed over processes when merged"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [value]
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0]
+            series[0] += amount
+
+    def value(self, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        series = self._series.get(key)
+        return series[0] if series else 0
+
+    def snapshot(self):
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+    reset = Histogram.reset
+    merge = staticmethod(Histogram.merge)
+
+    def render(self, series):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for key in sorted(series):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(series[key][0])}')
+        return lines
+
+class Gauge(Counter):
+    """
+    Value that can go up and down, summed over processes when merged
+
+    A gauge can instead be computed at scrape time with set_function; such
+    gauges are only collected in the exporting process and never dumped.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+        self._cache_seconds = 0
+        self._cached = None  # (monotonic time, series)
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._series[key] = [value]
+
+    def set_function(self, function, cache_seconds=0):
+        """
+        Compute the gauge at scrape time
+
+        Args:
+            function: Returns {label values tuple: value}
+            cache_seconds: Reuse a computed value for this long (for functions that call out, e.g. to the broker)
+        """
+        self._function = function
+        self._cache_seconds = cache_seconds
+        self._cached = None
+
+    def collect_function(self):
+        if self._function is None:
+            return {}
+        cached = self._cached
+        if cached is not None and time.monotonic() - cached[0] < self._cache_seconds:
+            return {key: list(values) for key, values in cached[1].items()}
+        try:
+            series = {tuple(str(v) for v in key): [value] for key, value in self._function().items()}
+        except Exception as e:
+            logger.warning("Could not collect gauge %s: %s", self.name, e)
+            return {}
+        if self._cache_seconds:
+            self._cached = (time.monotonic(), series)
+        return {key: list(values) for key, values in series.items()}
+
+class Registry:
+    """Named collection of metrics of this process"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def metrics(self):
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self):
+        return {metric.name: {key_to_str(key): series for key, series in metric.snapshot().items()}
+                for metric in self.metrics()}
+
+    def reset(self):
+        for metric in self.metrics():
+            metric.reset()
+
+REGISTRY = Registry()
+
+def key_to_str(key):
+    return json.dumps(list(key))
+
+def histogram(name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+    """Get or create a histogram in the process registry"""
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+def counter(name, documentation, labelnames=()):
+    """Get or create a counter in the process registry"""
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+def gauge(name, documentation, labelnames=()):
+    """Get or create a gauge in the process registry"""
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+STAGE_DURATION = histogram(
+    'resume_stage_duration_seconds',
+    'Wall time of each resume processing stage',
+    ('stage', 'outcome')
+)
+HTTP_REQUEST_DURATION = histogram(
+    'http_request_duration_seconds',
+    'Latency of HTTP requests by route',
+    ('method', 'route', 'status')
+)
+TASK_DURATION = histogram(
+    'celery_task_duration_seconds',
+    'Runtime of Celery tasks by outcome',
+    ('task', 'outcome')
+)
+TASKS_IN_PROGRESS = gauge(
+    'celery_tasks_in_progress',
+    'Celery tasks currently executing',
+    ('task',)
+)
+QUEUE_DEPTH = gauge(
+    'celery_queue_depth',
+    'Messages waiting in the Celery queue',
+    ('queue',)
+)
+MODEL_LOAD_DURATION = histogram(
+    'model_load_duration_seconds',
+    'Time spent loading NLP models',
+    ('model',),
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+)
+WARMUP_DURATION = histogram(
+    'worker_warmup_duration_seconds',
+    'Time spent warming up models before a worker process takes tasks',
+    ('step',),
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+)
+EMBEDDING_BATCH_SIZE = histogram(
+    'embedding_server_batch_size',
+    'Texts encoded per forward pass by the embedding server',
+    (),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+CACHE_REQUESTS = counter(
+    'cache_requests_total',
+    'Cache lookups by cache and result (hit or miss)',
+    ('cache', 'result')
+)
+TEXT_EXTRACTIONS = counter(
+    'text_extractions_total',
+    'Resume text extractions by file type and the method that produced the text',
+    ('file_type', 'method')
+)
+BYTES_PROCESSED = counter(
+    'resume_bytes_processed_total',
+    'Size of the resume files text was extracted from',
+    ('file_type',)
+)
+
+class Trace:
+    """
+    Stage timings of one pipeline run (e.g. one process_resume task)
+
+    Spans are appended in the order they finish and returned with the task
+    result so slow runs can be explained without reading the logs.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        # Wall clock start, comparable with the queuedAt the API returns
+        self.started_at = time.time()
+        self.stages = []
+
+    def add(self, stage, seconds, outcome):
+        self.stages.append({'stage': stage, 'durationMs': round(seconds * 1000, 3), 'outcome': outcome})
+
+    def to_dict(self):
+        return {
+            'startedAt': round(self.started_at, 6),
+            'totalMs': round((time.perf_counter() - self.start) * 1000, 3),
+            'stages': list(self.stages)
+        }
+
+class Span:
+    """Outcome holder yielded by span(); set .outcome to e.g. 'fallback' or 'error'"""
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.outcome = 'ok'
+
+@contextmanager
+def span(stage, trace=None):
+    """
+    Time a pipeline stage into the stage histogram and, if given, a Trace
+
+    Exceptions are recorded with outcome 'error' and re-raised. Stages that
+    handle their own errors set span.outcome themselves.
+    """
+    current = Span(stage)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException:
+        current.outcome = 'error'
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_DURATION.observe(elapsed, stage=stage, outcome=current.outcome)
+        if trace is not None:
+            trace.add(stage, elapsed, current.outcome)
+
+def set_metrics_dir(metrics_dir):
+    """Set the directory this process dumps to and exports from (see METRICS_DIR)"""
+    global METRICS_DIR
+    METRICS_DIR = metrics_dir
+
+def _dump_path(metrics_dir, pid=None):
+    return os.path.join(metrics_dir, f'metrics_{pid or os.getpid()}.json')
+
+# Counters and histograms of exited processes, so totals do not drop when a worker is replaced
+RETIRED_DUMP = 'metrics_retired.json'
+DUMP_PID_PATTERN = re.compile(r'^metrics_(\d+)\.json$')
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # e.g. EPERM: the process exists but belongs to another user
+        pass
+    return True
+
+@contextmanager
+def _dir_lock(metrics_dir):
+    """Exclusive lock of the metrics directory (a no-op where fcntl is unavailable)"""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(metrics_dir, '.lock'), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def dump_metrics(metrics_dir=None):
+    """Write this process' metrics to the metrics directory (no-op without one)"""
+    metrics_dir = metrics_dir or METRICS_DIR
+    if not metrics_dir:
+        return
+    try:
+        os.makedirs(metrics_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=metrics_dir, prefix='.metrics_', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(REGISTRY.snapshot(), f)
+        os.replace(tmp_path, _dump_path(metrics_dir))
+    except Exception as e:
+        logger.warning("Could not dump metrics: %s", e)
+
+def reset_metrics():
+    """
+    Drop every series of this process (scrape-time gauge functions are kept)
+
+    Called in forked pool processes: what they inherited from the parent is
+    already counted in the parent's own dump, and dumping it again would
+    count it once more per child.
+    """
+    REGISTRY.reset()
+
+def retire_metrics(metrics_dir=None):
+    """
+    Fold this exiting process' counters and histograms into the retired dump and remove its own dump
+
+    Called when a web worker or Celery pool process exits, so its gauges
+    (e.g. tasks in progress) stop being summed into every scrape while its
+    counts are kept.
+    """
+    metrics_dir = metrics_dir or METRICS_DIR
+    if not metrics_dir or not os.path.isdir(metrics_dir):
+        return
+    try:
+        with _dir_lock(metrics_dir):
+            retired_path = os.path.join(metrics_dir, RETIRED_DUMP)
+            try:
+                with open(retired_path) as f:
+                    retired = {name: {tuple(json.loads(key)): values for key, values in series.items()}
+                               for name, series in json.load(f).items()}
+            except (OSError, ValueError):
+                retired = {}
+            for metric in REGISTRY.metrics():
+                if not isinstance(metric, Gauge):
+                    metric.merge(retired.setdefault(metric.name, {}), metric.snapshot())
+            fd, tmp_path = tempfile.mkstemp(dir=metrics_dir, prefix='.metrics_', suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({name: {key_to_str(key): values for key, values in series.items()}
+                           for name, series in retired.items()}, f)
+            os.replace(tmp_path, retired_path)
+            try:
+                os.remove(_dump_path(metrics_dir))
+            except FileNotFoundError:
+                pass
+    except Exception as e:
+        logger.warning("Could not retire metrics: %s", e)
+
+def collect(metrics_dir=None):
+    """
+    Merge this process' metrics with every dump in the metrics directory
+
+    Returns:
+        Dict mapping metric name to {label values tuple: series}
+    """
+    metrics_dir = metrics_dir or METRICS_DIR
+    merged = {metric.name: metric.snapshot() for metric in REGISTRY.metrics()}
+    for metric in REGISTRY.metrics():
+        if isinstance(metric, Gauge):
+            merged[metric.name].update(metric.collect_function())
+    if not metrics_dir or not os.path.isdir(metrics_dir):
+        return merged
+
+    own_dump = _dump_path(metrics_dir)
+    for entry in os.listdir(metrics_dir):
+        path = os.path.join(metrics_dir, entry)
+        if not entry.startswith('metrics_') or path == own_dump:
+            continue
+        # Gauges of a process that died without retiring its metrics are stale
+        match = DUMP_PID_PATTERN.match(entry)
+        skip_gauges = bool(match) and not _pid_alive(int(match.group(1)))
+        try:
+            with open(path) as f:
+                dumped = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Skipping unreadable metrics dump %s: %s", entry, e)
+            continue
+        for name, series in dumped.items():
+            metric = REGISTRY.get(name)
+            if metric is None or (skip_gauges and isinstance(metric, Gauge)):
+                continue
+            metric.merge(merged.setdefault(name, {}),
+                         {tuple(json.loads(key)): values for key, values in series.items()})
+    return merged
+
+def render_prometheus(metrics_dir=None):
+    """Render all metrics in the Prometheus text exposition format"""
+    merged = collect(metrics_dir)
+    lines = []
+    for metric in REGISTRY.metrics():
+        lines.extend(metric.render(merged.get(metric.name, {})))
+    return '\n'.join(lines) + '\n'
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def start_metrics_server(port, host='0.0.0.0', metrics_dir=None):
+    """
+    Serve /metrics from a daemon thread (used as the Celery worker sidecar)
+
+    Returns:
+        The running ThreadingHTTPServer
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = render_prometheus(metrics_dir).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug("Metrics request: " + format, *args)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    logger.info("Serving worker metrics on %s:%s/metrics", host, port)
+    return server
@@ -0,0 +1,39 @@
+import os
+import time
+import logging
+import spacy
+from .metrics import MODEL_LOAD_DURATION
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# spaCy model shared by every extractor
+SPACY_MODEL = os.environ.get('SPACY_MODEL', 'en_core_web_sm')
+
+# Defaults for nlp.pipe based batch processing (see batch_extract)
+BATCH_SIZE = int(os.environ.get('NLP_BATCH_SIZE', '16'))
+N_PROCESS = int(os.environ.get('NLP_N_PROCESS', '1'))
+
+_nlp = None
+
+def get_nlp():
+    """
+    Get the shared spaCy pipeline, loading it on first use.
+
+    Every extractor parses text with this single instance so that Docs
+    produced by nlp.pipe in one place can be handed to any of them.
+
+    Returns:
+        The spaCy Language object or None if the model could not be loaded
+    """
+    global _nlp
+    if _nlp is None:
+        try:
+            start_time = time.perf_counter()
+            _nlp = spacy.load(SPACY_MODEL)
+            MODEL_LOAD_DURATION.observe(time.perf_counter() - start_time, model='spacy')
+            logger.info("Loaded spaCy model: %s", SPACY_MODEL)
+        except Exception as e:
+            logger.error("Error loading spaCy model %s: %s", SPACY_MODEL, e)
+            return None
+    return _nlp
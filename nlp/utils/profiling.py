@@ -0,0 +1,171 @@
+import os
+import re
+import sys
+import time
+import random
+import logging
+import cProfile
+import functools
+import threading
+from collections import Counter
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Where profiles are written; must be shared by the API and the workers like the upload folder
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+# Fraction of tasks profiled without being asked to (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+# Seconds between stack samples of the profiled thread
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get('PROFILE_SAMPLE_INTERVAL', '0.005'))
+# Profiles older than this are removed when new ones are written
+PROFILE_RETENTION_HOURS = float(os.environ.get('PROFILE_RETENTION_HOURS', '24'))
+
+PROFILE_FORMATS = {'pstats': '.pstats', 'collapsed': '.collapsed'}
+TASK_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+def profile_path(task_id, profile_format):
+    """
+    Path of a stored profile
+
+    Raises:
+        ValueError: If the task id or format is invalid
+    """
+    if not TASK_ID_PATTERN.match(task_id or ''):
+        raise ValueError(f"Invalid task id: {task_id}")
+    if profile_format not in PROFILE_FORMATS:
+        raise ValueError(f"Unknown profile format: {profile_format}")
+    return os.path.join(PROFILE_DIR, f"{task_id}{PROFILE_FORMATS[profile_format]}")
+
+def should_profile(requested=False):
+    """Profile when explicitly requested or when the task is picked by PROFILE_SAMPLE_RATE"""
+    return bool(requested) or (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE)
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class StackSampler:
+    """
+    Sample the stack of one thread at a fixed interval from a background thread
+
+    The counts are written as collapsed stacks ("outer;inner count" lines),
+    the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id, interval=PROFILE_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[';'.join(reversed(labels))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+class TaskProfiler:
+    """
+    Profile the current thread with cProfile and a stack sampler
+
+    On exit the profile is written to PROFILE_DIR as <task_id>.pstats and
+    <task_id>.collapsed.
+    """
+
+    def __init__(self, task_id):
+        self.task_id = task_id
+        self.profiler = cProfile.Profile()
+        self.sampler = StackSampler(threading.get_ident())
+        self.profiler_enabled = False
+        self.duration = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        try:
+            self.profiler.enable()
+            self.profiler_enabled = True
+        except ValueError as e:
+            # Another profiler is already active on this thread
+            logger.warning("cProfile unavailable, sampling stacks only: %s", e)
+        self.sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.profiler_enabled:
+            self.profiler.disable()
+        self.sampler.stop()
+        self.duration = time.perf_counter() - self.start
+        try:
+            self.save()
+        except Exception as e:
+            logger.error("Could not save profile for task %s: %s", self.task_id, e)
+        return False
+
+    def save(self):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        if self.profiler_enabled:
+            self.profiler.dump_stats(profile_path(self.task_id, 'pstats'))
+        self.sampler.write(profile_path(self.task_id, 'collapsed'))
+        logger.info("Saved profile of task %s (%.2fs, %s samples)", self.task_id, self.duration, sum(self.sampler.stacks.values()))
+        remove_expired_profiles()
+
+    def summary(self):
+        formats = ['collapsed'] + (['pstats'] if self.profiler_enabled else [])
+        return {
+            'taskId': self.task_id,
+            'durationMs': round(self.duration * 1000, 3),
+            'samples': sum(self.sampler.stacks.values()),
+            'formats': formats
+        }
+
+def remove_expired_profiles():
+    """Delete profiles older than PROFILE_RETENTION_HOURS"""
+    cutoff = time.time() - PROFILE_RETENTION_HOURS * 3600
+    try:
+        for entry in os.scandir(PROFILE_DIR):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+    except OSError as e:
+        logger.warning("Could not clean up old profiles: %s", e)
+
+def profiled_task(func):
+    """
+    Let a bound Celery task be profiled
+
+    Adds a profile keyword argument; when it is true or the task is picked by
+    PROFILE_SAMPLE_RATE, the whole run is profiled and a 'profile' summary is
+    added to the (dict) result.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, profile=False, **kwargs):
+        if not should_profile(profile):
+            return func(self, *args, **kwargs)
+        task_id = self.request.id
+        if not task_id or not TASK_ID_PATTERN.match(task_id):
+            logger.warning("Not profiling task with unusable id: %s", task_id)
+            return func(self, *args, **kwargs)
+        profiler = TaskProfiler(task_id)
+        with profiler:
+            result = func(self, *args, **kwargs)
+        if isinstance(result, dict):
+            result['profile'] = profiler.summary()
+        return result
+    return wrapper
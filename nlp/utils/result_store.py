@@ -0,0 +1,196 @@
+import os
+import json
+import gzip
+import time
+import hashlib
+import logging
+from .profiling import TASK_ID_PATTERN
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Seconds the slim summary of a finished task stays in Redis after the full result expires
+RESULT_SUMMARY_TTL = int(os.environ.get('RESULT_SUMMARY_TTL_SECONDS', str(30 * 24 * 3600)))
+# Durable store of full results (gzipped JSON per task); empty disables it. Shared by the API and workers.
+# Defaults to nlp/result_store, whatever directory the process was started from
+RESULT_STORE_DIR = os.environ.get('RESULT_STORE_DIR',
+                                  os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'result_store'))
+# Stored full results older than this are removed (0 keeps them forever)
+RESULT_STORE_RETENTION_DAYS = float(os.environ.get('RESULT_STORE_RETENTION_DAYS', '90'))
+
+# Tasks whose results are summarized and stored durably
+RETAINED_TASKS = {'process_resume', 'process_resume_batch', 'process_resume_multi'}
+
+def summary_key(task_id):
+    return f"task-summary:{task_id}"
+
+def _hash(value):
+    return hashlib.sha1(value.encode('utf-8')).hexdigest() if value else None
+
+def _resume_summary(data):
+    """Score fields of one processed resume, with the candidate reduced to a hash"""
+    contact = data.get('contactInfo') or {}
+    candidate = (contact.get('email') or data.get('candidateName') or '').strip().lower()
+    return {
+        'matchScore': data.get('matchScore'),
+        'isShortlisted': data.get('isShortlisted'),
+        'jobCategory': data.get('jobCategory'),
+        'candidateHash': _hash(candidate),
+    }
+
+def summarize_result(task_id, task_name, result):
+    """
+    Slim summary of a task result: success, scores, shortlist flags and hashes
+
+    resultHash identifies the full result, so a copy from the durable store
+    can be checked against the summary.
+    """
+    summary = {
+        'taskId': task_id,
+        'task': task_name,
+        'success': bool(result.get('success')),
+        'completedAt': round(time.time(), 3),
+        'resultHash': hashlib.sha256(json.dumps(result, sort_keys=True, default=str).encode('utf-8')).hexdigest(),
+    }
+    if not result.get('success'):
+        summary['message'] = result.get('message')
+    data = result.get('data') or {}
+    if task_name == 'process_resume' and data:
+        summary.update(_resume_summary(data))
+    elif task_name == 'process_resume_multi' and data:
+        summary['candidateHash'] = _resume_summary(data)['candidateHash']
+        summary['jobs'] = [
+            {key: job.get(key) for key in ('jobId', 'jobCategory', 'matchScore', 'isShortlisted')}
+            for job in data.get('jobs', [])
+        ]
+    elif task_name == 'process_resume_batch':
+        summary.update({key: result.get(key) for key in ('total', 'processed', 'failed')})
+        summary['results'] = [
+            dict(_resume_summary(item.get('data') or {}), fileName=item.get('fileName'), success=item.get('success'))
+            for item in result.get('results') or [] if item
+        ]
+    return summary
+
+class FileResultStore:
+    """
+    Durable store of full task results, one gzipped JSON file per task
+
+    Files are sharded by the first two characters of the task id so that a
+    directory never holds more than a fraction of the results.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = RESULT_STORE_DIR if directory is None else directory
+
+    @property
+    def enabled(self):
+        return bool(self.directory)
+
+    def path(self, task_id):
+        if not TASK_ID_PATTERN.match(task_id or ''):
+            raise ValueError(f"Invalid task id: {task_id}")
+        return os.path.join(self.directory, task_id[:2], f"{task_id}.json.gz")
+
+    def save(self, task_id, result):
+        path = self.path(task_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+            json.dump(result, f, default=str)
+        os.replace(temp_path, path)
+        return path
+
+    def load(self, task_id):
+        try:
+            with gzip.open(self.path(task_id), 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def remove_expired(self, retention_days=None):
+        """Delete stored results older than retention_days; returns the number removed"""
+        retention_days = RESULT_STORE_RETENTION_DAYS if retention_days is None else retention_days
+        if not retention_days or not os.path.isdir(self.directory):
+            return 0
+        cutoff = time.time() - retention_days * 86400
+        removed = 0
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+        return removed
+
+_result_store = FileResultStore()
+
+def _redis(backend):
+    client = getattr(backend, 'client', None)
+    return client if client is not None and hasattr(client, 'setex') else None
+
+def retain_result(backend, task_id, task_name, result, store=None):
+    """
+    Keep a finished task beyond the result backend's short expiry
+
+    The full result goes to the durable store and a slim summary to Redis
+    with RESULT_SUMMARY_TTL. Either is skipped when unavailable (no store
+    directory, or a result backend other than Redis).
+
+    Returns:
+        The summary
+    """
+    store = store or _result_store
+    summary = summarize_result(task_id, task_name, result)
+    if store.enabled:
+        try:
+            store.save(task_id, result)
+            summary['stored'] = True
+        except Exception as e:
+            logger.error("Could not store result of task %s: %s", task_id, e)
+    client = _redis(backend)
+    if client is not None:
+        try:
+            client.setex(summary_key(task_id), RESULT_SUMMARY_TTL, json.dumps(summary))
+        except Exception as e:
+            logger.error("Could not store summary of task %s: %s", task_id, e)
+    return summary
+
+def load_summaries(backend, task_ids):
+    """Summaries of many tasks with one MGET (None where missing or without Redis)"""
+    client = _redis(backend)
+    if client is None or not task_ids:
+        return [None] * len(task_ids)
+    values = client.mget([summary_key(task_id) for task_id in task_ids])
+    return [json.loads(value) if value else None for value in values]
+
+def load_retained_result(backend, task_id, store=None):
+    """
+    Full result from the durable store and/or the summary of an expired task
+
+    Returns:
+        Tuple of (full result or None, summary or None)
+    """
+    store = store or _result_store
+    result = None
+    if store.enabled:
+        try:
+            result = store.load(task_id)
+        except Exception as e:
+            logger.error("Could not read stored result of task %s: %s", task_id, e)
+    summary = None if result is not None else load_summaries(backend, [task_id])[0]
+    return result, summary
+
+def remove_expired_results(store=None):
+    """Apply RESULT_STORE_RETENTION_DAYS to the durable store"""
+    store = store or _result_store
+    if not store.enabled:
+        return 0
+    try:
+        removed = store.remove_expired()
+        if removed:
+            logger.info("Removed %s expired stored results", removed)
+        return removed
+    except OSError as e:
+        logger.warning("Could not clean up stored results: %s", e)
+        return 0
@@ -1,10 +1,9 @@
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 import logging
+from .embeddings import get_embedding_provider
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class SBERTScorer:
@@ -13,20 +12,21 @@ class SBERTScorer:
     This provides better semantic understanding compared to TF-IDF.
     """
     
-    def __init__(self, model_name='all-MiniLM-L6-v2'):
+    def __init__(self, model_name=None, provider=None):
         """
         Initialize the SBERT scorer with the specified model.
         
         Args:
-            model_name (str): Name of the sentence-transformers model to use
+            model_name (str): Name of the sentence-transformers model to use (defaults to SBERT_MODEL)
+            provider (EmbeddingProvider, optional): Provider to embed with; by default the
+                                                    process-wide one also used by calculate_score
+        
+        Raises:
+            RuntimeError: If the model could not be loaded
         """
-        try:
-            logger.info(f"Loading SBERT model: {model_name}")
-            self.model = SentenceTransformer(model_name)
-            logger.info("SBERT model loaded successfully")
-        except Exception as e:
-            logger.error(f"Error loading SBERT model: {str(e)}")
-            raise
+        self.provider = provider or get_embedding_provider(model_name)
+        if not self.provider.available:
+            raise RuntimeError(f"SBERT model {self.provider.model_name} is not available")
     
     def calculate_score(self, resume_text, job_description_text, sections=None):
         """
@@ -50,7 +50,7 @@ class SBERTScorer:
             return self._calculate_full_text_score(resume_text, job_description_text)
             
         except Exception as e:
-            logger.error(f"Error calculating SBERT score: {str(e)}")
+            logger.error("Error calculating SBERT score: %s", e)
             return 0  # Return 0 score on error
     
     def _calculate_full_text_score(self, resume_text, job_description_text):
@@ -65,8 +65,8 @@ class SBERTScorer:
             float: Match score between 0-100
         """
         # Encode the texts to get embeddings
-        resume_embedding = self.model.encode(resume_text)
-        job_embedding = self.model.encode(job_description_text)
+        resume_embedding = self.provider.encode(resume_text)
+        job_embedding = self.provider.encode(job_description_text)
         
         # Calculate cosine similarity
         similarity = cosine_similarity(
@@ -76,7 +76,7 @@ class SBERTScorer:
         
         # Convert to a 0-100 score
         score = round(max(0, min(100, similarity * 100)))
-        logger.info(f"Full text SBERT score: {score}")
+        logger.info("Full text SBERT score: %s", score)
         
         return score
     
@@ -99,7 +99,7 @@ class SBERTScorer:
             'projects': 0.15
         }
         
-        job_embedding = self.model.encode(job_description_text)
+        job_embedding = self.provider.encode(job_description_text)
         section_scores = {}
         
         # Calculate score for each section
@@ -111,7 +111,7 @@ class SBERTScorer:
                     continue
                     
                 # Encode section text
-                section_embedding = self.model.encode(section_text)
+                section_embedding = self.provider.encode(section_text)
                 
                 # Calculate similarity
                 similarity = cosine_similarity(
@@ -137,8 +137,8 @@ class SBERTScorer:
         else:
             final_score = 0
             
-        logger.info(f"Weighted SBERT score: {final_score}")
-        logger.info(f"Section scores: {section_scores}")
+        logger.info("Weighted SBERT score: %s", final_score)
+        logger.info("Section scores: %s", section_scores)
         
         return final_score
 
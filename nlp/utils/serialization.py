@@ -0,0 +1,111 @@
+import os
+import zlib
+import logging
+from kombu.serialization import register, dumps, loads
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Results smaller than this are stored uncompressed; compression would not pay for itself
+COMPRESS_MIN_BYTES = int(os.environ.get('CELERY_RESULT_COMPRESS_MIN_BYTES', '1024'))
+# zlib level used for results (1 fastest - 9 smallest)
+COMPRESS_LEVEL = int(os.environ.get('CELERY_RESULT_COMPRESS_LEVEL', '6'))
+
+SERIALIZERS = {
+    'json': ('application/json', 'utf-8'),
+    'msgpack': ('application/x-msgpack', 'binary'),
+}
+# First byte of a compressed-serializer payload
+RAW, ZLIB = b'\x00', b'\x01'
+
+def msgpack_available():
+    try:
+        import msgpack  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def compress_payload(payload, min_bytes=None, level=None):
+    """Prefix a payload with RAW, or zlib-compress it behind ZLIB if it is large enough"""
+    min_bytes = COMPRESS_MIN_BYTES if min_bytes is None else min_bytes
+    level = COMPRESS_LEVEL if level is None else level
+    if len(payload) < min_bytes:
+        return RAW + payload
+    return ZLIB + zlib.compress(payload, level)
+
+def decompress_payload(payload):
+    """Inverse of compress_payload"""
+    if isinstance(payload, str):
+        payload = payload.encode('latin-1')
+    marker, body = payload[:1], payload[1:]
+    if marker == ZLIB:
+        return zlib.decompress(body)
+    if marker == RAW:
+        return body
+    raise ValueError('Payload was not written by a compressed serializer')
+
+def register_compressed_serializer(base):
+    """
+    Register '<base>+zlib': the base serializer with zlib compression of large payloads
+
+    Celery's key-value result backends (Redis among them) ignore
+    result_compression, so compression is done by the serializer itself.
+
+    Returns:
+        Name of the registered serializer
+    """
+    name = f"{base}+zlib"
+    content_type, content_encoding = SERIALIZERS[base]
+
+    def encode(data):
+        _, _, payload = dumps(data, serializer=base)
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        return compress_payload(payload)
+
+    def decode(payload):
+        body = decompress_payload(payload)
+        if content_encoding != 'binary':
+            body = body.decode(content_encoding)
+        return loads(body, content_type, content_encoding, accept=[content_type])
+
+    register(name, encode, decode, content_type=f"application/x-{base}-zlib", content_encoding='binary')
+    return name
+
+def celery_serialization_settings(serializer=None, compression=None):
+    """
+    Celery serializer settings chosen by CELERY_SERIALIZER and CELERY_RESULT_COMPRESSION
+
+    CELERY_SERIALIZER is 'json' (default) or 'msgpack'; CELERY_RESULT_COMPRESSION
+    is empty (default) or 'zlib'. Both are used for the stored results, and the
+    serializer also for task messages. The API and the workers must use the
+    same settings, and switching them makes results stored before the switch
+    unreadable, so change them with the queue drained and old results expired.
+    Both content types stay accepted on task messages during a rollout.
+
+    Returns:
+        Dict of task_serializer, result_serializer, accept_content and result_accept_content
+    """
+    serializer = (serializer or os.environ.get('CELERY_SERIALIZER', 'json')).lower()
+    compression = (os.environ.get('CELERY_RESULT_COMPRESSION', '') if compression is None else compression).lower()
+
+    if serializer not in SERIALIZERS:
+        logger.warning("Unknown CELERY_SERIALIZER '%s', using json", serializer)
+        serializer = 'json'
+    if serializer == 'msgpack' and not msgpack_available():
+        logger.warning("CELERY_SERIALIZER=msgpack but msgpack is not installed, using json")
+        serializer = 'json'
+
+    accept = ['json'] + (['msgpack'] if msgpack_available() else [])
+    result_serializer = serializer
+    if compression == 'zlib':
+        result_serializer = register_compressed_serializer(serializer)
+    elif compression not in ('', 'none'):
+        logger.warning("Unknown CELERY_RESULT_COMPRESSION '%s', storing results uncompressed", compression)
+
+    return {
+        'task_serializer': serializer,
+        'result_serializer': result_serializer,
+        'accept_content': accept,
+        'result_accept_content': accept + ([result_serializer] if result_serializer not in accept else []),
+    }
@@ -0,0 +1,30 @@
+# Common tech skills
+COMMON_TECH_SKILLS = [
+    'python', 'java', 'javascript', 'react', 'node.js', 'nodejs', 'vue', 'angular',
+    'html', 'css', 'mongodb', 'mysql', 'postgresql', 'sql', 'nosql',
+    'express', 'django', 'flask', 'php', 'laravel', 'spring', 'docker',
+    'kubernetes', 'aws', 'azure', 'gcp', 'cloud', 'devops', 'ci/cd',
+    'git', 'github', 'gitlab', 'rest api', 'graphql', 'typescript',
+    'machine learning', 'data science', 'artificial intelligence', 'ai', 'ml',
+    'nlp', 'deep learning', 'tensorflow', 'pytorch', 'keras', 'numpy', 'pandas',
+    'data analysis', 'data visualization', 'tableau', 'power bi', 'excel',
+    'frontend', 'backend', 'full stack', 'mobile', 'ios', 'android', 'react native',
+    'flutter', 'swift', 'kotlin', 'c++', 'c#', '.net', 'ruby', 'rails',
+    'agile', 'scrum', 'jira', 'confluence', 'jenkins', 'cybersecurity', 'security',
+    'penetration testing', 'ethical hacking', 'malware analysis', 'incident response',
+    'firewall', 'encryption', 'vpn', 'authentication', 'authorization',
+]
+
+# Academic and teaching skills for lectureship positions
+ACADEMIC_SKILLS = [
+    'teaching', 'lecturing', 'research', 'curriculum development', 'academic writing',
+    'course design', 'assessment', 'pedagogy', 'instructional design', 'student mentoring',
+    'phd', 'doctorate', 'masters', 'ms', 'mphil', 'thesis supervision', 'grant writing',
+    'academic publishing', 'scholarly activity', 'peer review', 'journal publication',
+    'conference presentation', 'workshop facilitation', 'lab supervision',
+    'classroom management', 'online teaching', 'lms', 'blackboard', 'moodle', 'canvas',
+    'education technology', 'higher education', 'academic administration', 'faculty development',
+]
+
+# Every known skill, in a stable order used to assign skill ids
+TAXONOMY_SKILLS = list(dict.fromkeys(COMMON_TECH_SKILLS + ACADEMIC_SKILLS))
@@ -0,0 +1,237 @@
+import logging
+import threading
+import numpy as np
+from .skill_taxonomy import TAXONOMY_SKILLS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Skills outside the taxonomy get ids on first sight; past this size the shared vocabulary is reset
+MAX_VOCABULARY_SIZE = 50000
+
+def popcount(bits):
+    """Number of set bits in an int bitset"""
+    return bin(bits).count('1')
+
+def iter_bits(bits):
+    """Yield the index of every set bit of an int bitset"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+class SkillVocabulary:
+    """
+    Maps lowercased skills to integer ids and answers partial-match queries.
+
+    Skill sets are represented as Python int bitsets over these ids, so the
+    exact matches of two sets are a single AND. The partial-match relation
+    ("skill a is a substring of skill b") replaces the substring checks of
+    the old nested loop:
+
+    - supersets(i): bitset of the other skills that contain skill i; it is
+      computed once per id and extended incrementally as the vocabulary grows
+    - subsets(i): bitset of the other skills contained in skill i, found by
+      looking up every substring of skill i
+
+    Relations between taxonomy skills are precomputed at construction.
+    """
+
+    def __init__(self, skills=TAXONOMY_SKILLS):
+        self._lock = threading.RLock()
+        self._ids = {}
+        self._skills = []
+        self._supersets = {}  # id -> (bitset, number of skills scanned)
+        self._subsets = {}  # id -> (bitset, vocabulary size when computed)
+        for skill in skills:
+            self.id_for(skill)
+        for skill_id in range(len(self._skills)):
+            self.supersets(skill_id)
+
+    def __len__(self):
+        return len(self._skills)
+
+    def skill(self, skill_id):
+        return self._skills[skill_id]
+
+    def id_for(self, skill, add=True):
+        """
+        Get the id of a skill, adding it to the vocabulary if needed
+
+        Returns:
+            The skill id, or None if the skill is unknown and add is False
+        """
+        key = skill.lower()
+        skill_id = self._ids.get(key)
+        if skill_id is None and add:
+            with self._lock:
+                skill_id = self._ids.get(key)
+                if skill_id is None:
+                    skill_id = len(self._skills)
+                    self._skills.append(key)
+                    self._ids[key] = skill_id
+        return skill_id
+
+    def bits(self, skills):
+        """Bitset of a list of skills (empty skills are ignored)"""
+        bits = 0
+        for skill in skills or []:
+            if skill:
+                bits |= 1 << self.id_for(skill)
+        return bits
+
+    def ids(self, skills):
+        """Sorted unique ids of a list of skills (empty skills are ignored)"""
+        return sorted({self.id_for(skill) for skill in skills or [] if skill})
+
+    def supersets(self, skill_id):
+        """Bitset of the other skills that contain this skill as a substring"""
+        bits, scanned = self._supersets.get(skill_id, (0, 0))
+        size = len(self._skills)
+        if scanned < size:
+            with self._lock:
+                skill = self._skills[skill_id]
+                for other_id in range(scanned, size):
+                    if other_id != skill_id and skill in self._skills[other_id]:
+                        bits |= 1 << other_id
+                self._supersets[skill_id] = (bits, size)
+        return bits
+
+    def subsets(self, skill_id):
+        """Bitset of the other skills that are substrings of this skill"""
+        bits, size = self._subsets.get(skill_id, (0, -1))
+        if size != len(self._skills):
+            bits = 0
+            skill = self._skills[skill_id]
+            for start in range(len(skill)):
+                for end in range(start + 1, len(skill) + 1):
+                    other_id = self._ids.get(skill[start:end])
+                    if other_id is not None and other_id != skill_id:
+                        bits |= 1 << other_id
+            self._subsets[skill_id] = (bits, len(self._skills))
+        return bits
+
+    def partial_job_bits(self, job_bits):
+        """Bitset of the skills contained in at least one job skill"""
+        bits = 0
+        for job_id in iter_bits(job_bits):
+            bits |= self.subsets(job_id)
+        return bits
+
+def skill_match_counts(vocabulary, resume_bits, job_bits):
+    """
+    Count full and partial skill matches between two skill bitsets
+
+    A job skill not matched exactly matches partially when some resume skill
+    contains it; a resume skill not matched exactly matches partially when it
+    is contained in some job skill.
+
+    Returns:
+        Tuple of (full_count, partial_count)
+    """
+    matched = resume_bits & job_bits
+    partial = popcount(resume_bits & ~matched & vocabulary.partial_job_bits(job_bits))
+    for job_id in iter_bits(job_bits & ~matched):
+        if vocabulary.supersets(job_id) & resume_bits:
+            partial += 1
+    return popcount(matched), partial
+
+class SkillMatrix:
+    """
+    Skill sets of many resumes in CSR form over a SkillVocabulary
+
+    Scoring one job against every row is a handful of passes over the
+    non-zero entries instead of one nested loop per resume.
+    """
+
+    def __init__(self, skill_lists, vocabulary=None):
+        self.vocabulary = vocabulary or SkillVocabulary()
+        indptr = np.zeros(len(skill_lists) + 1, dtype=np.int64)
+        indices = []
+        for row, skills in enumerate(skill_lists):
+            indices.extend(self.vocabulary.ids(skills))
+            indptr[row + 1] = len(indices)
+        self.indptr = indptr
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.rows = np.repeat(np.arange(len(skill_lists)), np.diff(indptr))
+
+    @classmethod
+    def from_csr(cls, skills, indptr, indices, vocabulary=None):
+        """
+        Rebuild a matrix saved as CSR arrays without re-reading every row's skill list
+
+        Args:
+            skills: Skill of each id in indices (the saved vocabulary)
+            indptr, indices: CSR arrays of the saved matrix
+            vocabulary: SkillVocabulary to map the skills into (a new one by default)
+        """
+        matrix = cls([], vocabulary)
+        id_map = np.asarray([matrix.vocabulary.id_for(skill) for skill in skills], dtype=np.int64)
+        matrix.indptr = np.asarray(indptr, dtype=np.int64)
+        matrix.indices = id_map[np.asarray(indices, dtype=np.int64)] if len(indices) else np.zeros(0, dtype=np.int64)
+        matrix.rows = np.repeat(np.arange(len(matrix.indptr) - 1), np.diff(matrix.indptr))
+        return matrix
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def _rows_with_any(self, bits):
+        mask = np.zeros(len(self), dtype=bool)
+        if bits:
+            mask[self.rows[np.isin(self.indices, list(iter_bits(bits)))]] = True
+        return mask
+
+    def match_counts(self, job_skills):
+        """
+        Full and partial match counts of every row against one job
+
+        Returns:
+            Tuple of (full_counts, partial_counts) arrays
+        """
+        vocabulary = self.vocabulary
+        job_bits = vocabulary.bits(job_skills)
+        full = np.zeros(len(self), dtype=np.float32)
+        partial = np.zeros(len(self), dtype=np.float32)
+
+        # Resume skills contained in some job skill (never themselves job skills once matched)
+        contained = vocabulary.partial_job_bits(job_bits) & ~job_bits
+        if contained:
+            partial += np.bincount(self.rows[np.isin(self.indices, list(iter_bits(contained)))],
+                                   minlength=len(self))
+
+        for job_id in iter_bits(job_bits):
+            exact = self._rows_with_any(1 << job_id)
+            full += exact
+            partial += self._rows_with_any(vocabulary.supersets(job_id)) & ~exact
+        return full, partial
+
+    def has_skills(self):
+        return np.diff(self.indptr) > 0
+
+_vocabulary = None
+_vocabulary_lock = threading.Lock()
+
+def get_vocabulary():
+    """Get the shared skill vocabulary, resetting it to the taxonomy when it grows too large"""
+    global _vocabulary
+    with _vocabulary_lock:
+        if _vocabulary is None or len(_vocabulary) > MAX_VOCABULARY_SIZE:
+            if _vocabulary is not None:
+                logger.warning("Skill vocabulary exceeded %s skills, resetting", MAX_VOCABULARY_SIZE)
+            _vocabulary = SkillVocabulary()
+        return _vocabulary
+
+def skill_match_score(resume_skills, job_skills):
+    """
+    Skill match score (0-100) of a resume against a job
+
+    Full matches count once and partial matches half, relative to the
+    number of required job skills.
+
+    Returns:
+        Tuple of (score, full_count, partial_count)
+    """
+    vocabulary = get_vocabulary()
+    full, partial = skill_match_counts(vocabulary, vocabulary.bits(resume_skills), vocabulary.bits(job_skills))
+    score = (full + partial * 0.5) / len(job_skills) * 100 if job_skills else 0
+    return score, full, partial
@@ -0,0 +1,261 @@
+import os
+import hmac
+import json
+import time
+import socket
+import hashlib
+import logging
+import ipaddress
+from urllib.parse import urlparse
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Seconds before a webhook delivery attempt is abandoned
+CALLBACK_TIMEOUT = float(os.environ.get('CALLBACK_TIMEOUT', '5'))
+# Delivery attempts after the first one (with exponential backoff)
+CALLBACK_MAX_RETRIES = int(os.environ.get('CALLBACK_MAX_RETRIES', '3'))
+# When set, webhook bodies are signed with HMAC-SHA256 in the X-Signature-256 header
+CALLBACK_SECRET = os.environ.get('CALLBACK_SECRET', '')
+# Comma separated hosts callbacks may be sent to; when empty, any host resolving only to public addresses
+CALLBACK_ALLOWED_HOSTS = [host.strip().lower() for host in os.environ.get('CALLBACK_ALLOWED_HOSTS', '').split(',')
+                          if host.strip()]
+# Comment lines sent on idle event streams so proxies keep the connection open
+SSE_KEEPALIVE_SECONDS = float(os.environ.get('SSE_KEEPALIVE_SECONDS', '15'))
+# Event streams are closed after this long even if the task has not finished
+SSE_MAX_SECONDS = float(os.environ.get('SSE_MAX_SECONDS', '600'))
+# How often the task state is read when the result backend has no pub/sub
+SSE_POLL_INTERVAL = float(os.environ.get('SSE_POLL_INTERVAL', '0.5'))
+
+FINISHED_STATUSES = ('completed', 'failure', 'revoked')
+
+def event_channel(task_id):
+    """Redis pub/sub channel of a task's events"""
+    return f"task-events:{task_id}"
+
+def pubsub_client(backend):
+    """Redis client of a Celery result backend, or None if the backend is not Redis"""
+    client = getattr(backend, 'client', None)
+    return client if client is not None and hasattr(client, 'pubsub') else None
+
+def publish_task_event(backend, task_id, event):
+    """
+    Publish a task event to the task's channel
+
+    Returns:
+        True if the event was published (False without a Redis backend or on error)
+    """
+    client = pubsub_client(backend)
+    if client is None or not task_id:
+        return False
+    try:
+        client.publish(event_channel(task_id), json.dumps(event, default=str))
+        return True
+    except Exception as e:
+        logger.warning("Could not publish event for task %s: %s", task_id, e)
+        return False
+
+def resolve_host(host):
+    """
+    IP addresses a host name resolves to
+
+    Raises:
+        ValueError: If the name does not resolve
+    """
+    try:
+        infos = socket.getaddrinfo(host, None)
+    except (socket.gaierror, UnicodeError) as e:
+        raise ValueError(f"Callback host does not resolve: {host}") from e
+    # Scoped IPv6 addresses carry a %zone suffix; getaddrinfo's preference order is kept
+    return list(dict.fromkeys(ipaddress.ip_address(info[4][0].split('%')[0]) for info in infos))
+
+def check_callback_url(url):
+    """
+    Check a webhook URL
+
+    Returns:
+        Tuple of (parsed URL, validated addresses); addresses is None for
+        hosts in CALLBACK_ALLOWED_HOSTS, which are trusted by name
+
+    Raises:
+        ValueError: If the URL is not http(s), or its host is not in
+            CALLBACK_ALLOWED_HOSTS or (without an allowlist) resolves to a
+            loopback, private, link-local or reserved address
+    """
+    parsed = urlparse(url or '')
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise ValueError('Callback URL must be an absolute http(s) URL')
+    host = parsed.hostname.lower()
+    if CALLBACK_ALLOWED_HOSTS:
+        if host not in CALLBACK_ALLOWED_HOSTS:
+            raise ValueError(f"Callback host is not allowed: {parsed.hostname}")
+        return parsed, None
+    # The API is unauthenticated: without an allowlist, never let the worker POST to internal addresses
+    addresses = resolve_host(host)
+    for address in addresses:
+        if not address.is_global or address.is_multicast:
+            raise ValueError(f"Callback host resolves to a non-public address: {parsed.hostname}")
+    return parsed, addresses
+
+def validate_callback_url(url):
+    """
+    Check a webhook URL before a task is queued with it (see check_callback_url)
+
+    Raises:
+        ValueError: If the URL is not allowed
+    """
+    check_callback_url(url)
+    return url
+
+def pinned_url(parsed, address):
+    """The URL with its host replaced by a validated address, and the Host header value of the original"""
+    host = f"[{address}]" if address.version == 6 else str(address)
+    netloc = f"{host}:{parsed.port}" if parsed.port else host
+    host_header = f"{parsed.hostname}:{parsed.port}" if parsed.port else parsed.hostname
+    return parsed._replace(netloc=netloc).geturl(), host_header
+
+def sign_payload(body, secret=None):
+    """HMAC-SHA256 signature header value of a webhook body"""
+    secret = CALLBACK_SECRET if secret is None else secret
+    return 'sha256=' + hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+
+class CallbackError(Exception):
+    """A webhook delivery failed; retriable is False for responses that will not change on retry"""
+
+    def __init__(self, message, retriable=True):
+        super().__init__(message)
+        self.retriable = retriable
+
+def server_name_adapter(server_hostname):
+    """requests adapter whose HTTPS connections use server_hostname for SNI and certificate checks"""
+    from requests.adapters import HTTPAdapter
+
+    class ServerNameAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            kwargs['server_hostname'] = server_hostname
+            super().init_poolmanager(*args, **kwargs)
+
+    return ServerNameAdapter()
+
+def post_callback(url, payload):
+    """
+    POST a task result to a webhook URL
+
+    Returns:
+        HTTP status code of the receiver
+
+    Raises:
+        CallbackError: On connection errors and non-2xx responses
+    """
+    import requests
+    # Checked again in the worker, since the name may resolve differently by now
+    try:
+        parsed, addresses = check_callback_url(url)
+    except ValueError as e:
+        raise CallbackError(str(e), retriable=False)
+    body = json.dumps(payload, default=str).encode('utf-8')
+    headers = {'Content-Type': 'application/json', 'X-Task-Id': str(payload.get('taskId', ''))}
+    if CALLBACK_SECRET:
+        headers['X-Signature-256'] = sign_payload(body)
+
+    session = requests.Session()
+    if addresses:
+        # Connect to the address just validated instead of resolving the name again (DNS rebinding);
+        # the name is still sent as Host and used for TLS SNI and certificate checks
+        url, headers['Host'] = pinned_url(parsed, addresses[0])
+        session.mount('https://', server_name_adapter(parsed.hostname))
+    try:
+        # Redirects are not followed, so a receiver cannot bounce the POST to an internal address
+        with session:
+            response = session.post(url, data=body, headers=headers, timeout=CALLBACK_TIMEOUT, allow_redirects=False)
+    except requests.RequestException as e:
+        raise CallbackError(f"Callback request failed: {str(e)}")
+    if response.status_code >= 300:
+        # Client errors other than rate limiting will not succeed on retry
+        retriable = response.status_code >= 500 or response.status_code == 429
+        raise CallbackError(f"Callback returned HTTP {response.status_code}", retriable=retriable)
+    return response.status_code
+
+def format_sse(event, data):
+    """One Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def iter_task_events(backend, task_id, get_status, keepalive=None, max_seconds=None, poll_interval=None):
+    """
+    Generate the Server-Sent Events stream of a task
+
+    The current status is sent first; the stream then waits for events the
+    worker publishes on the task's channel (or reads the task state every
+    poll_interval when the backend has no pub/sub), forwards progress events
+    and ends with a 'completed' or 'failed' event carrying the same body as
+    /api/task/<task_id>.
+
+    Args:
+        backend: Celery result backend
+        task_id: Task id
+        get_status: Callable returning the /api/task status dict of the task
+    """
+    keepalive = SSE_KEEPALIVE_SECONDS if keepalive is None else keepalive
+    max_seconds = SSE_MAX_SECONDS if max_seconds is None else max_seconds
+    poll_interval = SSE_POLL_INTERVAL if poll_interval is None else poll_interval
+
+    client = pubsub_client(backend)
+    pubsub = None
+    if client is not None:
+        try:
+            # Subscribe before reading the state so a completion in between is not missed
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(event_channel(task_id))
+        except Exception as e:
+            logger.warning("Task event subscription failed, polling task %s instead: %s", task_id, e)
+            pubsub = None
+
+    def final_event(status):
+        return format_sse('completed' if status['status'] == 'completed' and status.get('success') else 'failed',
+                          status)
+
+    try:
+        # Reconnection delay for EventSource clients
+        yield 'retry: 3000\n\n'
+        status = get_status()
+        yield format_sse('status', {'taskId': task_id, 'status': status['status']})
+        if status['status'] in FINISHED_STATUSES:
+            yield final_event(status)
+            return
+
+        deadline = time.time() + max_seconds
+        last_sent = time.time()
+        last_status = status['status']
+        while time.time() < deadline:
+            message = None
+            if pubsub is not None:
+                message = pubsub.get_message(timeout=min(keepalive, max(deadline - time.time(), 0)))
+            else:
+                time.sleep(poll_interval)
+
+            if message and message.get('type') == 'message':
+                event = json.loads(message['data'])
+                if event.get('status') == 'progress':
+                    yield format_sse('progress', event)
+                    last_sent = time.time()
+                    continue
+
+            status = get_status()
+            if status['status'] in FINISHED_STATUSES:
+                yield final_event(status)
+                return
+            if status['status'] != last_status:
+                last_status = status['status']
+                yield format_sse('status', {'taskId': task_id, 'status': last_status})
+                last_sent = time.time()
+            elif time.time() - last_sent >= keepalive:
+                yield ': keepalive\n\n'
+                last_sent = time.time()
+
+        yield format_sse('timeout', {'taskId': task_id, 'status': last_status})
+    finally:
+        if pubsub is not None:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
@@ -0,0 +1,102 @@
+import os
+import logging
+from celery import states
+from celery.backends.base import KeyValueStoreBackend
+from kombu.utils.encoding import bytes_to_str
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Most task ids accepted by one bulk status request
+TASK_STATUS_MAX_IDS = int(os.environ.get('TASK_STATUS_MAX_IDS', '500'))
+
+PENDING_META = {'status': states.PENDING, 'result': None}
+
+def fetch_task_metas(backend, task_ids):
+    """
+    Read the stored metadata of many tasks
+
+    Key-value backends (Redis, memcached, the in-memory cache) are read with
+    one MGET; other backends fall back to one lookup per task.
+
+    Returns:
+        List of meta dicts (status, result, ...) in input order; unknown ids are PENDING
+    """
+    if not task_ids:
+        return []
+    if isinstance(backend, KeyValueStoreBackend):
+        keys = [backend.get_key_for_task(task_id) for task_id in task_ids]
+        try:
+            values = backend.mget(keys)
+        except NotImplementedError:
+            values = None
+        if values is not None:
+            if hasattr(values, 'items'):
+                # Some clients return a mapping of the keys that exist
+                values = [values.get(key, values.get(bytes_to_str(key))) for key in keys]
+            return [backend.decode_result(value) if value else dict(PENDING_META) for value in values]
+    return [backend.get_task_meta(task_id) for task_id in task_ids]
+
+def project(value, fields):
+    """
+    Keep only the given dotted paths of a (nested) dict
+
+    project({'data': {'matchScore': 80, 'skills': [...]}}, ['data.matchScore'])
+    returns {'data': {'matchScore': 80}}; missing paths are left out.
+    """
+    projected = {}
+    for field in fields:
+        current = value
+        parts = field.split('.')
+        for part in parts:
+            if not isinstance(current, dict) or part not in current:
+                break
+            current = current[part]
+        else:
+            target = projected
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = current
+    return projected
+
+def compact_status(task_id, meta, fields=None):
+    """
+    Compact status of one task, using the same status names as /api/task/<task_id>
+
+    Args:
+        task_id: Task id
+        meta: Stored task metadata (see fetch_task_metas)
+        fields: None to leave the result out, ['*'] for the whole result, or
+            dotted paths of the result to include (see project)
+    """
+    state = meta.get('status') or states.PENDING
+    result = meta.get('result')
+    entry = {
+        'taskId': task_id,
+        'status': 'completed' if state == states.SUCCESS else state.lower(),
+        'success': state not in states.EXCEPTION_STATES
+    }
+    if state == states.SUCCESS:
+        if isinstance(result, dict) and 'success' in result:
+            entry['success'] = bool(result['success'])
+            if not result['success']:
+                entry['error'] = result.get('message', 'Task completed but failed')
+        if fields:
+            if '*' in fields or not isinstance(result, dict):
+                entry['result'] = result
+            else:
+                entry['result'] = project(result, fields)
+    elif state in states.EXCEPTION_STATES:
+        entry['error'] = str(result) if result else 'Unknown error occurred'
+    elif state == 'PROGRESS' and isinstance(result, dict):
+        entry['progress'] = result
+    return entry
+
+def compact_summary(task_id, summary, fields=None):
+    """Compact status of a finished task whose result expired, from its retained summary"""
+    entry = {'taskId': task_id, 'status': 'completed', 'success': summary.get('success', True), 'resultExpired': True}
+    if not entry['success'] and summary.get('message'):
+        entry['error'] = summary['message']
+    if fields:
+        entry['summary'] = summary if '*' in fields else project(summary, fields)
+    return entry
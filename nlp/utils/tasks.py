@@ -4,95 +4,33 @@ from .extract_skills import extract_skills
 from .extract_education import extract_education
 from .extract_experience import extract_experience
 from .extract_projects import extract_projects
-from .calculate_score import calculate_match_score, detect_job_category, normalize_job_category
+from .extract_contact import extract_contact_info, extract_candidate_name
+from .batch_extract import iter_extract_resumes_batch, parse_resume, extract_from_docs, FULL_TEXT
+from .embedding_cache import get_job_embedding_cache
+from . import metrics
+from .profiling import profiled_task
+from .task_events import publish_task_event, post_callback, CallbackError, CALLBACK_MAX_RETRIES
+from .result_store import retain_result, remove_expired_results, RETAINED_TASKS
+from .worker_bootstrap import bootstrap_worker, init_pool_process, pool_forks, warm_up_worker
+from .metrics import (
+    Trace, span, dump_metrics, start_metrics_server, TASK_DURATION, TASKS_IN_PROGRESS, QUEUE_DEPTH
+)
+from .nlp_model import get_nlp
+from .logging_config import log_payload
+from .candidate_pool import get_pool, rank_candidates
+from .calculate_score import calculate_match_score, detect_job_category, normalize_job_category, encode_texts
 import os
-import re
-import spacy
 import logging
 import time
 import traceback
-import inspect
-from celery.signals import worker_ready
+import tempfile
+from celery.signals import worker_ready, worker_init, worker_process_init, worker_process_shutdown, task_prerun, task_postrun
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Load spaCy model
-try:
-    nlp = spacy.load('en_core_web_sm')
-    logger.info("Loaded spaCy model for tasks")
-except Exception as e:
-    logger.error(f"Error loading spaCy model in tasks: {str(e)}")
-    nlp = None
-
-def extract_contact_info(text):
-    """Extract contact information from resume text"""
-    if not text:
-        return {}
-        
-    contact = {}
-    # Email pattern
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    # Phone pattern - handle various formats
-    phone_pattern = r'(?:\+\d{1,3}[-.\s]?)?(?:\(?\d{3}\)?[-.\s]?)?\d{3}[-.\s]?\d{4}'
-    # LinkedIn pattern
-    linkedin_pattern = r'(?:linkedin\.com/in/|linkedin:\s*)([a-zA-Z0-9_-]+)'
-    
-    emails = re.findall(email_pattern, text)
-    phones = re.findall(phone_pattern, text)
-    linkedin = re.findall(linkedin_pattern, text.lower())
-    
-    if emails:
-        contact['email'] = emails[0]
-    if phones:
-        contact['phone'] = phones[0]
-    if linkedin:
-        contact['linkedin'] = f"linkedin.com/in/{linkedin[0]}"
-    
-    # Extract address if NLP is available
-    if nlp:
-        try:
-            doc = nlp(text[:5000])  # Process first 5000 chars to save time
-            for ent in doc.ents:
-                if ent.label_ in ['GPE', 'LOC']:
-                    if 'address' not in contact:
-                        contact['address'] = ent.text
-                    else:
-                        contact['address'] += f", {ent.text}"
-        except Exception as e:
-            logger.error(f"Error extracting address with spaCy: {str(e)}")
-            
-    return contact
-
-def extract_candidate_name(text):
-    """Extract candidate name from resume"""
-    if not text or not nlp:
-        return ''
-        
-    try:
-        # Look for name at the beginning of the resume (first 1000 chars)
-        doc = nlp(text[:1000])
-        
-        # First check for PERSON entities
-        for ent in doc.ents:
-            if ent.label_ == 'PERSON':
-                # Validate this isn't a company name
-                if not any(term in ent.text.lower() for term in ['inc', 'corp', 'llc', 'ltd', 'company']):
-                    return ent.text
-                    
-        # If no clear PERSON entity, look for capitalized words at the start
-        lines = text[:1000].split('\n')
-        for line in lines[:5]:  # Check first 5 lines
-            line = line.strip()
-            if 2 <= len(line.split()) <= 5 and all(word[0].isupper() for word in line.split() if word):
-                # Likely a name if 2-5 capitalized words
-                return line
-                
-    except Exception as e:
-        logger.error(f"Error extracting candidate name: {str(e)}")
-    
-    return ''
+nlp = get_nlp()
 
 def retry_function(func, *args, max_attempts=3, delay=0.5, backoff_factor=1):
     """Retry a function multiple times with delay between attempts
@@ -110,23 +48,363 @@ def retry_function(func, *args, max_attempts=3, delay=0.5, backoff_factor=1):
     for attempt in range(max_attempts):
         try:
             func_name = func.__name__ if hasattr(func, "__name__") else str(func)
-            logger.info(f"Attempt {attempt + 1} of {max_attempts} for {func_name}")
+            logger.info("Attempt %s of %s for %s", attempt + 1, max_attempts, func_name)
             return func(*args)
         except Exception as e:
             last_error = e
             if attempt < max_attempts - 1:  # Don't sleep on the last attempt
-                logger.warning(f"Attempt {attempt + 1} failed: {str(e)}. Retrying in {current_delay} seconds.")
+                logger.warning("Attempt %s failed: %s. Retrying in %s seconds.", attempt + 1, e, current_delay)
                 time.sleep(current_delay)
                 current_delay *= backoff_factor  # Apply backoff factor
             else:
-                logger.warning(f"Attempt {attempt + 1} failed: {str(e)}")
+                logger.warning("Attempt %s failed: %s", attempt + 1, e)
     
     if last_error:
-        logger.error(f"All {max_attempts} attempts failed. Last error: {str(last_error)}")
+        logger.error("All %s attempts failed. Last error: %s", max_attempts, last_error)
         raise last_error
 
+def validate_resume_file(file_path):
+    """
+    Validate a resume file before extraction
+    
+    Args:
+        file_path: Path to the resume file
+        
+    Returns:
+        The lowercased file extension
+        
+    Raises:
+        ValueError: If the file is empty or of an unsupported type
+    """
+    file_size = os.path.getsize(file_path)
+    file_ext = os.path.splitext(file_path)[1].lower()
+    logger.info("File details: path=%s, size=%s bytes, type=%s", file_path, file_size, file_ext)
+    
+    if file_size == 0:
+        raise ValueError("File is empty")
+    
+    if file_ext not in ['.pdf', '.docx']:
+        raise ValueError(f"Unsupported file type: {file_ext}")
+        
+    return file_ext
+
+def generate_fallback_data(resume_text, skills, education, experience):
+    """
+    Fill in skills, education and experience when extraction found nothing
+    
+    Returns:
+        Tuple of (skills, education, experience)
+    """
+    if len(skills) == 0:
+        # Extract common terms from resume as skills
+        logger.info("No skills found, generating fallback skills")
+        common_words = [w.lower() for w in resume_text.split() if len(w) > 3]
+        word_count = {}
+        for word in common_words:
+            if word not in word_count:
+                word_count[word] = 0
+            word_count[word] += 1
+        
+        # Get most common terms
+        from collections import Counter
+        most_common = Counter(word_count).most_common(10)
+        skills = [word[0].capitalize() for word in most_common]
+        log_payload(logger, "Generated fallback skills", skills)
+    
+    # Generate fallback education if empty
+    if len(education) == 0:
+        logger.info("No education found, generating fallback education")
+        degree_name = "Bachelor's Degree"
+        institution = "University"
+        
+        # Try to extract university name from text
+        unis = ["University", "College", "Institute", "School"]
+        for line in resume_text.split('\n'):
+            for uni in unis:
+                if uni in line:
+                    institution = line.strip()
+                    break
+        
+        education = [{
+            "institution": institution,
+            "degree": degree_name,
+            "field": "Computer Science",
+            "year": "2020"
+        }]
+        log_payload(logger, "Generated fallback education", education)
+    
+    # Generate fallback experience if empty
+    if len(experience) == 0:
+        logger.info("No experience found, generating fallback experience")
+        # Try to extract company names
+        company_indicators = ["Ltd", "LLC", "Inc", "Corporation", "Corp", "Company"]
+        companies = []
+        
+        for line in resume_text.split('\n'):
+            for indicator in company_indicators:
+                if indicator in line:
+                    companies.append(line.strip())
+                    break
+        
+        if not companies:
+            companies = ["Company"]
+        
+        experience = [{
+            "company": companies[0],
+            "position": "Professional",
+            "duration": "1 year",
+            "description": "Worked on various projects and responsibilities"
+        }]
+        log_payload(logger, "Generated fallback experience", experience)
+    
+    return skills, education, experience
+
+def build_result_data(candidate_name, contact_info, skills, education, experience, projects, matchScore, job_category,
+                      score_breakdown=None):
+    """Build the 'data' payload returned for a processed resume"""
+    return {
+        'candidateName': candidate_name or '',
+        'contactInfo': contact_info or {},
+        'skills': skills or [],
+        'education': education or [],
+        'experience': experience or [],
+        'projects': projects or [],
+        'matchScore': matchScore,
+        'jobCategory': job_category, 
+        'isShortlisted': matchScore >= 75,
+        'scoreBreakdown': score_breakdown
+    }
+
+def extract_resume_text(file_path):
+    """
+    Extract and validate the text of a resume, retrying failed extractions
+    
+    Args:
+        file_path: Path to the resume file
+        
+    Returns:
+        The extracted resume text
+        
+    Raises:
+        ValueError: If no usable text could be extracted
+    """
+    logger.info("Extracting text from resume (with retries): %s", file_path)
+
+    # Test file handling before extraction
+    with open(file_path, 'rb') as test_file:
+        first_bytes = test_file.read(20)
+        logger.info("File first bytes (hex): %s", first_bytes.hex())
+
+    # First attempt direct extraction
+    resume_text = None
+    try:
+        resume_text = extract_text(file_path)
+        logger.info("Direct extraction complete, text length: %s", len(resume_text) if resume_text else 0)
+    except Exception as direct_error:
+        logger.error("Direct extraction failed: %s", direct_error)
+        logger.error(traceback.format_exc())
+
+    # If direct extraction failed, try with retry mechanism
+    if not resume_text:
+        logger.info("Attempting extraction with retry mechanism")
+        resume_text = retry_function(
+            extract_text,
+            file_path,
+            max_attempts=3,
+            delay=1,
+            backoff_factor=2
+        )
+
+    # Extensive validation of extracted text
+    if not resume_text:
+        logger.error("Extraction returned None")
+        raise ValueError("No text extracted from file")
+
+    if not resume_text.strip():
+        logger.error("Extraction returned empty string or whitespace")
+        raise ValueError("Empty text extracted from resume")
+
+    if len(resume_text) < 50:
+        logger.warning("Very short text extracted (%s chars): %s", len(resume_text), resume_text)
+        # Continue processing, but note the concern
+
+    # Log extracted text statistics    
+    lines = resume_text.split('\n')
+    words = resume_text.split()
+    logger.info("Extracted text statistics: %s chars, %s lines, %s words", len(resume_text), len(lines), len(words))
+    log_payload(logger, "Text sample", resume_text[:200])
+    
+    return resume_text
+
+def extract_resume_sections(resume_text, job_skills, file_path, normalized_category, trace=None):
+    """
+    Run every extractor on a resume, generating fallback data for anything missing
+    
+    Args:
+        resume_text: The resume text
+        job_skills: List of required skills
+        file_path: Path to the resume file (used to name the candidate if extraction fails)
+        normalized_category: Internal job category key (used for fallback skills)
+        trace: Optional metrics Trace the extractor timings are recorded in
+        
+    Returns:
+        Tuple of (candidate_name, contact_info, skills, education, experience, projects)
+    """
+    try:
+        # Extract skills with detailed logging
+        logger.info("Extracting skills from resume")
+        with span('skills', trace) as stage:
+            try:
+                skills = retry_function(extract_skills, resume_text, job_skills, max_attempts=2)
+                logger.info("Extracted %s skills: %s", len(skills), skills[:10])
+            except Exception as skills_error:
+                stage.outcome = 'error'
+                logger.error("Skills extraction failed: %s", skills_error)
+                logger.error(traceback.format_exc())
+                skills = []
+
+        # Extract education with detailed logging
+        logger.info("Extracting education from resume")
+        with span('education', trace) as stage:
+            try:
+                education = retry_function(extract_education, resume_text, max_attempts=2)
+                logger.info("Extracted %s education entries", len(education))
+                for i, edu in enumerate(education):
+                    logger.info("Education %s: %s - %s", i+1, edu.get('institution', 'Unknown'), edu.get('degree', 'Unknown'))
+            except Exception as education_error:
+                stage.outcome = 'error'
+                logger.error("Education extraction failed: %s", education_error)
+                logger.error(traceback.format_exc())
+                education = []
+
+        # Extract experience with detailed logging
+        logger.info("Extracting experience from resume")
+        with span('experience', trace) as stage:
+            try:
+                experience = retry_function(extract_experience, resume_text, max_attempts=2)
+                logger.info("Extracted %s experience entries", len(experience))
+                for i, exp in enumerate(experience):
+                    logger.info("Experience %s: %s - %s", i+1, exp.get('company', 'Unknown'), exp.get('position', 'Unknown'))
+            except Exception as experience_error:
+                stage.outcome = 'error'
+                logger.error("Experience extraction failed: %s", experience_error)
+                logger.error(traceback.format_exc())
+                experience = []
+
+        # Extract projects with detailed logging
+        logger.info("Extracting projects from resume")
+        with span('projects', trace) as stage:
+            try:
+                projects = retry_function(extract_projects, resume_text, max_attempts=2)
+                logger.info("Extracted %s projects", len(projects))
+            except Exception as projects_error:
+                stage.outcome = 'error'
+                logger.error("Projects extraction failed: %s", projects_error)
+                logger.error(traceback.format_exc())
+                projects = []
+
+        # Extract contact info
+        logger.info("Extracting contact info from resume")
+        with span('contact_info', trace) as stage:
+            try:
+                contact_info = retry_function(extract_contact_info, resume_text, max_attempts=2)
+                logger.info("Contact info extracted: %s", contact_info.keys())
+            except Exception as contact_error:
+                stage.outcome = 'error'
+                logger.error("Contact info extraction failed: %s", contact_error)
+                logger.error(traceback.format_exc())
+                contact_info = {}
+
+        # Extract candidate name
+        logger.info("Extracting candidate name from resume")
+        with span('candidate_name', trace) as stage:
+            try:
+                candidate_name = retry_function(extract_candidate_name, resume_text, max_attempts=2)
+                logger.info("Candidate name: %s", candidate_name)
+            except Exception as name_error:
+                stage.outcome = 'error'
+                logger.error("Candidate name extraction failed: %s", name_error)
+                logger.error(traceback.format_exc())
+                candidate_name = ""
+
+        # Ensure we have at least some data
+        with span('fallback_data', trace) as stage:
+            extracted_counts = (len(skills), len(education), len(experience))
+            skills, education, experience = generate_fallback_data(resume_text, skills, education, experience)
+            if any(count == 0 for count in extracted_counts):
+                stage.outcome = 'fallback'
+
+    except Exception as e:
+        logger.error("Error extracting information from resume: %s", e)
+        logger.error(traceback.format_exc())
+
+        # Generate reasonable fallback data based on filename
+        logger.info("Exception caught - generating fallback data")
+        filename = os.path.basename(file_path)
+        candidate_name = os.path.splitext(filename)[0].replace("_", " ").title()
+        logger.info("Generated candidate name from filename: %s", candidate_name)
+
+        # Default contact info
+        contact_info = {
+            "email": f"{candidate_name.lower().replace(' ', '.')}@example.com",
+            "phone": "+1234567890"
+        }
+
+        # Default skills based on job category
+        if normalized_category == 'web_developer':
+            skills = ["HTML", "CSS", "JavaScript", "React", "Node.js"]
+        elif normalized_category == 'cybersecurity':
+            skills = ["Security", "Penetration Testing", "Network Security", "Encryption", "Firewall"]
+        elif normalized_category == 'python_developer':
+            skills = ["Python", "Django", "Flask", "Pandas", "API Development"]
+        else:
+            skills = ["Programming", "Problem Solving", "Communication", "Teamwork", "Project Management"]
+
+        log_payload(logger, "Generated skills for %s", skills, normalized_category)
+
+        # Default education
+        education = [{
+            "institution": "University",
+            "degree": "Bachelor's Degree",
+            "field": "Computer Science",
+            "year": "2020"
+        }]
+
+        # Default experience
+        experience = [{
+            "company": "Company",
+            "position": "Professional",
+            "duration": "1 year",
+            "description": "Worked on various projects and responsibilities"
+        }]
+
+        # Default projects
+        projects = [{
+            "title": "Project",
+            "description": "A project demonstrating technical skills",
+            "technologies": skills[:3],
+            "duration": "3 months"
+        }]
+
+        logger.info("Using generated fallback resume data due to extraction failure")
+    
+    return candidate_name, contact_info, skills, education, experience, projects
+
+def add_to_candidate_pool(pool_name, candidate_id, resume_text, skills, resume_embedding, candidate_name):
+    """Store a processed resume in a candidate pool, logging instead of failing the task"""
+    try:
+        get_pool(pool_name).add(
+            candidate_id, resume_text, skills, resume_embedding,
+            metadata={'candidateName': candidate_name or ''}
+        )
+    except Exception as pool_error:
+        logger.error("Error adding candidate %s to pool: %s", candidate_id, pool_error)
+        logger.error(traceback.format_exc())
+
 @app.task(name='process_resume', bind=True, max_retries=3, retry_backoff=True)
-def process_resume(self, file_path, job_description, job_skills, job_category=None):
+@profiled_task
+def process_resume(self, file_path, job_description, job_skills, job_category=None, candidate_id=None, pool_name=None,
+                   callback_url=None):
     """
     Process resume and calculate match score
     
@@ -135,9 +413,14 @@ def process_resume(self, file_path, job_description, job_skills, job_category=No
         job_description: Job description text
         job_skills: List of required skills
         job_category: Job category (optional, will be detected from description if not provided)
+        candidate_id: Optional candidate id; when given the resume is stored in the candidate pool
+        pool_name: Candidate pool to store the resume in (defaults to the default pool)
+        callback_url: Optional webhook the result is POSTed to when the task finishes
+        profile: Profile this run (see utils.profiling); added by profiled_task
     """
+    trace = Trace()
     try:
-        logger.info(f"Starting to process resume: {file_path}")
+        logger.info("Starting to process resume: %s", file_path)
         
         # Input validation
         if not os.path.exists(file_path):
@@ -150,21 +433,14 @@ def process_resume(self, file_path, job_description, job_skills, job_category=No
         
         # Log file details
         try:
-            file_size = os.path.getsize(file_path)
-            file_ext = os.path.splitext(file_path)[1].lower()
-            logger.info(f"File details: path={file_path}, size={file_size} bytes, type={file_ext}")
-            
-            if file_size == 0:
-                raise ValueError("File is empty")
-            
-            if file_ext not in ['.pdf', '.docx']:
-                raise ValueError(f"Unsupported file type: {file_ext}")
-                
+            with span('validate', trace):
+                file_ext = validate_resume_file(file_path)
         except Exception as e:
-            logger.error(f"File validation error: {str(e)}")
+            logger.error("File validation error: %s", e)
             return {
                 'success': False,
-                'message': f"File validation failed: {str(e)}"
+                'message': f"File validation failed: {str(e)}",
+                'timings': trace.to_dict()
             }
         
         # Validate other inputs
@@ -173,76 +449,32 @@ def process_resume(self, file_path, job_description, job_skills, job_category=No
         
         if isinstance(job_skills, str):
             job_skills = [s.strip() for s in job_skills.split(',') if s.strip()]
-            logger.info(f"Converted job_skills string to list: {job_skills}")
+            logger.info("Converted job_skills string to list: %s", job_skills)
         
         if not job_skills:
             logger.warning("No job skills provided")
             job_skills = []
             
         # Log the job category from input
-        logger.info(f"Received job category: '{job_category}'")
+        logger.info("Received job category: '%s'", job_category)
         
         # Normalize category if provided
         normalized_category = None
         if job_category:
             try:
                 normalized_category = normalize_job_category(job_category)
-                logger.info(f"Normalized job category: '{normalized_category}'")
+                logger.info("Normalized job category: '%s'", normalized_category)
             except Exception as e:
-                logger.error(f"Category normalization failed: {str(e)}")
+                logger.error("Category normalization failed: %s", e)
                 # Continue with original category
                 normalized_category = job_category
         
         # Extract text from resume with detailed error reporting
         try:
-            logger.info(f"Extracting text from resume (with retries): {file_path}")
-            
-            # Test file handling before extraction
-            with open(file_path, 'rb') as test_file:
-                first_bytes = test_file.read(20)
-                logger.info(f"File first bytes (hex): {first_bytes.hex()}")
-            
-            # First attempt direct extraction
-            resume_text = None
-            try:
-                resume_text = extract_text(file_path)
-                logger.info(f"Direct extraction complete, text length: {len(resume_text) if resume_text else 0}")
-            except Exception as direct_error:
-                logger.error(f"Direct extraction failed: {str(direct_error)}")
-                logger.error(traceback.format_exc())
-            
-            # If direct extraction failed, try with retry mechanism
-            if not resume_text:
-                logger.info("Attempting extraction with retry mechanism")
-                resume_text = retry_function(
-                    extract_text,
-                    file_path,
-                    max_attempts=3,
-                    delay=1,
-                    backoff_factor=2
-                )
-            
-            # Extensive validation of extracted text
-            if not resume_text:
-                logger.error("Extraction returned None")
-                raise ValueError("No text extracted from file")
-            
-            if not resume_text.strip():
-                logger.error("Extraction returned empty string or whitespace")
-                raise ValueError("Empty text extracted from resume")
-            
-            if len(resume_text) < 50:
-                logger.warning(f"Very short text extracted ({len(resume_text)} chars): {resume_text}")
-                # Continue processing, but note the concern
-                
-            # Log extracted text statistics    
-            lines = resume_text.split('\n')
-            words = resume_text.split()
-            logger.info(f"Extracted text statistics: {len(resume_text)} chars, {len(lines)} lines, {len(words)} words")
-            logger.info(f"Text sample: {resume_text[:200]}...")
-
+            with span('extract_text', trace):
+                resume_text = extract_resume_text(file_path)
         except Exception as e:
-            logger.error(f"Failed to extract text from resume: {str(e)}")
+            logger.error("Failed to extract text from resume: %s", e)
             logger.error(traceback.format_exc())
             
             # Log file information before retrying
@@ -252,279 +484,692 @@ def process_resume(self, file_path, job_description, job_skills, job_category=No
                     logger.info("Attempting to debug DOCX file...")
                     try:
                         doc = docx.Document(file_path)
-                        logger.info(f"DOCX document opened successfully. Paragraphs: {len(doc.paragraphs)}, Tables: {len(doc.tables)}")
+                        logger.info("DOCX document opened successfully. Paragraphs: %s, Tables: %s", len(doc.paragraphs), len(doc.tables))
                         for i, para in enumerate(doc.paragraphs[:5]):
-                            logger.info(f"Paragraph {i}: {para.text[:100]}")
+                            logger.info("Paragraph %s: %s", i, para.text[:100])
                     except Exception as docx_error:
-                        logger.error(f"DOCX debugging failed: {str(docx_error)}")
+                        logger.error("DOCX debugging failed: %s", docx_error)
             except ImportError:
                 logger.warning("python-docx not available for debugging")
             
             # Retry the task if we haven't exceeded max retries
             if self.request.retries < self.max_retries:
-                logger.info(f"Retrying task, attempt {self.request.retries + 1}")
+                logger.info("Retrying task, attempt %s", self.request.retries + 1)
                 raise self.retry(exc=e)
                 
             # If all retries failed, return failure
             return {
                 'success': False, 
-                'message': f'Text extraction failed: {str(e)}'
+                'message': f'Text extraction failed: {str(e)}',
+                'timings': trace.to_dict()
             }
             
-        logger.info(f"Successfully extracted {len(resume_text)} characters from resume")
+        logger.info("Successfully extracted %s characters from resume", len(resume_text))
 
         # If job category not provided or normalization failed, detect it
         if not normalized_category:
-            detected_category = detect_job_category(job_description)
-            logger.info(f"Detected job category: {detected_category}")
+            with span('detect_category', trace):
+                detected_category = detect_job_category(job_description)
+            logger.info("Detected job category: %s", detected_category)
             normalized_category = detected_category
 
         # Extract information from resume with enhanced error handling
-        try:
-            # Extract skills with detailed logging
-            logger.info("Extracting skills from resume")
-            try:
-                skills = retry_function(extract_skills, resume_text, job_skills, max_attempts=2)
-                logger.info(f"Extracted {len(skills)} skills: {skills[:10]}")
-            except Exception as skills_error:
-                logger.error(f"Skills extraction failed: {str(skills_error)}")
-                logger.error(traceback.format_exc())
-                skills = []
-            
-            # Extract education with detailed logging
-            logger.info("Extracting education from resume")
+        candidate_name, contact_info, skills, education, experience, projects = extract_resume_sections(
+            resume_text, job_skills, file_path, normalized_category, trace=trace
+        )
+        
+        # Encode the resume up front when it has to be stored in a candidate pool
+        resume_embedding = None
+        job_embedding = None
+        if candidate_id:
+            with span('embed', trace) as stage:
+                try:
+                    embeddings = encode_texts([resume_text, job_description or ''])
+                    if embeddings is not None:
+                        resume_embedding = embeddings[0]
+                        job_embedding = embeddings[1] if job_description else None
+                except Exception as embed_error:
+                    stage.outcome = 'error'
+                    logger.error("Error encoding resume for candidate pool: %s", embed_error)
+
+        # Calculate match score
+        with span('score', trace) as stage:
             try:
-                education = retry_function(extract_education, resume_text, max_attempts=2)
-                logger.info(f"Extracted {len(education)} education entries")
-                for i, edu in enumerate(education):
-                    logger.info(f"Education {i+1}: {edu.get('institution', 'Unknown')} - {edu.get('degree', 'Unknown')}")
-            except Exception as education_error:
-                logger.error(f"Education extraction failed: {str(education_error)}")
-                logger.error(traceback.format_exc())
-                education = []
+                logger.info("Calculating match score")
+                match_result = calculate_match_score(
+                    resume_text, 
+                    job_description, 
+                    skills, 
+                    job_skills, 
+                    normalized_category,
+                    resume_embedding=resume_embedding,
+                    job_embedding=job_embedding
+                )
+                matchScore = match_result.score
+                score_breakdown = match_result.to_dict()
+                if match_result.fallbacks:
+                    stage.outcome = 'fallback'
             
-            # Extract experience with detailed logging
-            logger.info("Extracting experience from resume")
-            try:
-                experience = retry_function(extract_experience, resume_text, max_attempts=2)
-                logger.info(f"Extracted {len(experience)} experience entries")
-                for i, exp in enumerate(experience):
-                    logger.info(f"Experience {i+1}: {exp.get('company', 'Unknown')} - {exp.get('position', 'Unknown')}")
-            except Exception as experience_error:
-                logger.error(f"Experience extraction failed: {str(experience_error)}")
-                logger.error(traceback.format_exc())
-                experience = []
+                # Ensure minimum score of 15% as a fallback
+                if matchScore is None or matchScore <= 0 or isinstance(matchScore, str):
+                    logger.warning("Invalid match score calculated: %s, using minimum default", matchScore)
+                    stage.outcome = 'fallback'
+                    matchScore = 15.0
             
-            # Extract projects with detailed logging
-            logger.info("Extracting projects from resume")
-            try:
-                projects = retry_function(extract_projects, resume_text, max_attempts=2)
-                logger.info(f"Extracted {len(projects)} projects")
-            except Exception as projects_error:
-                logger.error(f"Projects extraction failed: {str(projects_error)}")
+                logger.info("Match score: %s", matchScore)
+            except Exception as match_error:
+                stage.outcome = 'error'
+                logger.error("Error calculating match score: %s", match_error)
                 logger.error(traceback.format_exc())
-                projects = []
+                # Use a default score rather than failing completely
+                matchScore = 15.0
+                score_breakdown = None
+                logger.info("Using default match score: %s", matchScore)
+
+        if candidate_id and resume_embedding is not None:
+            with span('candidate_pool', trace):
+                add_to_candidate_pool(pool_name, candidate_id, resume_text, skills, resume_embedding, candidate_name)
+
+        # Cleanup
+        try:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+                logger.info("Deleted temporary file: %s", file_path)
+        except Exception as e:
+            logger.warning("Failed to delete temporary file: %s", e)
+
+        # Map back to frontend category format for response
+        frontend_category = job_category or normalized_category
+        
+        # Prepare response
+        return {
+            'success': True,
+            'message': 'Resume processed successfully',
+            'data': build_result_data(
+                candidate_name, contact_info, skills, education, experience,
+                projects, matchScore, frontend_category, score_breakdown
+            ),
+            'timings': trace.to_dict()
+        }
+    except Exception as e:
+        logger.error("Unexpected error processing resume: %s", e)
+        logger.error(traceback.format_exc())
+        # Cleanup on error
+        try:
+            if 'file_path' in locals() and os.path.exists(file_path):
+                os.remove(file_path)
+        except Exception as cleanup_error:
+            logger.warning("Error during cleanup: %s", cleanup_error)
             
-            # Extract contact info
-            logger.info("Extracting contact info from resume")
+        return {
+            'success': False, 
+            'message': f'Error processing resume: {str(e)}',
+            'timings': trace.to_dict()
+        }
+
+
+@app.task(name='process_resume_batch', bind=True)
+def process_resume_batch(self, file_paths, job_description, job_skills, job_category=None, file_names=None,
+                         candidate_ids=None, pool_name=None, callback_url=None):
+    """
+    Process many resumes against one job description
+    
+    The job description is encoded once, resume embeddings are computed in
+    batches and spaCy parsing goes through nlp.pipe. Progress counts are
+    published as PROGRESS state metadata under the batch (task) id.
+    
+    Per-resume stages are timed into the stage histogram under the same
+    names as process_resume; the result's timings hold the batch-wide
+    stages (batch_extract_text, batch_embed, batch_score).
+    
+    Args:
+        file_paths: Paths to the resume files
+        job_description: Job description text
+        job_skills: List of required skills
+        job_category: Job category (optional, will be detected from description if not provided)
+        file_names: Original file names reported back per resume (defaults to the path basenames)
+        candidate_ids: Optional candidate ids (one per file); when given resumes are stored in the candidate pool
+        pool_name: Candidate pool to store the resumes in (defaults to the default pool)
+        callback_url: Optional webhook the result is POSTed to when the batch finishes
+    """
+    batch_id = self.request.id
+    trace = Trace()
+    total = len(file_paths)
+    file_names = file_names or [os.path.basename(path) for path in file_paths]
+    results = [None] * total
+    progress = {'batchId': batch_id, 'total': total, 'extracted': 0, 'processed': 0, 'failed': 0}
+    last_report = [0.0]
+
+    def report_progress(force=False):
+        """Publish progress counts, at most once per second unless forced"""
+        if self.request.is_eager or not batch_id:
+            return
+        now = time.time()
+        if not force and now - last_report[0] < 1.0:
+            return
+        last_report[0] = now
+        try:
+            self.update_state(state='PROGRESS', meta=dict(progress))
+            publish_task_event(app.backend, batch_id, dict(progress, taskId=batch_id, status='progress'))
+        except Exception as e:
+            logger.warning("Could not publish batch progress: %s", e)
+
+    def fail(index, message):
+        logger.error("Batch %s: %s failed: %s", batch_id, file_names[index], message)
+        results[index] = {'fileName': file_names[index], 'success': False, 'message': message}
+        progress['failed'] += 1
+
+    try:
+        logger.info("Starting batch %s with %s resumes", batch_id, total)
+        
+        if isinstance(job_skills, str):
+            job_skills = [s.strip() for s in job_skills.split(',') if s.strip()]
+        job_skills = job_skills or []
+        
+        # Resolve the job category once for the whole batch
+        if job_category:
+            normalized_category = normalize_job_category(job_category)
+        else:
+            with span('detect_category', trace):
+                normalized_category = detect_job_category(job_description)
+        frontend_category = job_category or normalized_category
+        logger.info("Batch job category: '%s'", normalized_category)
+        
+        # Stage 1: text extraction
+        resume_texts = []
+        text_indices = []
+        with span('batch_extract_text', trace):
+            for index, file_path in enumerate(file_paths):
+                try:
+                    if not os.path.exists(file_path):
+                        raise ValueError(f"Resume file not found: {file_path}")
+                    with span('validate'):
+                        validate_resume_file(file_path)
+                    
+                    with span('extract_text'):
+                        resume_text = extract_text(file_path)
+                        if not resume_text:
+                            resume_text = retry_function(extract_text, file_path, max_attempts=2, delay=1)
+                        if not resume_text or not resume_text.strip():
+                            raise ValueError("No text extracted from file")
+                    
+                    resume_texts.append(resume_text)
+                    text_indices.append(index)
+                    progress['extracted'] += 1
+                except Exception as e:
+                    fail(index, f"Text extraction failed: {str(e)}")
+                finally:
+                    try:
+                        if os.path.exists(file_path):
+                            os.remove(file_path)
+                    except Exception as e:
+                        logger.warning("Failed to delete temporary file: %s", e)
+                report_progress()
+        
+        logger.info("Batch %s: extracted text from %s/%s resumes", batch_id, len(resume_texts), total)
+        report_progress(force=True)
+        
+        # Stage 2: encode the job once and all resumes in batches
+        job_embedding = None
+        resume_embeddings = None
+        if (job_description or candidate_ids) and resume_texts:
+            with span('batch_embed', trace) as stage:
+                try:
+                    embeddings = encode_texts([job_description or ''] + resume_texts)
+                    if embeddings is not None:
+                        job_embedding = embeddings[0] if job_description else None
+                        resume_embeddings = embeddings[1:]
+                except Exception as e:
+                    stage.outcome = 'error'
+                    logger.error("Batch embedding failed, scoring resumes individually: %s", e)
+                    logger.error(traceback.format_exc())
+        
+        # Stage 3: spaCy parsing through nlp.pipe and scoring
+        with span('batch_score', trace) as batch_stage:
             try:
-                contact_info = retry_function(extract_contact_info, resume_text, max_attempts=2)
-                logger.info(f"Contact info extracted: {contact_info.keys()}")
-            except Exception as contact_error:
-                logger.error(f"Contact info extraction failed: {str(contact_error)}")
+                for position, extracted in iter_extract_resumes_batch(resume_texts, job_skills):
+                    index = text_indices[position]
+                    resume_text = resume_texts[position]
+                    
+                    skills, education, experience = generate_fallback_data(
+                        resume_text, extracted['skills'], extracted['education'], extracted['experience']
+                    )
+                    
+                    with span('score') as stage:
+                        try:
+                            match_result = calculate_match_score(
+                                resume_text,
+                                job_description,
+                                skills,
+                                job_skills,
+                                normalized_category,
+                                resume_embedding=resume_embeddings[position] if resume_embeddings is not None else None,
+                                job_embedding=job_embedding
+                            )
+                            matchScore = match_result.score
+                            score_breakdown = match_result.to_dict()
+                            if match_result.fallbacks:
+                                stage.outcome = 'fallback'
+                            if matchScore is None or matchScore <= 0 or isinstance(matchScore, str):
+                                logger.warning("Invalid match score calculated: %s, using minimum default", matchScore)
+                                stage.outcome = 'fallback'
+                                matchScore = 15.0
+                        except Exception as match_error:
+                            stage.outcome = 'error'
+                            logger.error("Error calculating match score: %s", match_error)
+                            matchScore = 15.0
+                            score_breakdown = None
+                    
+                    if candidate_ids and resume_embeddings is not None:
+                        with span('candidate_pool'):
+                            add_to_candidate_pool(
+                                pool_name, candidate_ids[index], resume_text, skills,
+                                resume_embeddings[position], extracted['candidateName']
+                            )
+                    
+                    results[index] = {
+                        'fileName': file_names[index],
+                        'success': True,
+                        'data': build_result_data(
+                            extracted['candidateName'], extracted['contactInfo'], skills, education,
+                            experience, extracted['projects'], matchScore, frontend_category, score_breakdown
+                        )
+                    }
+                    progress['processed'] += 1
+                    report_progress()
+            except Exception as e:
+                batch_stage.outcome = 'error'
+                logger.error("Batch extraction failed: %s", e)
                 logger.error(traceback.format_exc())
-                contact_info = {}
-            
-            # Extract candidate name
-            logger.info("Extracting candidate name from resume")
+                for index in text_indices:
+                    if results[index] is None:
+                        fail(index, f"Error processing resume: {str(e)}")
+        
+        logger.info("Batch %s complete: %s processed, %s failed", batch_id, progress['processed'], progress['failed'])
+        return {
+            'success': True,
+            'message': 'Batch processed successfully',
+            'batchId': batch_id,
+            'total': total,
+            'processed': progress['processed'],
+            'failed': progress['failed'],
+            'results': results,
+            'timings': trace.to_dict()
+        }
+    except Exception as e:
+        logger.error("Unexpected error processing batch: %s", e)
+        logger.error(traceback.format_exc())
+        # Cleanup on error
+        for file_path in file_paths:
             try:
-                candidate_name = retry_function(extract_candidate_name, resume_text, max_attempts=2)
-                logger.info(f"Candidate name: {candidate_name}")
-            except Exception as name_error:
-                logger.error(f"Candidate name extraction failed: {str(name_error)}")
-                logger.error(traceback.format_exc())
-                candidate_name = ""
-            
-            # Ensure we have at least some data
-            if len(skills) == 0:
-                # Extract common terms from resume as skills
-                logger.info("No skills found, generating fallback skills")
-                common_words = [w.lower() for w in resume_text.split() if len(w) > 3]
-                word_count = {}
-                for word in common_words:
-                    if word not in word_count:
-                        word_count[word] = 0
-                    word_count[word] += 1
-                
-                # Get most common terms
-                from collections import Counter
-                most_common = Counter(word_count).most_common(10)
-                skills = [word[0].capitalize() for word in most_common]
-                logger.info(f"Generated fallback skills: {skills}")
-            
-            # Generate fallback education if empty
-            if len(education) == 0:
-                logger.info("No education found, generating fallback education")
-                filename = os.path.basename(file_path)
-                degree_name = "Bachelor's Degree"
-                institution = "University"
-                
-                # Try to extract university name from text
-                unis = ["University", "College", "Institute", "School"]
-                for line in resume_text.split('\n'):
-                    for uni in unis:
-                        if uni in line:
-                            institution = line.strip()
-                            break
-                
-                education = [{
-                    "institution": institution,
-                    "degree": degree_name,
-                    "field": "Computer Science",
-                    "year": "2020"
-                }]
-                logger.info(f"Generated fallback education: {education}")
-            
-            # Generate fallback experience if empty
-            if len(experience) == 0:
-                logger.info("No experience found, generating fallback experience")
-                # Try to extract company names
-                company_indicators = ["Ltd", "LLC", "Inc", "Corporation", "Corp", "Company"]
-                companies = []
-                
-                for line in resume_text.split('\n'):
-                    for indicator in company_indicators:
-                        if indicator in line:
-                            companies.append(line.strip())
-                            break
-                
-                if not companies:
-                    companies = ["Company"]
-                
-                experience = [{
-                    "company": companies[0],
-                    "position": "Professional",
-                    "duration": "1 year",
-                    "description": "Worked on various projects and responsibilities"
-                }]
-                logger.info(f"Generated fallback experience: {experience}")
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+            except Exception as cleanup_error:
+                logger.warning("Error during cleanup: %s", cleanup_error)
                 
+        return {
+            'success': False,
+            'message': f'Error processing batch: {str(e)}',
+            'batchId': batch_id,
+            'timings': trace.to_dict()
+        }
+
+
+@app.task(name='process_resume_multi', bind=True, max_retries=3, retry_backoff=True)
+def process_resume_multi(self, file_path, jobs, callback_url=None):
+    """
+    Score one resume against several job descriptions
+    
+    Text extraction, spaCy parsing and the resume embedding happen once;
+    only skill matching and scoring run per job. Job embeddings come from
+    the per-process embedding cache, with all misses encoded in one batch.
+    
+    Args:
+        file_path: Path to the resume file
+        jobs: List of dicts with jobId, jobDescription, requiredSkills and
+            jobCategory (optional) keys
+        callback_url: Optional webhook the result is POSTed to when the task finishes
+    """
+    trace = Trace()
+    try:
+        logger.info("Starting to process resume against %s jobs: %s", len(jobs), file_path)
+        
+        if not os.path.exists(file_path):
+            error_msg = f"Resume file not found: {file_path}"
+            logger.error(error_msg)
+            return {
+                'success': False,
+                'message': error_msg
+            }
+        
+        try:
+            with span('validate', trace):
+                validate_resume_file(file_path)
         except Exception as e:
-            logger.error(f"Error extracting information from resume: {str(e)}")
-            logger.error(traceback.format_exc())
-            
-            # Generate reasonable fallback data based on filename
-            logger.info("Exception caught - generating fallback data")
-            filename = os.path.basename(file_path)
-            candidate_name = os.path.splitext(filename)[0].replace("_", " ").title()
-            logger.info(f"Generated candidate name from filename: {candidate_name}")
-            
-            # Default contact info
-            contact_info = {
-                "email": f"{candidate_name.lower().replace(' ', '.')}@example.com",
-                "phone": "+1234567890"
+            logger.error("File validation error: %s", e)
+            return {
+                'success': False,
+                'message': f"File validation failed: {str(e)}",
+                'timings': trace.to_dict()
             }
-            
-            # Default skills based on job category
-            if normalized_category == 'web_developer':
-                skills = ["HTML", "CSS", "JavaScript", "React", "Node.js"]
-            elif normalized_category == 'cybersecurity':
-                skills = ["Security", "Penetration Testing", "Network Security", "Encryption", "Firewall"]
-            elif normalized_category == 'python_developer':
-                skills = ["Python", "Django", "Flask", "Pandas", "API Development"]
+        
+        # Normalize the job definitions once
+        job_specs = []
+        for position, job in enumerate(jobs):
+            job_skills = job.get('requiredSkills') or []
+            if isinstance(job_skills, str):
+                job_skills = [s.strip() for s in job_skills.split(',') if s.strip()]
+            job_description = job.get('jobDescription') or ''
+            job_category = job.get('jobCategory')
+            if job_category:
+                normalized_category = normalize_job_category(job_category)
             else:
-                skills = ["Programming", "Problem Solving", "Communication", "Teamwork", "Project Management"]
-            
-            logger.info(f"Generated skills for {normalized_category}: {skills}")
-            
-            # Default education
-            education = [{
-                "institution": "University",
-                "degree": "Bachelor's Degree",
-                "field": "Computer Science",
-                "year": "2020"
-            }]
-            
-            # Default experience
-            experience = [{
-                "company": "Company",
-                "position": "Professional",
-                "duration": "1 year",
-                "description": "Worked on various projects and responsibilities"
-            }]
-            
-            # Default projects
-            projects = [{
-                "title": "Project",
-                "description": "A project demonstrating technical skills",
-                "technologies": skills[:3],
-                "duration": "3 months"
-            }]
-            
-            logger.info("Using generated fallback resume data due to extraction failure")
+                with span('detect_category', trace):
+                    normalized_category = detect_job_category(job_description)
+            job_specs.append({
+                'jobId': job.get('jobId', position),
+                'description': job_description,
+                'skills': job_skills,
+                'category': normalized_category,
+                'frontendCategory': job_category or normalized_category
+            })
         
-        # Calculate match score
         try:
-            logger.info("Calculating match score")
-            matchScore = calculate_match_score(
-                resume_text, 
-                job_description, 
-                skills, 
-                job_skills, 
-                normalized_category
+            with span('extract_text', trace):
+                resume_text = extract_resume_text(file_path)
+        except Exception as e:
+            logger.error("Failed to extract text from resume: %s", e)
+            logger.error(traceback.format_exc())
+            if self.request.retries < self.max_retries:
+                logger.info("Retrying task, attempt %s", self.request.retries + 1)
+                raise self.retry(exc=e)
+            return {
+                'success': False,
+                'message': f'Text extraction failed: {str(e)}',
+                'timings': trace.to_dict()
+            }
+        
+        # Parse once; skills are re-matched per job against the shared Doc
+        docs = None
+        try:
+            with span('parse', trace):
+                docs = parse_resume(resume_text)
+                extracted = extract_from_docs(resume_text, docs)
+            candidate_name = extracted['candidateName']
+            contact_info = extracted['contactInfo']
+            base_skills, education, experience = generate_fallback_data(
+                resume_text, extracted['skills'], extracted['education'], extracted['experience']
+            )
+            projects = extracted['projects']
+        except Exception as e:
+            logger.error("Parsing resume once failed, extracting sections directly: %s", e)
+            logger.error(traceback.format_exc())
+            candidate_name, contact_info, base_skills, education, experience, projects = extract_resume_sections(
+                resume_text, [], file_path, job_specs[0]['category'] if job_specs else None, trace=trace
             )
+        
+        # One resume embedding, cached job embeddings
+        resume_embedding = None
+        job_embeddings = [None] * len(job_specs)
+        with span('embed', trace) as stage:
+            try:
+                embeddings = encode_texts([resume_text])
+                if embeddings is not None:
+                    resume_embedding = embeddings[0]
+                    job_embeddings = get_job_embedding_cache().get_many([spec['description'] for spec in job_specs])
+            except Exception as embed_error:
+                stage.outcome = 'error'
+                logger.error("Error encoding resume and jobs: %s", embed_error)
+                logger.error(traceback.format_exc())
+        
+        scores = []
+        job_results = []
+        for spec, job_embedding in zip(job_specs, job_embeddings):
+            skills = base_skills
+            if spec['skills'] and docs is not None:
+                with span('skills', trace) as stage:
+                    try:
+                        skills = extract_skills(resume_text, spec['skills'], doc=docs[FULL_TEXT]) or base_skills
+                    except Exception as skills_error:
+                        stage.outcome = 'error'
+                        logger.error("Skills extraction failed for job %s: %s", spec['jobId'], skills_error)
             
-            # Ensure minimum score of 15% as a fallback
-            if matchScore is None or matchScore <= 0 or isinstance(matchScore, str):
-                logger.warning(f"Invalid match score calculated: {matchScore}, using minimum default")
-                matchScore = 15.0
+            with span('score', trace) as stage:
+                try:
+                    match_result = calculate_match_score(
+                        resume_text,
+                        spec['description'],
+                        skills,
+                        spec['skills'],
+                        spec['category'],
+                        resume_embedding=resume_embedding,
+                        job_embedding=job_embedding
+                    )
+                    matchScore = match_result.score
+                    score_breakdown = match_result.to_dict()
+                    if match_result.fallbacks:
+                        stage.outcome = 'fallback'
+                    if matchScore is None or matchScore <= 0 or isinstance(matchScore, str):
+                        logger.warning("Invalid match score calculated: %s, using minimum default", matchScore)
+                        stage.outcome = 'fallback'
+                        matchScore = 15.0
+                except Exception as match_error:
+                    stage.outcome = 'error'
+                    logger.error("Error calculating match score for job %s: %s", spec['jobId'], match_error)
+                    matchScore = 15.0
+                    score_breakdown = None
             
-            logger.info(f"Match score: {matchScore}")
-        except Exception as match_error:
-            logger.error(f"Error calculating match score: {str(match_error)}")
-            logger.error(traceback.format_exc())
-            # Use a default score rather than failing completely
-            matchScore = 15.0
-            logger.info(f"Using default match score: {matchScore}")
-
-        # Cleanup
+            scores.append(matchScore)
+            job_results.append({
+                'jobId': spec['jobId'],
+                'jobCategory': spec['frontendCategory'],
+                'matchScore': matchScore,
+                'isShortlisted': matchScore >= 75,
+                'skills': skills,
+                'scoreBreakdown': score_breakdown
+            })
+        
         try:
             if os.path.exists(file_path):
                 os.remove(file_path)
-                logger.info(f"Deleted temporary file: {file_path}")
+                logger.info("Deleted temporary file: %s", file_path)
         except Exception as e:
-            logger.warning(f"Failed to delete temporary file: {str(e)}")
-
-        # Map back to frontend category format for response
-        frontend_category = job_category or normalized_category
+            logger.warning("Failed to delete temporary file: %s", e)
         
-        # Prepare response
+        logger.info("Scored resume against %s jobs: %s", len(job_specs), scores)
         return {
             'success': True,
             'message': 'Resume processed successfully',
             'data': {
                 'candidateName': candidate_name or '',
                 'contactInfo': contact_info or {},
-                'skills': skills or [],
                 'education': education or [],
                 'experience': experience or [],
                 'projects': projects or [],
-                'matchScore': matchScore,
-                'jobCategory': frontend_category, 
-                'isShortlisted': matchScore >= 75
-            }
+                'scores': scores,
+                'jobs': job_results
+            },
+            'timings': trace.to_dict()
         }
     except Exception as e:
-        logger.error(f"Unexpected error processing resume: {str(e)}")
+        logger.error("Unexpected error processing resume against multiple jobs: %s", e)
         logger.error(traceback.format_exc())
-        # Cleanup on error
         try:
             if 'file_path' in locals() and os.path.exists(file_path):
                 os.remove(file_path)
         except Exception as cleanup_error:
-            logger.warning(f"Error during cleanup: {str(cleanup_error)}")
-            
+            logger.warning("Error during cleanup: %s", cleanup_error)
+        
         return {
-            'success': False, 
-            'message': f'Error processing resume: {str(e)}'
-        }
\ No newline at end of file
+            'success': False,
+            'message': f'Error processing resume: {str(e)}',
+            'timings': trace.to_dict()
+        }
+
+
+@app.task(name='rank_candidates', bind=True)
+def rank_candidate_pool(self, job_description, job_skills, job_category=None, top_k=10, pool_name=None):
+    """
+    Rank all stored candidates of a pool against a job description
+    
+    Args:
+        job_description: Job description text
+        job_skills: List of required skills
+        job_category: Job category (optional, will be detected from description if not provided)
+        top_k: Number of best matching candidates to return
+        pool_name: Candidate pool to rank (defaults to the default pool)
+    """
+    try:
+        if isinstance(job_skills, str):
+            job_skills = [s.strip() for s in job_skills.split(',') if s.strip()]
+        
+        start_time = time.time()
+        ranking = rank_candidates(get_pool(pool_name), job_description, job_skills or [], job_category, top_k=top_k)
+        elapsed = time.time() - start_time
+        logger.info("Ranked %s candidates in %.2fs", ranking['poolSize'], elapsed)
+        
+        ranking['elapsedSeconds'] = round(elapsed, 3)
+        return {
+            'success': True,
+            'message': 'Candidates ranked successfully',
+            'data': ranking
+        }
+    except Exception as e:
+        logger.error("Error ranking candidates: %s", e)
+        logger.error(traceback.format_exc())
+        return {
+            'success': False,
+            'message': f'Error ranking candidates: {str(e)}'
+        }
+
+
+@worker_init.connect
+def start_worker_metrics_server(**kwargs):
+    """Serve the worker's stage histograms on WORKER_METRICS_PORT, merged over all pool processes"""
+    port = os.environ.get('WORKER_METRICS_PORT')
+    if not port:
+        return
+    try:
+        if not metrics.METRICS_DIR:
+            # Pool processes are forked after worker_init, so they inherit this directory
+            metrics.set_metrics_dir(tempfile.mkdtemp(prefix='nlp-worker-metrics-'))
+        start_metrics_server(int(port))
+    except Exception as e:
+        logger.error("Could not start worker metrics server: %s", e)
+        logger.error(traceback.format_exc())
+
+@worker_init.connect
+def preload_worker_models(sender=None, **kwargs):
+    """Load and freeze the models in the main process so pool processes share their pages copy-on-write"""
+    bootstrap_worker(getattr(sender, 'concurrency', None), pool_forks(getattr(sender, 'pool_cls', None)))
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Set up and warm up each forked pool process before it takes tasks"""
+    init_pool_process()
+
+@worker_process_shutdown.connect
+def retire_worker_process_metrics(**kwargs):
+    """Keep the exiting pool process' counts but drop its gauges from the merged metrics"""
+    metrics.retire_metrics()
+
+@worker_ready.connect
+def warm_up_worker_process(**kwargs):
+    warm_up_worker()
+
+_task_start_times = {}
+
+@task_prerun.connect
+def start_task_timer(task_id=None, task=None, **kwargs):
+    """Count the task as in progress and publish that before it runs, so scrapes during the task see it"""
+    _task_start_times[task_id] = time.perf_counter()
+    TASKS_IN_PROGRESS.inc(task=task.name)
+    dump_metrics()
+
+@task_postrun.connect
+def record_task_metrics(task_id=None, task=None, retval=None, state=None, **kwargs):
+    """Record the task runtime by outcome and publish this process' metrics for the sidecar to merge"""
+    start = _task_start_times.pop(task_id, None)
+    TASKS_IN_PROGRESS.dec(task=task.name)
+    if start is not None:
+        outcome = (state or 'unknown').lower()
+        # Tasks report most failures as {'success': False} results rather than exceptions
+        if outcome == 'success' and isinstance(retval, dict) and retval.get('success') is False:
+            outcome = 'failed'
+        TASK_DURATION.observe(time.perf_counter() - start, task=task.name, outcome=outcome)
+    dump_metrics()
+
+@app.task(name='deliver_callback', bind=True, max_retries=CALLBACK_MAX_RETRIES)
+def deliver_callback(self, url, payload):
+    """
+    POST a finished task's result to its webhook, retrying with backoff
+
+    Args:
+        url: Callback URL given when the task was queued
+        payload: Body with taskId, status, success and result or error
+    """
+    try:
+        status_code = post_callback(url, payload)
+        logger.info("Delivered callback for task %s (HTTP %s)", payload.get('taskId'), status_code)
+        return {'success': True, 'statusCode': status_code}
+    except CallbackError as e:
+        logger.warning("Callback for task %s failed: %s", payload.get('taskId'), e)
+        if e.retriable and self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=2 ** self.request.retries)
+        return {'success': False, 'message': str(e)}
+
+@task_postrun.connect
+def notify_task_completion(task_id=None, task=None, retval=None, state=None, **kwargs):
+    """Publish a finished task's event for /api/task/<id>/events and queue its webhook, if any"""
+    if state not in ('SUCCESS', 'FAILURE') or task.name == deliver_callback.name:
+        return
+    success = state == 'SUCCESS' and not (isinstance(retval, dict) and retval.get('success') is False)
+    event = {'taskId': task_id, 'status': 'completed' if state == 'SUCCESS' else 'failure', 'success': success}
+    publish_task_event(app.backend, task_id, event)
+
+    callback_url = (kwargs.get('kwargs') or {}).get('callback_url')
+    if not callback_url:
+        return
+    payload = dict(event)
+    if state == 'SUCCESS':
+        payload['result'] = retval
+    else:
+        payload['error'] = str(retval)
+    try:
+        deliver_callback.delay(callback_url, payload)
+    except Exception as e:
+        logger.error("Could not queue callback for task %s: %s", task_id, e)
+
+# Seconds between sweeps of the durable result store per worker process
+RESULT_CLEANUP_INTERVAL = 3600
+_last_result_cleanup = [0.0]
+
+@task_postrun.connect
+def retain_task_result(task_id=None, task=None, retval=None, state=None, **kwargs):
+    """Keep the full result durably and a slim summary in Redis; the backend copy expires after result_expires"""
+    if state != 'SUCCESS' or task.name not in RETAINED_TASKS or not isinstance(retval, dict):
+        return
+    try:
+        retain_result(app.backend, task_id, task.name, retval)
+    except Exception as e:
+        logger.error("Could not retain result of task %s: %s", task_id, e)
+    if time.time() - _last_result_cleanup[0] > RESULT_CLEANUP_INTERVAL:
+        _last_result_cleanup[0] = time.time()
+        remove_expired_results()
+
+# Seconds a queue depth read from the broker is reused, so scrapes do not each open a connection
+QUEUE_DEPTH_CACHE_SECONDS = float(os.environ.get('QUEUE_DEPTH_CACHE_SECONDS', '5'))
+
+def celery_queue_depth():
+    """Number of messages waiting in the default queue, read from the broker at scrape time"""
+    queue = app.conf.task_default_queue
+    with app.connection_for_read() as connection:
+        connection.ensure_connection(max_retries=1)
+        try:
+            depth = connection.default_channel.queue_declare(queue=queue, passive=True).message_count
+        except connection.channel_errors:
+            # The queue is only declared once a worker or producer has used it
+            depth = 0
+        return {(queue,): depth}
+
+QUEUE_DEPTH.set_function(celery_queue_depth, cache_seconds=QUEUE_DEPTH_CACHE_SECONDS)
@@ -0,0 +1,82 @@
+import os
+import uuid
+import shutil
+import logging
+import tempfile
+from werkzeug.utils import secure_filename
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Buffer size used when an upload has to be copied into the store
+UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', str(1024 * 1024)))
+
+# Leading bytes of the accepted resume formats (DOCX is a zip archive)
+FILE_SIGNATURES = {
+    '.pdf': b'%PDF',
+    '.docx': b'PK\x03\x04',
+}
+
+SPOOL_PREFIX = '.upload-'
+
+def matches_signature(stream, extension):
+    """Check the first bytes of an upload against its extension without parsing it"""
+    signature = FILE_SIGNATURES.get(extension)
+    if signature is None:
+        return False
+    position = stream.tell()
+    head = stream.read(len(signature))
+    stream.seek(position)
+    return head == signature
+
+class UploadStore:
+    """
+    Resume files shared by the API and the Celery workers
+
+    The store is a directory both can read. Uploads are spooled into it while
+    the request body is parsed (see spool_file) and then hard-linked to a
+    unique name, so saving an upload costs no second copy, a worker never
+    sees a partial file, and uploads with the same file name do not
+    overwrite each other.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def spool_file(self):
+        """Anonymous file in the store for werkzeug to stream one uploaded file into"""
+        os.makedirs(self.directory, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=self.directory, prefix=SPOOL_PREFIX, suffix='.part')
+
+    def path_for(self, filename):
+        return os.path.join(self.directory, f"{uuid.uuid4()}_{secure_filename(filename)}")
+
+    def save(self, file, filename=None):
+        """
+        Store an uploaded file under a unique name
+
+        Args:
+            file: werkzeug FileStorage
+            filename: Name to store it under (defaults to the uploaded file name)
+
+        Returns:
+            Path of the stored file
+        """
+        path = self.path_for(filename or file.filename)
+        stream = file.stream
+        spool_path = getattr(stream, 'name', None)
+        if isinstance(spool_path, str) and os.path.dirname(os.path.abspath(spool_path)) == os.path.abspath(self.directory):
+            stream.flush()
+            try:
+                os.link(spool_path, path)
+                return path
+            except OSError as e:
+                # e.g. a filesystem without hard links; copy instead
+                logger.debug("Could not link spooled upload %s: %s", spool_path, e)
+
+        temp_path = f"{path}.part"
+        stream.seek(0)
+        with open(temp_path, 'wb') as target:
+            shutil.copyfileobj(stream, target, UPLOAD_CHUNK_SIZE)
+        os.replace(temp_path, path)
+        return path
@@ -0,0 +1,181 @@
+import os
+import gc
+import time
+import logging
+import traceback
+from .metrics import WARMUP_DURATION, dump_metrics, reset_metrics
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load every model in the worker's main process before the pool forks (0 disables)
+WORKER_PRELOAD = os.environ.get('WORKER_PRELOAD', '1') == '1'
+# PyTorch threads per pool process; empty splits the CPUs between the pool processes
+WORKER_TORCH_THREADS = os.environ.get('WORKER_TORCH_THREADS', '')
+
+# Run a canned resume through the pipeline before taking tasks (0 disables)
+WORKER_WARMUP = os.environ.get('WORKER_WARMUP', '1') == '1'
+
+# Pool size and type seen in worker_init, inherited by the forked pool processes
+_pool_concurrency = [None]
+_pool_forks = [False]
+
+WARMUP_RESUME = """Ayesha Khan
+ayesha.khan@example.com | +92 300 1234567 | Peshawar, Pakistan
+
+SUMMARY
+Software engineer with 4 years of experience building web services in Python.
+
+SKILLS
+Python, Flask, Django, REST APIs, PostgreSQL, Docker, Git, Machine Learning
+
+EXPERIENCE
+Software Engineer, Example Technologies (2021 - Present)
+- Built REST APIs with Flask and PostgreSQL serving 2 million requests a day
+- Containerized services with Docker and set up CI pipelines
+
+EDUCATION
+Bachelor of Science in Computer Science, University of Engineering and Technology Peshawar, 2020
+
+PROJECTS
+Resume Screening Tool - Ranked candidates with Sentence-BERT embeddings and spaCy
+"""
+
+WARMUP_JOB_DESCRIPTION = (
+    "We are hiring a Python developer to build REST APIs with Flask or Django, "
+    "work with PostgreSQL and Docker, and apply machine learning to hiring data."
+)
+WARMUP_JOB_SKILLS = ['Python', 'Flask', 'Django', 'PostgreSQL', 'Docker']
+
+def preload_models():
+    """
+    Load the spaCy pipeline and the shared SBERT model
+
+    Both would otherwise be loaded lazily in every pool process on first use.
+
+    Returns:
+        Dict of model name to load time in seconds
+    """
+    from .nlp_model import get_nlp
+    from .embeddings import get_embedding_provider
+
+    timings = {}
+    for name, load in (('spacy', get_nlp), ('sbert', lambda: get_embedding_provider().model)):
+        start_time = time.perf_counter()
+        try:
+            load()
+        except Exception as e:
+            logger.error("Could not preload %s model: %s", name, e)
+            logger.error(traceback.format_exc())
+        timings[name] = round(time.perf_counter() - start_time, 3)
+    return timings
+
+def freeze_heap():
+    """
+    Move every object allocated so far into the GC's permanent generation
+
+    The garbage collector writes to the header of each object it visits, so
+    collections in the pool processes would otherwise copy the parent's model
+    pages one by one. Frozen objects are never visited again.
+
+    Returns:
+        Number of frozen objects (0 before Python 3.7)
+    """
+    gc.collect()
+    if not hasattr(gc, 'freeze'):
+        return 0
+    gc.freeze()
+    return gc.get_freeze_count()
+
+def torch_threads(concurrency=None):
+    """Intra-op threads for one pool process so that the pool does not oversubscribe the CPUs"""
+    if WORKER_TORCH_THREADS:
+        return max(1, int(WORKER_TORCH_THREADS))
+    cpus = os.cpu_count() or 1
+    return max(1, cpus // (concurrency or cpus))
+
+def pool_forks(pool_cls):
+    """True if tasks run in forked pool processes rather than the worker's main process"""
+    name = pool_cls if isinstance(pool_cls, str) else getattr(pool_cls, '__module__', '')
+    return 'prefork' in (name or '') or 'processes' in (name or '')
+
+def bootstrap_worker(concurrency=None, forks=False):
+    """
+    Prepare the worker's main process for forking (called from worker_init)
+
+    Args:
+        concurrency: Number of pool processes that will be forked
+        forks: Whether tasks run in forked pool processes (see pool_forks)
+    """
+    _pool_concurrency[0] = concurrency
+    _pool_forks[0] = forks
+    if not WORKER_PRELOAD:
+        return
+    timings = preload_models()
+    frozen = freeze_heap()
+    logger.info("Preloaded models %s, froze %s objects before forking %s processes", timings, frozen, concurrency)
+
+def init_pool_process():
+    """Per-process setup after fork (called from worker_process_init)"""
+    # The parent's series (e.g. model load times) stay in the parent's dump
+    reset_metrics()
+    try:
+        import torch
+        torch.set_num_threads(torch_threads(_pool_concurrency[0]))
+    except ImportError:
+        pass
+    except Exception as e:
+        logger.warning("Could not set PyTorch threads: %s", e)
+    if WORKER_WARMUP:
+        warm_up()
+
+def warm_up():
+    """
+    Run a canned resume through every extractor and both SBERT scorers
+
+    Pays the one-time costs of a process (PyTorch kernel and thread pool
+    setup, spaCy vocab and matcher caches, lazily built regexes) before the
+    first real task. Each step is recorded in WARMUP_DURATION.
+
+    Returns:
+        Dict of step name to seconds
+    """
+    from .tasks import extract_resume_sections
+    from .calculate_score import calculate_match_score, normalize_job_category
+    from .sbert_scorer import get_scorer
+
+    category = normalize_job_category('Python Developer')
+    steps = (
+        ('extractors', lambda: extract_resume_sections(
+            WARMUP_RESUME, WARMUP_JOB_SKILLS, 'warmup.pdf', category)),
+        ('score', lambda: calculate_match_score(
+            WARMUP_RESUME, WARMUP_JOB_DESCRIPTION, WARMUP_JOB_SKILLS, WARMUP_JOB_SKILLS, category)),
+        ('sbert_scorer', lambda: get_scorer().calculate_score(WARMUP_RESUME, WARMUP_JOB_DESCRIPTION)),
+    )
+    timings = {}
+    total_start = time.perf_counter()
+    for step, run in steps:
+        start_time = time.perf_counter()
+        try:
+            run()
+        except Exception as e:
+            logger.error("Warmup step %s failed: %s", step, e)
+            logger.error(traceback.format_exc())
+        timings[step] = time.perf_counter() - start_time
+        WARMUP_DURATION.observe(timings[step], step=step)
+    timings['total'] = time.perf_counter() - total_start
+    WARMUP_DURATION.observe(timings['total'], step='total')
+    dump_metrics()
+    logger.info("Worker process %s warmed up in %.2fs: %s", os.getpid(), timings['total'],
+                {step: round(seconds, 3) for step, seconds in timings.items()})
+    return timings
+
+def warm_up_worker():
+    """
+    Warm up the worker's main process (called from worker_ready)
+
+    Only needed when tasks run in the main process (solo, threads, gevent
+    pools); forked pool processes warm themselves up in init_pool_process.
+    """
+    if WORKER_WARMUP and not _pool_forks[0]:
+        warm_up()
@@ -0,0 +1,22 @@
+"""
+WSGI entry point of the NLP service for production servers
+
+    gunicorn -k gevent --worker-connections 1000 -b 0.0.0.0:5002 wsgi:app
+
+Uploads are streamed into the upload store and only queued, so a request
+spends its time waiting on the network rather than on the CPU. With
+WSGI_GEVENT=1 the standard library is monkey-patched before the app is
+imported, so socket reads, Redis calls and SSE streams yield to other
+connections and one worker process serves many uploads at once.
+"""
+
+import os
+
+if os.environ.get('WSGI_GEVENT', '0') == '1':
+    from gevent import monkey
+    monkey.patch_all()
+
+from app import app  # noqa: E402
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', '5002')))